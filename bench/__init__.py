@@ -0,0 +1 @@
+"""Benchmarks for the catalog read and write paths; run modules with ``python -m bench.<name>``."""
@@ -0,0 +1,167 @@
+"""
+Sync vs native async catalog views under ASGI at high concurrency.
+
+    python -m bench.asgi_load [--requests 2000] [--concurrency 200] [--programs 50]
+
+Builds a throwaway SQLite catalog, then drives cms_backend.asgi in-process
+once per mode (CATALOG_ASYNC_VIEWS off and on, each in its own process),
+cycling through the list, program detail and lesson detail endpoints. The
+catalog cache is disabled so every request reaches the database. Reports
+throughput, latency percentiles and the peak number of threads.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def _environ(database_path):
+    return {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'cms_backend.settings',
+        'DATABASE_URL': f'sqlite:///{database_path}',
+        'CATALOG_CACHE_BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        'ALLOWED_HOSTS': 'localhost',
+        'DEBUG': 'False',
+    }
+
+
+def prepare(database_path, programs):
+    """Migrate and populate the database in a child process."""
+    script = (
+        'import django; django.setup()\n'
+        'from django.core.management import call_command\n'
+        'call_command("migrate", verbosity=0)\n'
+        'from bench.render import populate\n'
+        f'populate({programs}, 4, 10)\n'
+    )
+    subprocess.run([sys.executable, '-c', script], env=_environ(database_path), check=True)
+
+
+async def _request(application, path, query_string=b''):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string,
+        'headers': [(b'host', b'localhost'), (b'accept', b'application/json')],
+        'client': ('127.0.0.1', 40000),
+        'server': ('localhost', 80),
+    }
+    received = False
+    status = None
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()  # no disconnect while the view runs
+        received = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def _drive(application, targets, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    peak_threads = threading.active_count()
+
+    async def one(index):
+        nonlocal errors, peak_threads
+        path, query_string = targets[index % len(targets)]
+        async with semaphore:
+            started = time.perf_counter()
+            status = await _request(application, path, query_string)
+            latencies.append((time.perf_counter() - started) * 1000)
+            peak_threads = max(peak_threads, threading.active_count())
+            if status != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': requests / elapsed,
+        'p50_ms': statistics.median(latencies),
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1],
+        'peak_threads': peak_threads,
+    }
+
+
+def worker(requests, concurrency):
+    """Run inside the child process; prints one JSON result line."""
+    import django
+    django.setup()
+    from django.core.asgi import get_asgi_application
+    from core.models import Program, Lesson
+
+    program_ids = list(Program.objects.values_list('id', flat=True)[:20])
+    lesson_ids = list(Lesson.objects.values_list('id', flat=True)[:20])
+    targets = [('/catalog/programs/', b'limit=10')]
+    targets += [(f'/catalog/programs/{pk}/', b'') for pk in program_ids]
+    targets += [(f'/catalog/lessons/{pk}/', b'') for pk in lesson_ids]
+
+    application = get_asgi_application()
+    print(json.dumps(asyncio.run(_drive(application, targets, requests, concurrency))))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--programs', type=int, default=50)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.worker:
+        worker(options.requests, options.concurrency)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_path = os.path.join(directory, 'bench.sqlite3')
+        prepare(database_path, options.programs)
+
+        results = {}
+        for mode, flag in (('sync', 'False'), ('async', 'True')):
+            completed = subprocess.run(
+                [sys.executable, '-m', 'bench.asgi_load', '--worker',
+                 '--requests', str(options.requests), '--concurrency', str(options.concurrency)],
+                env={**_environ(database_path), 'CATALOG_ASYNC_VIEWS': flag},
+                check=True, capture_output=True, text=True,
+            )
+            results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f'{options.requests} requests at concurrency {options.concurrency}, cache disabled')
+    print(f"{'':8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'threads':>10}{'errors':>8}")
+    for mode, result in results.items():
+        print(
+            f"{mode:8}{result['throughput_rps']:10.0f}{result['p50_ms']:10.1f}{result['p95_ms']:10.1f}"
+            f"{result['p99_ms']:10.1f}{result['peak_threads']:10d}{result['errors']:8d}"
+        )
+
+
+if __name__ == '__main__':
+    main()
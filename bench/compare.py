@@ -0,0 +1,76 @@
+"""
+Compare two bench.run result files.
+
+    python -m bench.compare before.json after.json [--threshold 0.10]
+
+Prints p50/p99 latency, query counts and peak allocations side by side for
+every case in both runs. A case regresses when its p50 grows by more than
+``--threshold`` or it runs more queries; the exit status is 1 if any did.
+Latency from different machines or dataset sizes is not comparable, so
+differing dataset options are reported first.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def compare(before, after, threshold=0.10):
+    """Rows of (case, before result, after result, regressions) for the cases in both runs."""
+    rows = []
+    for name, old in before['results'].items():
+        new = after['results'].get(name)
+        if new is None:
+            continue
+        regressions = []
+        if new['p50_ms'] > old['p50_ms'] * (1 + threshold):
+            regressions.append('slower')
+        if new['queries'] > old['queries']:
+            regressions.append('more queries')
+        rows.append((name, old, new, regressions))
+    return rows
+
+
+def _ratio(old, new):
+    return f'{new / old:6.2f}x' if old else '     -'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed p50 growth before flagging (0.10 = 10%%)')
+    options = parser.parse_args(argv)
+
+    before, after = _load(options.before), _load(options.after)
+    for key in ('dataset', 'repeat', 'bulk_size', 'database'):
+        if before['meta'].get(key) != after['meta'].get(key):
+            print(f"warning: {key} differs: {before['meta'].get(key)} vs {after['meta'].get(key)}")
+    print(f"{before['meta'].get('revision') or options.before} -> {after['meta'].get('revision') or options.after}")
+
+    rows = compare(before, after, options.threshold)
+    print(f"{'case':36}{'p50 ms':>25}{'p99 ms':>18}{'queries':>10}{'peak KiB':>20}")
+    for name, old, new, regressions in rows:
+        print(
+            f"{name:36}{old['p50_ms']:8.2f} {new['p50_ms']:8.2f} {_ratio(old['p50_ms'], new['p50_ms'])}"
+            f"{old['p99_ms']:9.2f} {new['p99_ms']:8.2f}{old['queries']:5d} {new['queries']:4d}"
+            f"{old['alloc_peak_kib']:10.1f} {new['alloc_peak_kib']:9.1f}"
+            f"{'  ' + ', '.join(regressions) if regressions else ''}"
+        )
+    missing = sorted(set(before['results']) ^ set(after['results']))
+    if missing:
+        print(f"Only in one run: {', '.join(missing)}")
+
+    regressed = [name for name, _, _, regressions in rows if regressions]
+    if regressed:
+        print(f'{len(regressed)} case(s) regressed')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Deterministic synthetic catalog of configurable size.
+
+    python -m bench.dataset [--programs 20] [--terms 4] [--lessons 10] [--languages 3] [--topics 10] [--seed 0]
+
+``generate()`` fills the current database with programs x terms x lessons,
+content in ``languages`` languages and ``topics`` topics. The same arguments
+always give the same rows, ids included, so results from two runs (or two
+branches) describe the same catalog. Most lessons are published; a share are
+drafts and a share are scheduled and already due, for publish_scheduled.
+"""
+
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+LANGUAGES = ['en', 'hi', 'fr', 'es', 'de', 'ta', 'te', 'bn', 'mr', 'pt', 'ar', 'ja']
+EPOCH = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+_WORDS = (
+    'algebra geometry history cooking physics poetry music drawing coding finance '
+    'biology grammar chess yoga design writing statistics astronomy gardening ethics'
+).split()
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(_WORDS) for _ in range(words)).capitalize()
+
+
+def generate(programs=20, terms=4, lessons=10, languages=3, topics=10, seed=0, drafts=0.1, scheduled=0.05):
+    """
+    Create the catalog with bulk inserts, then rebuild rollups, lesson contents,
+    facet counts and the search index.
+
+    ``drafts`` and ``scheduled`` are the shares of lessons left unpublished;
+    scheduled lessons have ``publish_at`` in the past. Returns the row counts.
+    """
+    from core.contents import rebuild_contents
+    from core.facets import rebuild_facets
+    from core.models import Program, Term, Lesson, Topic
+    from core.rollups import rebuild_rollups
+    from core.search import rebuild_index
+
+    if not 1 <= languages <= len(LANGUAGES):
+        raise ValueError(f'languages must be between 1 and {len(LANGUAGES)}')
+    rng = random.Random(seed)
+    codes = LANGUAGES[:languages]
+
+    topic_rows = Topic.objects.bulk_create([Topic(name=f'Topic {number}') for number in range(topics)])
+
+    program_rows = []
+    for number in range(programs):
+        available = codes[number % languages:] + codes[:number % languages]
+        program_rows.append(Program(
+            id=uuid.UUID(int=rng.getrandbits(128), version=4),
+            title=f'Program {number} {_sentence(rng, 2)}',
+            description=_sentence(rng, 30),
+            language_primary=available[0],
+            languages_available=available[:rng.randint(1, languages)],
+            status='published',
+            published_at=EPOCH + timedelta(hours=number),
+        ))
+    Program.objects.bulk_create(program_rows, batch_size=500)
+    # auto_now_add ignores the value given to bulk_create; catalog order follows created_at
+    for number, program in enumerate(program_rows):
+        program.created_at = EPOCH + timedelta(hours=number)
+    Program.objects.bulk_update(program_rows, ['created_at'], batch_size=500)
+
+    if topic_rows:
+        Program.topics.through.objects.bulk_create([
+            Program.topics.through(program_id=program.id, topic_id=topic.id)
+            for program in program_rows
+            for topic in rng.sample(topic_rows, min(3, len(topic_rows)))
+        ], batch_size=500)
+
+    term_rows = Term.objects.bulk_create([
+        Term(program=program, term_number=number, title=f'Term {number}')
+        for program in program_rows for number in range(1, terms + 1)
+    ], batch_size=500)
+
+    lesson_rows = []
+    for term in term_rows:
+        available = term.program.languages_available
+        for number in range(1, lessons + 1):
+            roll = rng.random()
+            status = 'draft' if roll < drafts else 'scheduled' if roll < drafts + scheduled else 'published'
+            at = EPOCH + timedelta(minutes=len(lesson_rows))
+            lesson_rows.append(Lesson(
+                term=term,
+                lesson_number=number,
+                title=f'Lesson {number} {_sentence(rng, 3)}',
+                content_type=rng.choice(('video', 'article')),
+                duration_ms=rng.randint(1, 60) * 60000,
+                is_paid=rng.random() < 0.2,
+                content_language_primary=available[0],
+                content_languages_available=available,
+                content_urls_by_language={
+                    code: f'https://cdn.example.com/{code}/{term.program_id.hex}/{term.term_number}/{number}.mp4'
+                    for code in available
+                },
+                status=status,
+                publish_at=at if status == 'scheduled' else None,
+                published_at=at if status == 'published' else None,
+            ))
+    Lesson.objects.bulk_create(lesson_rows, batch_size=500)
+    rebuild_rollups()
+    rebuild_contents()
+    rebuild_facets()
+    rebuild_index()
+
+    return {
+        'programs': len(program_rows),
+        'terms': len(term_rows),
+        'lessons': len(lesson_rows),
+        'published': sum(lesson.status == 'published' for lesson in lesson_rows),
+        'scheduled': sum(lesson.status == 'scheduled' for lesson in lesson_rows),
+        'topics': len(topic_rows),
+        'languages': languages,
+    }
+
+
+def add_arguments(parser):
+    """The dataset options shared by the benchmark commands."""
+    parser.add_argument('--programs', type=int, default=20)
+    parser.add_argument('--terms', type=int, default=4, help='Terms per program')
+    parser.add_argument('--lessons', type=int, default=10, help='Lessons per term')
+    parser.add_argument('--languages', type=int, default=3, help='Content languages in the catalog')
+    parser.add_argument('--topics', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def options_dict(options):
+    return {name: getattr(options, name) for name in ('programs', 'terms', 'lessons', 'languages', 'topics', 'seed')}
+
+
+def main(argv=None):
+    import os
+    import django
+
+    parser = argparse.ArgumentParser(description='Fill the configured database with a synthetic catalog')
+    add_arguments(parser)
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cms_backend.settings')
+    django.setup()
+    counts = generate(**options_dict(options))
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
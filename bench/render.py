@@ -0,0 +1,91 @@
+"""
+Serializer vs lean (``.values()``) rendering of the public catalog.
+
+    python -m bench.render [--programs 20] [--terms 5] [--lessons 10] [--repeat 7]
+
+Builds a throwaway test database with programs x terms x lessons published
+lessons, renders every catalog program both ways, checks the JSON is
+byte-identical, and reports median milliseconds per 1,000 lessons.
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+
+def _setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cms_backend.settings')
+    # Only the throwaway test database is written; don't open (and create) db.sqlite3
+    os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:')
+    import django
+    django.setup()
+
+
+def populate(programs, terms, lessons):
+    """Create a fully published catalog (see bench.dataset); returns the number of lessons."""
+    from .dataset import generate
+
+    return generate(programs, terms, lessons, languages=2, drafts=0, scheduled=0)['lessons']
+
+
+def _median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(repeat):
+    from rest_framework.renderers import JSONRenderer
+    from core import lean
+    from core.catalog import catalog_programs, catalog_program_prefetches
+    from core.serializers import CatalogProgramSerializer
+
+    renderer = JSONRenderer()
+
+    def programs():
+        return catalog_programs().order_by('-created_at', '-id')
+
+    def serializer_path():
+        return renderer.render(
+            CatalogProgramSerializer(programs().prefetch_related(*catalog_program_prefetches()), many=True).data
+        )
+
+    def lean_path():
+        return renderer.render(lean.render_programs(programs()))
+
+    if serializer_path() != lean_path():
+        raise SystemExit('Lean output differs from the serializers')
+    return _median_ms(serializer_path, repeat), _median_ms(lean_path, repeat)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--programs', type=int, default=20)
+    parser.add_argument('--terms', type=int, default=5, help='Terms per program')
+    parser.add_argument('--lessons', type=int, default=10, help='Published lessons per term')
+    parser.add_argument('--repeat', type=int, default=7)
+    options = parser.parse_args(argv)
+
+    _setup()
+    from django.db import connection
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        lessons = populate(options.programs, options.terms, options.lessons)
+        serializer_ms, lean_ms = run(options.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    per_1k = 1000 / lessons
+    print(f'{options.programs} program(s), {lessons} lesson(s); median of {options.repeat}, JSON rendering included')
+    print(f'serializers: {serializer_ms * per_1k:8.1f} ms per 1k lessons')
+    print(f'lean:        {lean_ms * per_1k:8.1f} ms per 1k lessons')
+    print(f'speedup:     {serializer_ms / lean_ms:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
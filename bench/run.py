@@ -0,0 +1,333 @@
+"""
+Latency, query-count and allocation benchmarks for the API, bulk writes and the scheduler.
+
+    python -m bench.run [--programs 20] [--terms 4] [--lessons 10] [--languages 3] [--topics 10] [--seed 0]
+                        [--repeat 30] [--bulk-size 100] [--only catalog,cms,bulk,publish] [--output results.json]
+    python -m bench.compare before.json after.json
+
+Builds a throwaway test database from bench.dataset and runs every case
+``--repeat`` times after one warm-up call, each call preceded by its untimed
+setup (catalog cases clear the catalog cache first unless they are marked
+``cached``). For each case it records latency percentiles, the number of
+queries (counted with ``connection.execute_wrapper``) and, from one extra call
+under tracemalloc, peak and retained Python allocations. Results are printed
+and, with ``--output``, written as JSON together with the dataset options
+and versions so bench.compare can line two runs up.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from . import dataset
+
+GROUPS = ('catalog', 'cms', 'bulk', 'publish')
+
+
+def _setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cms_backend.settings')
+    # Keep the benchmark's cache entries out of the file cache used for development
+    os.environ.setdefault('CATALOG_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+    # ...and don't open (and create) db.sqlite3 on the way to the test database;
+    # set DATABASE_URL to benchmark another server
+    os.environ.setdefault('DATABASE_URL', 'sqlite://:memory:')
+    import django
+    django.setup()
+
+
+class Case:
+    def __init__(self, name, call, setup=None):
+        self.name = name
+        self.call = call
+        self.setup = setup
+
+    def __call__(self):
+        if self.setup:
+            self.setup()
+        return self.call()
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered) + 0.5) - 1))]
+
+
+def measure(case, repeat):
+    from django.db import connection
+
+    case()  # warm-up: imports, connection setup, first-use caches
+    timings, queries = [], []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            case.call()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        case.call()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': repeat,
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p90_ms': round(percentile(timings, 0.90), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': int(statistics.median_low(queries)),
+        'queries_max': max(queries),
+        'alloc_peak_kib': round(peak / 1024, 1),
+        'alloc_retained_kib': round(retained / 1024, 1),
+    }
+
+
+def _get(client, path, **extra):
+    def call():
+        response = client.get(path, HTTP_ACCEPT='application/json', **extra)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {path} returned {response.status_code}')
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+    return call
+
+
+def _post(client, path, payload):
+    response = client.post(path, payload, format='json')
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f'POST {path} returned {response.status_code}: {response.content[:200]!r}')
+    return response
+
+
+def catalog_cases(client):
+    from core.cache import catalog_cache
+    from core.models import Lesson, Program
+
+    program = Program.objects.filter(published_lesson_count__gt=0).order_by('created_at', 'id').first()
+    lesson = Lesson.objects.filter(status='published').order_by('pk').first()
+    topic = program.topics.order_by('name').first()
+    cold = catalog_cache().clear
+    return [
+        Case('catalog.programs.list', _get(client, '/catalog/programs/'), cold),
+        Case('catalog.programs.list.cached', _get(client, '/catalog/programs/')),
+        Case('catalog.programs.list.cached.gzip', _get(client, '/catalog/programs/', HTTP_ACCEPT_ENCODING='gzip')),
+        Case(
+            'catalog.programs.list.filtered',
+            _get(client, f'/catalog/programs/?language={program.language_primary}&topic={topic.name if topic else ""}'),
+            cold,
+        ),
+        Case('catalog.programs.list.lang', _get(client, f'/catalog/programs/?lang={program.languages_available[-1]}'), cold),
+        Case('catalog.programs.detail', _get(client, f'/catalog/programs/{program.pk}/'), cold),
+        Case('catalog.lessons.detail', _get(client, f'/catalog/lessons/{lesson.pk}/'), cold),
+        Case('catalog.search', _get(client, '/catalog/search/?q=algebra'), cold),
+        Case('catalog.facets', _get(client, '/catalog/facets/'), cold),
+        Case('catalog.facets.filtered', _get(client, f'/catalog/facets/?language={program.language_primary}'), cold),
+        Case('catalog.export.ndjson', _get(client, '/catalog/export.ndjson')),
+    ]
+
+
+def cms_cases(client):
+    from core.models import Lesson, Program, Term, Topic
+
+    cases = []
+    for name, model in (('programs', Program), ('topics', Topic), ('terms', Term), ('lessons', Lesson)):
+        pk = model.objects.order_by('pk').values_list('pk', flat=True).first()
+        cases.append(Case(f'cms.{name}.list', _get(client, f'/api/{name}/')))
+        cases.append(Case(f'cms.{name}.detail', _get(client, f'/api/{name}/{pk}/')))
+    return cases
+
+
+def bulk_cases(client, size):
+    from core.importer import CatalogImporter, read_ndjson
+    from core.models import Lesson, Program, Term
+    from core.ndjson import iter_chunks
+
+    program = Program.objects.order_by('created_at', 'id').first()
+    state = {'term': None, 'round': 0}
+
+    def new_term():
+        # Each round creates its lessons in a fresh term
+        number = (Term.objects.filter(program=program).order_by('-term_number').first().term_number) + 1
+        state['term'] = Term.objects.create(program=program, term_number=number, title=f'Bench term {number}')
+
+    def create_lessons():
+        return _post(client, '/api/lessons/bulk/', [
+            {
+                'term_id': state['term'].pk,
+                'lesson_number': number,
+                'title': f'Bulk lesson {number}',
+                'content_type': 'video',
+                'content_language_primary': 'en',
+                'content_languages_available': ['en'],
+                'content_urls_by_language': {'en': f'https://cdn.example.com/bulk/{number}.mp4'},
+            }
+            for number in range(1, size + 1)
+        ])
+
+    lesson_ids = list(Lesson.objects.filter(status='published').order_by('pk').values_list('pk', flat=True)[:size])
+
+    def update_lessons():
+        state['round'] += 1
+        return _post(client, '/api/lessons/bulk/', [
+            {'id': pk, 'title': f'Renamed lesson {pk} ({state["round"]})'} for pk in lesson_ids
+        ])
+
+    dump = b''.join(iter_chunks()).decode()
+
+    def import_catalog():
+        CatalogImporter().run(read_ndjson(StringIO(dump)))
+
+    return [
+        Case(f'bulk.lessons.create.{size}', create_lessons, new_term),
+        Case(f'bulk.lessons.update.{size}', update_lessons),
+        Case('bulk.import_catalog.update', import_catalog),
+    ]
+
+
+def publish_cases(size):
+    from django.core.management import call_command
+    from django.utils import timezone
+    from core.models import Lesson
+
+    lesson_ids = list(Lesson.objects.filter(status='published').order_by('pk').values_list('pk', flat=True)[:size])
+
+    def reschedule():
+        Lesson.objects.filter(pk__in=lesson_ids).update(
+            status='scheduled', published_at=None, publish_at=timezone.now() - timedelta(minutes=1),
+        )
+
+    def publish():
+        call_command('publish_scheduled', '--batch-size', str(size), stdout=StringIO())
+
+    return [Case(f'publish_scheduled.{size}', publish, reschedule)]
+
+
+def run_benchmarks(repeat=30, bulk_size=100, only=GROUPS, report=None):
+    """Measure every case of the selected groups against the current database; returns results by case name."""
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    anonymous = APIClient()
+    staff = APIClient()
+    user, _ = get_user_model().objects.get_or_create(username='bench-staff', defaults={'is_staff': True})
+    staff.force_authenticate(user)
+
+    cases = []
+    if 'catalog' in only:
+        cases += catalog_cases(anonymous)
+    if 'cms' in only:
+        cases += cms_cases(anonymous)
+    if 'bulk' in only:
+        cases += bulk_cases(staff, bulk_size)
+    if 'publish' in only:
+        cases += publish_cases(bulk_size)
+
+    results = {}
+    for case in cases:
+        results[case.name] = measure(case, repeat)
+        if report:
+            report(case.name, results[case.name])
+    return results
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_row(name, result):
+    print(
+        f"{name:36}{result['p50_ms']:10.2f}{result['p90_ms']:10.2f}{result['p99_ms']:10.2f}"
+        f"{result['queries']:9d}{result['alloc_peak_kib']:12.1f}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    dataset.add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=30, help='Timed calls per case')
+    parser.add_argument('--bulk-size', type=int, default=100, help='Lessons per bulk write and publish run')
+    parser.add_argument(
+        '--only',
+        default=','.join(GROUPS),
+        help=f'Comma-separated groups to run: {", ".join(GROUPS)}',
+    )
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    options = parser.parse_args(argv)
+    only = [group.strip() for group in options.only.split(',') if group.strip()]
+    unknown = set(only) - set(GROUPS)
+    if unknown:
+        parser.error(f'unknown group(s): {", ".join(sorted(unknown))}')
+
+    _setup()
+    import django
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        counts = dataset.generate(**dataset.options_dict(options))
+        print(', '.join(f'{count} {name}' for name, count in counts.items()) + f'; {options.repeat} calls per case')
+        print(f"{'case':36}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'queries':>9}{'peak KiB':>12}")
+        results = run_benchmarks(options.repeat, options.bulk_size, only, report=_print_row)
+        database = f'{connection.display_name} {".".join(map(str, connection.get_database_version()))}'
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if options.output:
+        document = {
+            'meta': {
+                'created_at': datetime.now(dt_timezone.utc).isoformat(timespec='seconds'),
+                'revision': _git_revision(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': database,
+                'platform': platform.platform(),
+                'repeat': options.repeat,
+                'bulk_size': options.bulk_size,
+                'dataset': dataset.options_dict(options),
+                'counts': counts,
+            },
+            'results': results,
+        }
+        with open(options.output, 'w') as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+            output.write('\n')
+        print(f'Wrote {len(results)} result(s) to {options.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from bench import compare, dataset, run
+from core import cache
+from core.models import Program, Lesson, Topic
+
+
+class DatasetTests(TestCase):
+    def _snapshot(self):
+        return (
+            list(Program.objects.order_by('created_at').values_list('id', 'title', 'languages_available')),
+            list(
+                Lesson.objects.order_by('term__program__created_at', 'term__term_number', 'lesson_number')
+                .values_list('title', 'status', 'is_paid', 'content_urls_by_language')
+            ),
+        )
+
+    def test_same_arguments_give_the_same_rows(self):
+        counts = dataset.generate(programs=3, terms=2, lessons=5, languages=2, topics=4, seed=7)
+        self.assertEqual(counts['lessons'], 30)
+        self.assertEqual(Program.objects.filter(published_lesson_count__gt=0).count(), 3)
+        first = self._snapshot()
+
+        Program.objects.all().delete()
+        Topic.objects.all().delete()
+        dataset.generate(programs=3, terms=2, lessons=5, languages=2, topics=4, seed=7)
+        self.assertEqual(self._snapshot(), first)
+
+
+class RunnerTests(TestCase):
+    def test_every_group_is_measured(self):
+        cache.catalog_cache().clear()
+        dataset.generate(programs=2, terms=1, lessons=4, languages=2, topics=2, scheduled=0)
+        results = run.run_benchmarks(repeat=2, bulk_size=2)
+
+        self.assertIn('catalog.programs.list', results)
+        self.assertIn('cms.lessons.detail', results)
+        self.assertIn('bulk.lessons.create.2', results)
+        self.assertIn('publish_scheduled.2', results)
+        listing = results['catalog.programs.list']
+        self.assertGreater(listing['queries'], 0)
+        self.assertEqual(results['catalog.programs.list.cached']['queries'], 0)
+        self.assertLessEqual(listing['p50_ms'], listing['p99_ms'])
+
+        before = {'results': results}
+        after = {'results': {**results, 'cms.lessons.list': {**results['cms.lessons.list'], 'queries': 99}}}
+        regressions = {name: flagged for name, _, _, flagged in compare.compare(before, after)}
+        self.assertEqual(regressions['cms.lessons.list'], ['more queries'])
+        self.assertEqual(regressions['cms.lessons.detail'], [])
@@ -17,6 +17,9 @@ SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-me')
 
 DEBUG = os.getenv('DEBUG', 'False').lower() in ('1', 'true', 'yes', 'on')
 
+# Raise when a CMS list serializer lazily loads a relation (see core.eager)
+LAZY_LOAD_GUARD = os.getenv('LAZY_LOAD_GUARD', str(DEBUG)).lower() in ('1', 'true', 'yes', 'on')
+
 ALLOWED_HOSTS = [h.strip() for h in os.getenv('ALLOWED_HOSTS', '').split(',') if h.strip()]
 
 
@@ -37,6 +40,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so their timings cover the rest of the stack (see core.metrics, core.timing)
+    'core.metrics.MetricsMiddleware',
+    'core.timing.ServerTimingMiddleware',
+    'core.routers.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,6 +83,94 @@ DATABASES = {
     )
 }
 
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Take the write lock when a transaction starts, so concurrent writers (web,
+    # scheduler workers) wait for each other instead of failing with "database is locked"
+    DATABASES['default'].setdefault('OPTIONS', {})['transaction_mode'] = 'IMMEDIATE'
+
+# Read replicas: comma-separated database URLs. Safe requests read from them;
+# writes, pinned clients and management commands use the primary (see core.routers)
+REPLICA_DATABASES = []
+for number, url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    alias = f'replica{number}'
+    DATABASES[alias] = dj_database_url.parse(url.strip(), conn_max_age=600)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# How long a client that wrote keeps reading from the primary
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The catalog cache must be shared by the web and worker processes so that
+# publishes invalidate it immediately; the file-based backend does that on one host.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': os.getenv('CATALOG_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CATALOG_CACHE_LOCATION', str(BASE_DIR / '.cache' / 'catalog')),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CATALOG_CACHE_MAX_ENTRIES', 2000)),
+            'CULL_FREQUENCY': 4,
+        },
+    },
+}
+
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 3600))
+# Upper bound for entries filled from a replica, which may lag behind the write that invalidated them
+CATALOG_REPLICA_CACHE_TIMEOUT = int(os.getenv('CATALOG_REPLICA_CACHE_TIMEOUT', 60))
+
+# Precompressed catalog responses (see core.compression): bodies of at least
+# CATALOG_COMPRESSION_MIN_SIZE bytes are compressed with each codec once, when cached
+CATALOG_COMPRESSION = os.getenv('CATALOG_COMPRESSION', 'True').lower() in ('1', 'true', 'yes', 'on')
+CATALOG_COMPRESSION_CODECS = [name.strip() for name in os.getenv('CATALOG_COMPRESSION_CODECS', 'gzip').split(',') if name.strip()]
+CATALOG_COMPRESSION_MIN_SIZE = int(os.getenv('CATALOG_COMPRESSION_MIN_SIZE', 1024))
+
+# Render full catalog payloads from .values() rows instead of the serializers (see core.lean)
+CATALOG_LEAN_RENDERING = os.getenv('CATALOG_LEAN_RENDERING', 'True').lower() in ('1', 'true', 'yes', 'on')
+
+# Route the public catalog to the native async views (see core.catalog_async);
+# enable when serving cms_backend.asgi with an ASGI server
+CATALOG_ASYNC_VIEWS = os.getenv('CATALOG_ASYNC_VIEWS', 'False').lower() in ('1', 'true', 'yes', 'on')
+
+# Where export_catalog writes the static JSON catalog (see core.export)
+CATALOG_EXPORT_DIR = os.getenv('CATALOG_EXPORT_DIR', str(BASE_DIR / 'export' / 'catalog'))
+
+# Server-Timing header and a per-request timing log line on a sample of requests (see core.timing)
+SERVER_TIMING = os.getenv('SERVER_TIMING', 'False').lower() in ('1', 'true', 'yes', 'on')
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '0.1'))
+
+# Prometheus metrics at /metrics (see core.metrics). Every web and worker process
+# writes its values under METRICS_DIR, which must be shared by them and emptied on deploy
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False').lower() in ('1', 'true', 'yes', 'on')
+METRICS_DIR = os.getenv('METRICS_DIR', str(BASE_DIR / '.metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1.0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
+# publish_scheduled --daemon wakeup channel (UDP); port 0 disables wakeups
+PUBLISH_WAKEUP_HOST = os.getenv('PUBLISH_WAKEUP_HOST', '127.0.0.1')
+PUBLISH_WAKEUP_BIND = os.getenv('PUBLISH_WAKEUP_BIND', '127.0.0.1')
+PUBLISH_WAKEUP_PORT = int(os.getenv('PUBLISH_WAKEUP_PORT', 8765))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,6 +223,7 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
+        'core.search.FullTextSearchFilter',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
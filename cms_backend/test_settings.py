@@ -0,0 +1,29 @@
+"""
+Settings for the test suite; ``manage.py test`` uses them unless
+DJANGO_SETTINGS_MODULE says otherwise.
+
+The catalog cache is in-memory here, so the tests (which clear it) neither wipe
+nor see the file cache of a development server on the same checkout.
+
+core.tests_replicas reads from a ``replica`` alias: an in-memory test database
+of its own that only changes when the tests copy the primary into it. Only
+tests that list it in ``databases`` create or touch it, and reads go there only
+under their REPLICA_DATABASES override.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES, DATABASES
+
+CACHES = {
+    **CACHES,
+    'catalog': {
+        **CACHES['catalog'],
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog-tests',
+    },
+}
+
+DATABASES = {
+    **DATABASES,
+    'replica': {**DATABASES['default'], 'TEST': {'NAME': None, 'MIRROR': None}},
+}
@@ -14,14 +14,27 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
+from core.metrics import metrics_view
 from core.views import ProgramViewSet, TopicViewSet, TermViewSet, LessonViewSet
-from core.catalog_views import list_catalog_programs, get_catalog_program, get_catalog_lesson
+from core.catalog_views import (
+    list_catalog_programs, get_catalog_program, get_catalog_lesson, search_catalog, catalog_facets,
+    export_catalog_ndjson,
+)
+
+if settings.CATALOG_ASYNC_VIEWS:
+    from core.catalog_async import (
+        alist_catalog_programs as list_catalog_programs,
+        aget_catalog_program as get_catalog_program,
+        aget_catalog_lesson as get_catalog_lesson,
+        aexport_catalog_ndjson as export_catalog_ndjson,
+    )
 
 router = DefaultRouter()
 router.register(r'programs', ProgramViewSet)
@@ -39,6 +52,10 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('catalog/programs/', list_catalog_programs, name='catalog-programs'),
     path('catalog/programs/<uuid:id>/', get_catalog_program, name='catalog-program-detail'),
-    path('catalog/lessons/<uuid:id>/', get_catalog_lesson, name='catalog-lesson-detail'),
+    path('catalog/lessons/<int:id>/', get_catalog_lesson, name='catalog-lesson-detail'),
+    path('catalog/search/', search_catalog, name='catalog-search'),
+    path('catalog/facets/', catalog_facets, name='catalog-facets'),
+    path('catalog/export.ndjson', export_catalog_ndjson, name='catalog-export-ndjson'),
+    path('metrics', metrics_view, name='metrics'),
 ]
 
@@ -0,0 +1,167 @@
+"""Bulk create/update support for the CMS viewsets."""
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .signals import post_bulk_save
+
+
+class BulkWriteMixin:
+    """
+    ``POST <list-url>/bulk/`` with a JSON list of objects.
+
+    Items carrying an ``id`` partially update that object, the rest are created.
+    The whole list is validated first, with related objects resolved by a single
+    IN query; any error rejects the request with one error entry per item.
+    Valid lists are persisted with bulk_create/bulk_update in one transaction.
+    """
+    bulk_max_items = 1000
+    # (serializer field, related model, select_related for the response)
+    bulk_related_field = None
+    # select_related applied to objects loaded for update
+    bulk_select_related = ()
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response(
+                {'detail': 'Expected a non-empty list of objects.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'detail': f'At most {self.bulk_max_items} objects can be written per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        model = self.get_queryset().model
+        serializer_class = self.get_serializer_class()
+        context = {
+            **self.get_serializer_context(),
+            'bulk': True,
+            'related_instances': self._load_related(items),
+        }
+
+        pks = [self._to_pk(model, item['id']) for item in items if item.get('id') is not None]
+        existing = model.objects.select_related(*self.bulk_select_related).in_bulk(
+            [pk for pk in pks if pk is not None]
+        )
+
+        serializers, errors = [], []
+        for item in items:
+            instance = None
+            if item.get('id') is not None:
+                instance = existing.get(self._to_pk(model, item['id']))
+                if instance is None:
+                    serializers.append(None)
+                    errors.append({'id': ['Not found.']})
+                    continue
+            serializer = serializer_class(instance, data=item, partial=instance is not None, context=context)
+            serializers.append(serializer)
+            errors.append({} if serializer.is_valid() else serializer.errors)
+
+        self._check_unique_together(model, serializers, errors)
+        if any(errors):
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            created, updated, objects = self._persist(model, serializers)
+        except IntegrityError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
+
+        return Response(
+            {
+                'created': len(created),
+                'updated': len(updated),
+                'results': serializer_class(objects, many=True, context=context).data,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    def _load_related(self, items):
+        if not self.bulk_related_field:
+            return {}
+        field_name, related_model, select_related = self.bulk_related_field
+        pks = {self._to_pk(related_model, item.get(field_name)) for item in items}
+        pks.discard(None)
+        return {related_model: related_model.objects.select_related(*select_related).in_bulk(pks)}
+
+    @staticmethod
+    def _to_pk(model, value):
+        try:
+            return model._meta.pk.to_python(value)
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+
+    @staticmethod
+    def _unique_value(serializer, model, field_name):
+        field = model._meta.get_field(field_name)
+        if field_name in serializer.validated_data:
+            value = serializer.validated_data[field_name]
+            return value.pk if field.is_relation else value
+        return getattr(serializer.instance, field.attname, None)
+
+    def _check_unique_together(self, model, serializers, errors):
+        """Check unique_together within the batch and against stored rows with one query per constraint."""
+        for fields in model._meta.unique_together:
+            message = f'The fields {", ".join(fields)} must make a unique set.'
+            claimed = {}
+            for index, serializer in enumerate(serializers):
+                if serializer is None or errors[index]:
+                    continue
+                key = tuple(self._unique_value(serializer, model, name) for name in fields)
+                if key in claimed:
+                    errors[index] = {'non_field_errors': [message]}
+                    continue
+                claimed[key] = index
+            if not claimed:
+                continue
+
+            attnames = [model._meta.get_field(name).attname for name in fields]
+            lookup = {
+                f'{attname}__in': {key[position] for key in claimed}
+                for position, attname in enumerate(attnames)
+            }
+            for pk, *values in model.objects.filter(**lookup).values_list('pk', *attnames):
+                index = claimed.get(tuple(values))
+                if index is None:
+                    continue
+                instance = serializers[index].instance
+                if instance is None or instance.pk != pk:
+                    errors[index] = {'non_field_errors': [message]}
+
+    def _persist(self, model, serializers):
+        created, updated, objects = [], [], []
+        update_fields = set()
+        now = timezone.now()
+        has_updated_at = any(field.name == 'updated_at' for field in model._meta.concrete_fields)
+
+        for serializer in serializers:
+            if serializer.instance is None:
+                obj = model(**serializer.validated_data)
+                created.append(obj)
+            else:
+                obj = serializer.instance
+                for attr, value in serializer.validated_data.items():
+                    setattr(obj, attr, value)
+                    update_fields.add(attr)
+                if has_updated_at:
+                    # bulk_update skips auto_now
+                    obj.updated_at = now
+                updated.append(obj)
+            objects.append(obj)
+
+        with transaction.atomic():
+            model.objects.bulk_create(created)
+            if updated and update_fields:
+                if has_updated_at:
+                    update_fields.add('updated_at')
+                model.objects.bulk_update(updated, sorted(update_fields))
+            post_bulk_save.send(sender=model, created=created, updated=updated)
+
+        return created, updated, objects
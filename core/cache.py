@@ -0,0 +1,79 @@
+"""
+Server-side cache for public catalog responses.
+
+Entries are grouped into scopes (``lists``, ``program:<id>``, ``lesson:<id>``).
+Each scope has a random token that is part of every entry key, so deleting the
+token invalidates every cached variant of that scope at once.
+"""
+
+import hashlib
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics, routers
+
+
+LISTS_SCOPE = 'lists'
+
+
+def catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def program_scope(program_id):
+    return f'program:{program_id}'
+
+
+def lesson_scope(lesson_id):
+    return f'lesson:{lesson_id}'
+
+
+def _token_key(scope):
+    return f'catalog:token:{scope}'
+
+
+def _scope_token(cache, scope):
+    key = _token_key(scope)
+    token = cache.get(key)
+    if token is None:
+        # add() keeps the first token if another process races us here
+        token = uuid.uuid4().hex
+        cache.add(key, token, timeout=None)
+        token = cache.get(key) or token
+    return token
+
+
+def cache_key(scope, params=None):
+    """Key for one cached variant of ``scope``; ``params`` are the parsed request options."""
+    cache = catalog_cache()
+    normalized = sorted((name, str(value)) for name, value in (params or {}).items() if value not in (None, ''))
+    digest = hashlib.md5(urlencode(normalized).encode()).hexdigest()
+    return f'catalog:{scope}:{_scope_token(cache, scope)}:{digest}'
+
+
+def get_cached(key):
+    entry = catalog_cache().get(key)
+    metrics.CATALOG_CACHE.inc(result='miss' if entry is None else 'hit')
+    return entry
+
+
+def set_cached(key, data):
+    timeout = settings.CATALOG_CACHE_TIMEOUT
+    if routers.reading_from_replica():
+        timeout = min(timeout, settings.CATALOG_REPLICA_CACHE_TIMEOUT)
+    catalog_cache().set(key, data, timeout=timeout)
+
+
+def invalidate(program_ids=(), lesson_ids=()):
+    """Drop cached responses for the given programs and lessons and every list page."""
+    scopes = [LISTS_SCOPE]
+    scopes.extend(program_scope(pk) for pk in program_ids)
+    scopes.extend(lesson_scope(pk) for pk in lesson_ids)
+    catalog_cache().delete_many([_token_key(scope) for scope in scopes])
+
+
+def invalidate_all():
+    catalog_cache().clear()
@@ -0,0 +1,124 @@
+"""Shared querysets for the public catalog read path."""
+
+from django.db.models import Exists, OuterRef, Prefetch
+from .models import Program, Term, Lesson, LessonContent, Topic
+from .serializers import CatalogLessonSerializer, CatalogProgramSerializer
+
+
+def published_lessons_queryset():
+    return Lesson.objects.filter(status='published').order_by('lesson_number')
+
+
+def catalog_topics_queryset():
+    # Both render paths (serializers and core.lean) list topics in this order
+    return Topic.objects.order_by('name', 'id')
+
+
+def _columns(model, sparse, path, names):
+    """Concrete columns among ``names`` that a sparse request selected at ``path``."""
+    concrete = {field.name for field in model._meta.concrete_fields}
+    return [name for name in names if name in concrete and sparse.includes(path, name)]
+
+
+def catalog_program_columns(sparse):
+    """Program columns for a sparse catalog response; created_at backs cursor pagination, updated_at the validators."""
+    return ['created_at', 'updated_at', *_columns(Program, sparse, '', CatalogProgramSerializer.Meta.fields)]
+
+
+def catalog_program_prefetches(sparse=None, lang=None):
+    """
+    Prefetches that load program -> terms -> published lessons -> topics
+    in a fixed number of queries regardless of how many programs are loaded.
+
+    For a sparse request (see core.sparse) only the requested relations are
+    prefetched; collapsed ones load just their keys, and empty terms are
+    skipped via the publication rollups instead of by loading lessons.
+    With ``lang`` only lessons available in that language are loaded, and
+    terms left without lessons are skipped like empty ones.
+    """
+    if sparse is not None:
+        return _sparse_catalog_prefetches(sparse, lang)
+    lessons = published_lessons_queryset()
+    if lang:
+        lessons = lessons_in_language(lessons, lang)
+    return [
+        Prefetch('topics', queryset=catalog_topics_queryset()),
+        Prefetch(
+            'terms',
+            queryset=Term.objects.order_by('term_number').prefetch_related(
+                Prefetch('lessons', queryset=lessons, to_attr='published_lessons'),
+            ),
+            to_attr='catalog_terms',
+        ),
+    ]
+
+
+def _sparse_catalog_prefetches(sparse, lang):
+    prefetches = []
+    if sparse.includes('', 'topics'):
+        topics = catalog_topics_queryset()
+        if not sparse.expands('topics'):
+            topics = topics.only('id')
+        prefetches.append(Prefetch('topics', queryset=topics))
+
+    if sparse.includes('', 'terms'):
+        terms = Term.objects.filter(published_lesson_count__gt=0).order_by('term_number')
+        if lang:
+            terms = terms_in_language(terms, lang)
+        if not sparse.expands('terms'):
+            terms = terms.only('id', 'program')
+        else:
+            terms = terms.only('id', 'program', *_columns(Term, sparse, 'terms', ('term_number', 'title')))
+            if sparse.includes('terms', 'lessons'):
+                lessons = published_lessons_queryset()
+                if lang:
+                    lessons = lessons_in_language(lessons, lang)
+                if sparse.expands('terms.lessons'):
+                    columns = _columns(Lesson, sparse, 'terms.lessons', CatalogLessonSerializer.Meta.fields)
+                    lessons = lessons.only('id', 'term', *columns)
+                else:
+                    lessons = lessons.only('id', 'term')
+                terms = terms.prefetch_related(
+                    Prefetch('lessons', queryset=lessons, to_attr='published_lessons'),
+                )
+        prefetches.append(Prefetch('terms', queryset=terms, to_attr='catalog_terms'))
+
+    return prefetches
+
+
+def catalog_programs():
+    """Programs that have at least one published lesson (see core.rollups)."""
+    return Program.objects.filter(published_lesson_count__gt=0)
+
+
+def filter_catalog_programs(queryset, language=None, topic=None, lang=None):
+    """The public catalog's program filters: language_primary, topic name and content language."""
+    if language:
+        queryset = queryset.filter(language_primary=language)
+    if lang:
+        queryset = programs_in_language(queryset, lang)
+    if topic:
+        # Match topics first so the through table is probed by topic_id
+        queryset = queryset.filter(topics__in=Topic.objects.filter(name__icontains=topic)).distinct()
+    return queryset
+
+
+def lessons_in_language(queryset, language):
+    """Lessons of ``queryset`` whose content is available in ``language`` (see core.contents)."""
+    return queryset.filter(contents__language=language)
+
+
+def terms_in_language(queryset, language):
+    """Terms of ``queryset`` with a published lesson available in ``language``."""
+    return queryset.filter(Exists(
+        LessonContent.objects.filter(language=language, lesson__status='published', lesson__term=OuterRef('pk'))
+    ))
+
+
+def programs_in_language(queryset, language):
+    """Programs of ``queryset`` with a published lesson available in ``language``."""
+    return queryset.filter(Exists(
+        LessonContent.objects.filter(
+            language=language, lesson__status='published', lesson__term__program=OuterRef('pk'),
+        )
+    ))
@@ -1,9 +1,60 @@
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework.decorators import api_view
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q, Exists, OuterRef
-from .models import Program, Lesson
+from . import cache, compression, contents, facets, lean, ndjson, search, timing
+from .conditional import check_not_modified, etag_for, set_validators, watermark
+from .models import Lesson
+from .catalog import (
+    catalog_programs, catalog_program_columns, catalog_program_prefetches, filter_catalog_programs, lessons_in_language,
+    programs_in_language,
+)
+from .pagination import CatalogCursorPagination
 from .serializers import CatalogProgramSerializer, CatalogLessonSerializer
+from .sparse import SparseFieldset, project_queryset
+
+CACHE_CONTROL = 'public, max-age=300'  # Cache for 5 minutes
+
+
+def _not_modified(request, params, entry):
+    """304 when the request's validators match a cached or just-computed entry."""
+    response = check_not_modified(request, etag_for(request, params, entry['watermark']), entry['last_modified'])
+    if response is not None:
+        response['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def _detail_params(sparse, lang):
+    """Cache and validator params of a detail variant; None for the plain representation."""
+    params = sparse.cache_params() if sparse else {}
+    if lang:
+        params['lang'] = lang
+    return params or None
+
+
+def _plain_json(request):
+    """Whether the response renders as compact JSON, the body core.compression precompresses."""
+    renderer = request.accepted_renderer
+    return isinstance(renderer, JSONRenderer) and request.accepted_media_type == renderer.media_type
+
+
+def _respond(request, params, entry):
+    """
+    Serve a cache entry ({'watermark', 'last_modified', 'data', 'encodings'})
+    with validators and cache headers, precompressed when the client accepts it.
+    """
+    response = _not_modified(request, params, entry)
+    if response is None:
+        if _plain_json(request):
+            response = compression.compressed_response(request, entry)
+        if response is None:
+            response = Response(entry['data'])
+        set_validators(response, etag_for(request, params, entry['watermark']), entry['last_modified'])
+        response['Cache-Control'] = CACHE_CONTROL
+    return compression.finalize(response, entry)
 
 
 @api_view(['GET'])
@@ -11,112 +62,273 @@ def list_catalog_programs(request):
     """
     List all programs that have at least one published lesson.
     Supports filters: language (language_primary), topic (topic name)
+    lang keeps programs with a published lesson available in that language
+    (see core.contents), lists only such lessons and narrows their URLs to it
     Supports pagination: limit (default 10), offset (default 0)
+    Cursor mode (pagination=cursor or a cursor param) pages by (created_at, id)
+    with next/previous links and no total count.
+    Supports sparse fieldsets: fields, expand (see core.sparse)
+    Supports conditional GET: ETag / Last-Modified (see core.conditional)
     """
     # Get query parameters
     language = request.GET.get('language')
     topic_filter = request.GET.get('topic')
+    lang = request.GET.get('lang')
     limit = int(request.GET.get('limit', 10))
     offset = int(request.GET.get('offset', 0))
-    
-    # Subquery to check if program has published lessons
-    published_lessons_exist = Lesson.objects.filter(
-        term__program=OuterRef('pk'),
-        status='published'
-    )
-    
-    # Base query: only programs with published lessons
-    queryset = Program.objects.filter(
-        Exists(published_lessons_exist)
-    ).distinct()
-    
-    # Apply language filter
-    if language:
-        queryset = queryset.filter(language_primary=language)
-    
-    # Apply topic filter
-    if topic_filter:
-        queryset = queryset.filter(
-            topics__name__icontains=topic_filter
-        ).distinct()
-    
-    # Get total count before pagination
-    total_count = queryset.count()
-    
-    # Apply pagination
-    programs = queryset[offset:offset + limit]
-    
-    # Serialize
-    serializer = CatalogProgramSerializer(programs, many=True)
-    
-    # Prepare response with pagination metadata
-    response_data = {
-        'count': total_count,
-        'limit': limit,
-        'offset': offset,
-        'results': serializer.data
-    }
-    
-    # Create response with cache headers
-    response = Response(response_data)
-    response['Cache-Control'] = 'public, max-age=300'  # Cache for 5 minutes
-    
-    return response
+    cursor = request.GET.get('cursor')
+    use_cursor = bool(cursor) or request.GET.get('pagination') == 'cursor'
+    sparse = SparseFieldset.from_request(request)
+    context = {'sparse': sparse} if sparse else {}
+
+    params = {'language': language, 'topic': topic_filter, 'limit': limit}
+    if lang:
+        params['lang'] = lang
+    if use_cursor:
+        # Links are absolute, so the host is part of the variant
+        params.update({'cursor': cursor or '', 'mode': 'cursor', 'host': request.get_host()})
+    else:
+        params['offset'] = offset
+    if sparse:
+        params.update(sparse.cache_params())
+    key = cache.cache_key(cache.LISTS_SCOPE, params)
+    entry = cache.get_cached(key)
+
+    if entry is None:
+        # Base query: only programs with published lessons, filtered
+        queryset = filter_catalog_programs(catalog_programs(), language, topic_filter, lang)
+
+        if sparse:
+            queryset = queryset.only(*catalog_program_columns(sparse))
+
+        # A program's updated_at covers its whole tree (see core.rollups), so the
+        # page is validated before the tree is prefetched and serialized
+        if use_cursor:
+            paginator = CatalogCursorPagination()
+            programs = paginator.paginate_queryset(queryset, request, page_size=limit)
+            entry = {
+                'watermark': (
+                    [(program.pk, program.updated_at) for program in programs],
+                    paginator.next_position,
+                    paginator.previous_position,
+                ),
+                'last_modified': max((program.updated_at for program in programs), default=None),
+            }
+        else:
+            # The total count comes from the same aggregate as the watermark
+            total_count, last_modified = watermark(queryset)
+            entry = {'watermark': (total_count, last_modified), 'last_modified': last_modified}
+
+        not_modified = _not_modified(request, params, entry)
+        if not_modified is not None:
+            return not_modified
+
+        # The whole program tree loads in a fixed number of queries
+        if not use_cursor:
+            # Apply pagination
+            programs = queryset.order_by('-created_at', '-id')[offset:offset + limit]
+
+        # Serialize
+        with timing.phase('serialize'):
+            if sparse:
+                if use_cursor:
+                    prefetch_related_objects(programs, *catalog_program_prefetches(sparse, lang))
+                else:
+                    programs = programs.prefetch_related(*catalog_program_prefetches(sparse, lang))
+                results = CatalogProgramSerializer(programs, many=True, context=context).data
+            else:
+                results = lean.program_data(programs, lang)
+            if lang:
+                contents.project_programs(results, lang)
+
+        if use_cursor:
+            entry['data'] = paginator.get_paginated_data(results)
+        else:
+            # Prepare response with pagination metadata
+            entry['data'] = {
+                'count': total_count,
+                'limit': limit,
+                'offset': offset,
+                'results': results
+            }
+        cache.set_cached(key, compression.precompress(entry))
+
+    return _respond(request, params, entry)
 
 
 @api_view(['GET'])
 def get_catalog_program(request, id):
     """
     Get a single program by ID.
-    Only returns if the program has at least one published lesson.
+    Only returns if the program has at least one published lesson
+    (with lang, one available in that language; only lessons available in it
+    are listed, with their URLs narrowed to it).
+    Supports sparse fieldsets: fields, expand (see core.sparse)
+    Supports conditional GET: ETag / Last-Modified (see core.conditional)
     """
-    try:
-        # Check if program has published lessons
-        published_lessons_exist = Lesson.objects.filter(
-            term__program_id=id,
-            status='published'
-        ).exists()
-        
-        if not published_lessons_exist:
+    sparse = SparseFieldset.from_request(request)
+    lang = request.GET.get('lang')
+    params = _detail_params(sparse, lang)
+    key = cache.cache_key(cache.program_scope(id), params)
+    entry = cache.get_cached(key)
+
+    if entry is None:
+        queryset = catalog_programs().filter(id=id)
+        if lang:
+            queryset = programs_in_language(queryset, lang)
+        if sparse:
+            queryset = queryset.only(*catalog_program_columns(sparse))
+        program = queryset.first()
+
+        if program is None:
             return Response(
                 {'error': 'Program not found or has no published content'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        
-        program = Program.objects.get(id=id)
-        serializer = CatalogProgramSerializer(program)
-        
-        # Create response with cache headers
-        response = Response(serializer.data)
-        response['Cache-Control'] = 'public, max-age=300'  # Cache for 5 minutes
-        
-        return response
-        
-    except Program.DoesNotExist:
-        return Response(
-            {'error': 'Program not found'},
-            status=status.HTTP_404_NOT_FOUND
-        )
+
+        entry = {'watermark': program.updated_at, 'last_modified': program.updated_at}
+        not_modified = _not_modified(request, params, entry)
+        if not_modified is not None:
+            return not_modified
+
+        with timing.phase('serialize'):
+            if sparse:
+                prefetch_related_objects([program], *catalog_program_prefetches(sparse, lang))
+                entry['data'] = CatalogProgramSerializer(program, context={'sparse': sparse}).data
+            else:
+                entry['data'] = lean.program_data([program], lang)[0]
+            if lang:
+                contents.project_programs([entry['data']], lang)
+        cache.set_cached(key, compression.precompress(entry))
+
+    return _respond(request, params, entry)
 
 
 @api_view(['GET'])
 def get_catalog_lesson(request, id):
     """
     Get a single lesson by ID.
-    Only returns published lessons.
+    Only returns published lessons (with lang, only if available in that
+    language; its URLs are narrowed to it).
+    Supports sparse fieldsets: fields (see core.sparse)
+    Supports conditional GET: ETag / Last-Modified (see core.conditional)
     """
-    try:
-        lesson = Lesson.objects.get(id=id, status='published')
-        serializer = CatalogLessonSerializer(lesson)
-        
-        # Create response with cache headers
-        response = Response(serializer.data)
-        response['Cache-Control'] = 'public, max-age=300'  # Cache for 5 minutes
-        
-        return response
-        
-    except Lesson.DoesNotExist:
+    sparse = SparseFieldset.from_request(request)
+    lang = request.GET.get('lang')
+    params = _detail_params(sparse, lang)
+    key = cache.cache_key(cache.lesson_scope(id), params)
+    entry = cache.get_cached(key)
+
+    if entry is None:
+        context = {'sparse': sparse} if sparse else {}
+        queryset = Lesson.objects.all()
+        if lang:
+            queryset = lessons_in_language(queryset, lang)
+        if sparse:
+            queryset = project_queryset(queryset, CatalogLessonSerializer(context=context), also=('updated_at',))
+        try:
+            lesson = queryset.get(id=id, status='published')
+        except Lesson.DoesNotExist:
+            return Response(
+                {'error': 'Lesson not found or not published'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        entry = {'watermark': lesson.updated_at, 'last_modified': lesson.updated_at}
+        not_modified = _not_modified(request, params, entry)
+        if not_modified is not None:
+            return not_modified
+
+        with timing.phase('serialize'):
+            if sparse:
+                entry['data'] = CatalogLessonSerializer(lesson, context=context).data
+            else:
+                entry['data'] = lean.lesson_data(lesson)
+            if lang:
+                contents.project_lesson(entry['data'], lang)
+        cache.set_cached(key, compression.precompress(entry))
+
+    return _respond(request, params, entry)
+
+
+@api_view(['GET'])
+def search_catalog(request):
+    """
+    Full-text search over the public catalog, ranked by relevance.
+    Query parameters: q (required), limit (default 10, max 50) per result type
+    Returns matching programs (with their published tree) and published lessons.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
         return Response(
-            {'error': 'Lesson not found or not published'},
-            status=status.HTTP_404_NOT_FOUND
+            {'error': 'Provide a search query with q'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    limit = min(int(request.GET.get('limit', 10)), 50)
+
+    params = {'mode': 'search', 'q': query, 'limit': limit}
+    key = cache.cache_key(cache.LISTS_SCOPE, params)
+    data = cache.get_cached(key)
+
+    if data is None:
+        programs = (
+            search.search(catalog_programs(), search.PROGRAM, query)
+            .order_by('-search_rank', 'pk')
+            .prefetch_related(*catalog_program_prefetches())[:limit]
         )
+        lessons = (
+            search.search(Lesson.objects.filter(status='published'), search.LESSON, query)
+            .order_by('-search_rank', 'pk')[:limit]
+        )
+        with timing.phase('serialize'):
+            data = {
+                'query': query,
+                'programs': CatalogProgramSerializer(programs, many=True).data,
+                'lessons': CatalogLessonSerializer(lessons, many=True).data,
+            }
+        cache.set_cached(key, data)
+
+    response = Response(data)
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+@api_view(['GET'])
+def catalog_facets(request):
+    """
+    Catalog program counts per topic, language (language_primary), content_type
+    and paid/free (see core.facets).
+    Supports the program list filters: language, topic, lang
+    Unfiltered counts are read from the maintained counters; filtered ones come
+    from one aggregate query over the filtered programs.
+    """
+    language = request.GET.get('language')
+    topic_filter = request.GET.get('topic')
+    lang = request.GET.get('lang')
+
+    params = {'mode': 'facets', 'language': language, 'topic': topic_filter, 'lang': lang}
+    key = cache.cache_key(cache.LISTS_SCOPE, params)
+    data = cache.get_cached(key)
+
+    if data is None:
+        if language or topic_filter or lang:
+            result = facets.filtered_counts(filter_catalog_programs(catalog_programs(), language, topic_filter, lang))
+        else:
+            result = facets.counts()
+        data = facets.facet_data(result)
+        cache.set_cached(key, data)
+
+    response = Response(data)
+    response['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+@require_GET
+def export_catalog_ndjson(request):
+    """
+    Stream the whole public catalog as newline-delimited JSON (see core.ndjson):
+    one line per program followed by one line per published lesson.
+    """
+    response = StreamingHttpResponse(ndjson.iter_chunks(), content_type=ndjson.CONTENT_TYPE)
+    response['Content-Disposition'] = 'inline; filename="catalog.ndjson"'
+    return response
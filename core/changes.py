@@ -0,0 +1,48 @@
+"""Keep data derived from the catalog in sync after writes."""
+
+from django.db import transaction
+
+from . import cache, facets
+from .rollups import refresh_rollups
+
+
+def catalog_changed(program_ids=(), term_ids=(), lesson_ids=()):
+    """
+    Entry point for every write that can change what the public catalog shows.
+
+    Model signals call this for single-object saves; bulk writers (which bypass
+    signals) must call it themselves with the affected ids.
+    """
+    program_ids = refresh_rollups(term_ids=term_ids, program_ids=program_ids)
+    # Facet values depend on the rollups (catalog membership), so they follow them
+    facets.refresh(program_ids)
+    lesson_ids = set(lesson_ids)
+
+    def _invalidate():
+        cache.invalidate(program_ids=program_ids, lesson_ids=lesson_ids)
+
+    # Invalidate now and again after commit, so entries rebuilt from
+    # pre-commit data by concurrent readers don't survive the transaction.
+    _invalidate()
+    transaction.on_commit(_invalidate)
+
+
+class AtomicWriteMixin:
+    """
+    Runs a viewset's create, update and destroy in one transaction, so a model
+    write and what the signals derive from it (rollups, facets, lesson contents,
+    search documents) commit together or not at all. Bulk writes get the same
+    from core.bulk, which sends post_bulk_save inside its transaction.
+    """
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            super().perform_update(serializer)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            super().perform_destroy(instance)
@@ -0,0 +1,122 @@
+"""
+Precompressed catalog responses.
+
+When a catalog view fills a cache entry it renders the JSON body once and
+stores a compressed copy per codec in CATALOG_COMPRESSION_CODECS next to the
+data (``entry['encodings']``), unless the body is smaller than
+CATALOG_COMPRESSION_MIN_SIZE bytes, where compression saves too little to be
+worth it. A JSON request whose Accept-Encoding allows one of those codecs is
+answered with the stored bytes as they are, so a cache hit neither renders
+nor compresses anything.
+
+Codecs are the HTTP content-codings the standard library implements: gzip and
+deflate, plus zstd on Python 3.14+. A compressed response carries a weak ETag
+(its bytes differ from the identity representation, its meaning doesn't), the
+same thing Django's GZipMiddleware does.
+"""
+
+import gzip
+import zlib
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+
+from . import timing
+
+try:
+    from compression import zstd
+except ImportError:  # Python < 3.14
+    zstd = None
+
+CODECS = {
+    # mtime=0 keeps the bytes (and anything keyed on them) stable across fills
+    'gzip': partial(gzip.compress, compresslevel=6, mtime=0),
+    # HTTP "deflate" is the zlib format
+    'deflate': partial(zlib.compress, level=6),
+}
+if zstd is not None:
+    CODECS['zstd'] = zstd.compress
+
+_renderer = JSONRenderer()
+
+
+def _codecs():
+    names = settings.CATALOG_COMPRESSION_CODECS
+    unknown = [name for name in names if name not in CODECS]
+    if unknown:
+        raise ImproperlyConfigured(
+            f'Unsupported CATALOG_COMPRESSION_CODECS: {", ".join(unknown)} (available: {", ".join(CODECS)})'
+        )
+    return names
+
+
+def precompress(entry):
+    """Store the compressed JSON bodies of ``entry['data']`` in ``entry['encodings']``; returns the entry."""
+    encodings = {}
+    if settings.CATALOG_COMPRESSION:
+        with timing.phase('compress'):
+            content = _renderer.render(entry['data'])
+            if len(content) >= settings.CATALOG_COMPRESSION_MIN_SIZE:
+                encodings = {name: CODECS[name](content) for name in _codecs()}
+    entry['encodings'] = encodings
+    return entry
+
+
+def _accepted(header):
+    """{coding: q} from an Accept-Encoding header."""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def negotiate(header, encodings):
+    """
+    The coding among ``encodings`` the client prefers by q-value, ties going
+    to the order of CATALOG_COMPRESSION_CODECS; None when it accepts none.
+    """
+    accepted = _accepted(header or '')
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = accepted.get(name, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compressed_response(request, entry):
+    """An HttpResponse with the entry's precompressed JSON body the request accepts, or None."""
+    encodings = entry.get('encodings')
+    if not encodings:
+        return None
+    codec = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'), encodings)
+    if codec is None:
+        return None
+    response = HttpResponse(encodings[codec], content_type='application/json')
+    response['Content-Encoding'] = codec
+    return response
+
+
+def finalize(response, entry):
+    """Vary on Accept-Encoding where the entry has compressed bodies; weaken a compressed response's ETag."""
+    if entry.get('encodings'):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    etag = response.get('ETag')
+    if response.has_header('Content-Encoding') and etag and not etag.startswith('W/'):
+        response['ETag'] = f'W/{etag}'
+    return response
@@ -0,0 +1,83 @@
+"""
+Conditional GET support (ETag / Last-Modified).
+
+Validators come from ``updated_at`` watermarks rather than from hashing the
+rendered body: the latest timestamp plus the row count (so deletions change the
+ETag too) is one aggregate query, and a matching ``If-None-Match`` or
+``If-Modified-Since`` returns 304 before any serializer runs. Child writes bump
+their parents' ``updated_at`` (see core.rollups), so a parent's timestamp
+covers the objects nested in its representation.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def watermark(queryset, fields=('updated_at',)):
+    """``(row count, latest of fields)`` for ``queryset`` in one aggregate query."""
+    values = queryset.order_by().aggregate(
+        count=Count('pk'),
+        **{f'latest_{index}': Max(field) for index, field in enumerate(fields)},
+    )
+    count = values.pop('count')
+    return count, max((value for value in values.values() if value is not None), default=None)
+
+
+def etag_for(request, *parts):
+    """Strong ETag over ``parts`` and the negotiated renderer (JSON and the browsable API differ)."""
+    renderer = getattr(request, 'accepted_renderer', None)
+    digest = hashlib.md5(repr((getattr(renderer, 'format', None), parts)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _timestamp(last_modified):
+    return int(last_modified.timestamp()) if last_modified else None
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(_timestamp(last_modified))
+    return response
+
+
+def check_not_modified(request, etag, last_modified=None):
+    """The 304 (or 412) response when the request's preconditions say so, otherwise None."""
+    response = get_conditional_response(request, etag=etag, last_modified=_timestamp(last_modified))
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified on viewset ``list`` and ``retrieve``.
+
+    ``conditional_fields`` lists every timestamp the serialized object depends
+    on, e.g. ``('updated_at', 'term__updated_at')`` for nested relations.
+    """
+    conditional_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(self.filter_queryset(self.get_queryset()), super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        return self._conditional(queryset, super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, queryset, handler, request, *args, **kwargs):
+        count, last_modified = watermark(queryset, self.conditional_fields)
+        etag = etag_for(request, request.path, sorted(request.query_params.lists()), count, last_modified)
+        not_modified = check_not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            set_validators(response, etag, last_modified)
+        return response
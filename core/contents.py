@@ -0,0 +1,84 @@
+"""
+Per-language lesson content.
+
+``Lesson.content_languages_available`` and ``content_urls_by_language`` stay
+the API's source of truth. LessonContent mirrors them as one row per available
+language (with that language's URL, blank if it has none), so the catalog can
+ask which lessons and programs exist in a language through an index rather
+than by scanning JSON (see core.catalog). The model signals in core.signals
+keep the rows in sync after single and bulk lesson saves.
+
+For ``?lang=`` requests the catalog loads only the lessons available in that
+language (terms left without any are dropped), and ``project_programs`` and
+``project_lesson`` narrow the payloads to that language's URLs.
+"""
+
+from itertools import islice
+
+from .models import Lesson, LessonContent
+
+CONTENT_FIELDS = {'content_languages_available', 'content_urls_by_language'}
+
+SYNC_BATCH_SIZE = 500
+
+
+def _rows(lesson):
+    urls = lesson.content_urls_by_language or {}
+    # Validation keeps URL keys within the available languages; rows cover both anyway
+    for language in dict.fromkeys([*(lesson.content_languages_available or ()), *urls]):
+        yield LessonContent(lesson_id=lesson.pk, language=language, url=urls.get(language) or '')
+
+
+def _sync_batch(lessons):
+    rows = [row for lesson in lessons for row in _rows(lesson)]
+    wanted = {(row.lesson_id, row.language) for row in rows}
+    stale = [
+        pk for pk, lesson_id, language in LessonContent.objects.filter(
+            lesson__in=[lesson.pk for lesson in lessons],
+        ).values_list('pk', 'lesson_id', 'language')
+        if (lesson_id, language) not in wanted
+    ]
+    if stale:
+        LessonContent.objects.filter(pk__in=stale).delete()
+    if rows:
+        LessonContent.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['lesson', 'language'],
+            update_fields=['url'],
+        )
+    return len(rows)
+
+
+def sync_lessons(lessons):
+    """Mirror the content fields of saved ``lessons`` (instances); returns how many rows were written."""
+    lessons = iter(lessons)
+    written = 0
+    while batch := list(islice(lessons, SYNC_BATCH_SIZE)):
+        written += _sync_batch(batch)
+    return written
+
+
+def rebuild_contents():
+    """Drop and re-create every row from the lessons' JSON fields; returns how many were written."""
+    LessonContent.objects.all().delete()
+    lessons = Lesson.objects.only('content_languages_available', 'content_urls_by_language')
+    return sync_lessons(lessons.iterator(chunk_size=SYNC_BATCH_SIZE))
+
+
+def project_lesson(lesson, language):
+    """Narrow one lesson payload's URLs to ``language`` (in place); the other fields are kept."""
+    urls = lesson.get('content_urls_by_language') if isinstance(lesson, dict) else None
+    if urls is not None:
+        lesson['content_urls_by_language'] = {language: urls[language]} if language in urls else {}
+    return lesson
+
+
+def project_programs(programs, language):
+    """project_lesson over every lesson nested in program payloads, full or sparse."""
+    for program in programs:
+        for term in program.get('terms') or ():
+            if isinstance(term, dict):
+                for lesson in term.get('lessons') or ():
+                    project_lesson(lesson, language)
+    return programs
@@ -0,0 +1,64 @@
+"""Declarative eager loading for the CMS viewsets, plus a guard against lazy loads in list responses."""
+
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.response import Response
+
+from . import timing
+
+
+class LazyLoadError(RuntimeError):
+    """A serializer hit the database while rendering an already-fetched list."""
+
+
+@contextmanager
+def forbid_queries(label):
+    def blocker(execute, sql, params, many, context):
+        raise LazyLoadError(
+            f'{label} ran a query while serializing; add the relation to '
+            f'select_related_fields/prefetch_related_fields.\n{sql}'
+        )
+
+    with connection.execute_wrapper(blocker):
+        yield
+
+
+class EagerLoadingMixin:
+    """
+    Applies ``select_related_fields``/``prefetch_related_fields`` to the queryset.
+
+    Declare every relation the serializer renders. With ``LAZY_LOAD_GUARD`` on
+    (defaults to DEBUG), list responses raise LazyLoadError if serialization
+    still has to query the database. Serialization counts toward the
+    request's Server-Timing ``serialize`` phase (see core.timing).
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        objects = page if page is not None else list(queryset)
+        serializer = self.get_serializer(objects, many=True)
+        guard = forbid_queries(type(self).__name__) if settings.LAZY_LOAD_GUARD else nullcontext()
+        with timing.phase('serialize'), guard:
+            data = serializer.data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        with timing.phase('serialize'):
+            data = serializer.data
+        return Response(data)
@@ -0,0 +1,197 @@
+"""
+Static export of the public catalog.
+
+Writes the catalog as pre-rendered JSON that a plain static file server can
+serve, byte-for-byte what the catalog API returns:
+
+    programs/page-<n>.json   list pages ({count, limit, offset, results})
+    programs/<id>.json       program details
+    lessons/<id>.json        lesson details
+    manifest.json            watermark and program order of the last export
+
+An incremental export rewrites only what changed since the manifest's
+watermark. A program's ``updated_at`` covers its whole published tree (see
+core.rollups), so changed programs are found by timestamp, and list pages are
+rewritten only when one of their programs changed or the list itself moved.
+Lessons that leave the catalog (unpublished or deleted) leave a
+LessonTombstone behind (see core.signals), so their files are removed without
+listing every lesson or the export directory; tombstones are kept for
+TOMBSTONE_RETENTION, and an export older than that is redone in full.
+Every file is written to a temporary name and renamed into place, so readers
+never see a partial file.
+"""
+
+import json
+import math
+import os
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import JSONRenderer
+
+from .catalog import catalog_programs
+from .lean import lesson_data, program_data
+from .models import Lesson, LessonTombstone
+
+MANIFEST = 'manifest.json'
+PAGE_SIZE = 10  # the catalog list API's default limit
+BATCH_SIZE = 500
+
+# Rows committed shortly after an export read may carry earlier timestamps;
+# re-exporting a little history keeps them from being skipped.
+WATERMARK_OVERLAP = timedelta(minutes=1)
+
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+_renderer = JSONRenderer()
+
+
+def _write(path, content):
+    """Write ``content`` (bytes) to ``path`` atomically."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(content)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _remove(path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def read_manifest(directory):
+    try:
+        return json.loads((Path(directory) / MANIFEST).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def export_catalog(directory=None, full=False, page_size=PAGE_SIZE):
+    """
+    Export the catalog into ``directory`` (default ``settings.CATALOG_EXPORT_DIR``).
+
+    Incremental unless ``full`` is set or there is no compatible previous
+    export. Returns counts of the files written and removed.
+    """
+    directory = Path(directory or settings.CATALOG_EXPORT_DIR)
+    manifest = read_manifest(directory)
+    # Taken before reading, so changes made during the export are seen next time
+    started = timezone.now()
+
+    if manifest is None or manifest.get('page_size') != page_size:
+        full = True
+    since = None if full else parse_datetime(manifest['watermark']) - WATERMARK_OVERLAP
+    if since is not None and since < started - TOMBSTONE_RETENTION:
+        # Tombstones of lessons removed since then may be gone already
+        since = None
+        full = True
+    stats = {'full': full, 'programs': 0, 'pages': 0, 'lessons': 0, 'removed': 0}
+
+    program_ids = _export_programs(directory, manifest, since, page_size, stats)
+    _export_lessons(directory, since, stats)
+
+    _write(directory / MANIFEST, json.dumps({
+        'watermark': started.isoformat(),
+        'page_size': page_size,
+        'programs': program_ids,
+    }).encode())
+    LessonTombstone.objects.filter(removed_at__lt=started - TOMBSTONE_RETENTION).delete()
+    return stats
+
+
+def record_removed_lessons(lesson_ids):
+    """Tombstone lessons that left the catalog, so incremental exports remove their files."""
+    now = timezone.now()
+    tombstones = [LessonTombstone(lesson_id=pk, removed_at=now) for pk in lesson_ids]
+    if tombstones:
+        LessonTombstone.objects.bulk_create(
+            tombstones,
+            update_conflicts=True,
+            unique_fields=['lesson_id'],
+            update_fields=['removed_at'],
+        )
+
+
+def _export_programs(directory, manifest, since, page_size, stats):
+    """Write changed program details and affected list pages; returns the exported program order."""
+    programs_dir = directory / 'programs'
+    ordered = [
+        str(pk) for pk in
+        catalog_programs().order_by('-created_at', '-id').values_list('id', flat=True)
+    ]
+    # Files from the previous export, even when this one is a full rewrite
+    previous = manifest['programs'] if manifest else []
+    previous_pages = math.ceil(len(previous) / manifest['page_size']) if manifest else 0
+
+    if since is None:
+        changed = set(ordered)
+    else:
+        changed = {str(pk) for pk in catalog_programs().filter(updated_at__gte=since).values_list('id', flat=True)}
+        changed.update(set(ordered) - set(previous))
+
+    for program_id in set(previous) - set(ordered):
+        stats['removed'] += _remove(programs_dir / f'{program_id}.json')
+
+    page_count = max(1, math.ceil(len(ordered) / page_size))
+    pages = [ordered[start:start + page_size] for start in range(0, page_count * page_size, page_size)]
+    if since is None or ordered != previous:
+        # Counts and offsets moved, so every page changes
+        affected = range(page_count)
+    else:
+        affected = [number for number, ids in enumerate(pages) if changed.intersection(ids)]
+
+    for number in affected:
+        ids = pages[number]
+        results = program_data(catalog_programs().filter(id__in=ids).order_by('-created_at', '-id'))
+        for data in results:
+            if data['id'] in changed:
+                _write(programs_dir / f"{data['id']}.json", _renderer.render(data))
+                stats['programs'] += 1
+        _write(programs_dir / f'page-{number + 1}.json', _renderer.render({
+            'count': len(ordered),
+            'limit': page_size,
+            'offset': number * page_size,
+            'results': results,
+        }))
+        stats['pages'] += 1
+
+    for number in range(page_count, previous_pages):
+        stats['removed'] += _remove(programs_dir / f'page-{number + 1}.json')
+    return ordered
+
+
+def _export_lessons(directory, since, stats):
+    lessons_dir = directory / 'lessons'
+    published = Lesson.objects.filter(status='published')
+    changed = published if since is None else published.filter(updated_at__gte=since)
+    for lesson in changed.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        _write(lessons_dir / f'{lesson.id}.json', _renderer.render(lesson_data(lesson)))
+        stats['lessons'] += 1
+
+    if since is not None:
+        # Lessons unpublished or deleted since, unless published again
+        removed = LessonTombstone.objects.filter(removed_at__gte=since).exclude(
+            Exists(published.filter(pk=OuterRef('lesson_id'))),
+        )
+        for lesson_id in removed.values_list('lesson_id', flat=True).iterator(chunk_size=BATCH_SIZE):
+            stats['removed'] += _remove(lessons_dir / f'{lesson_id}.json')
+    elif lessons_dir.is_dir():
+        # A full export doesn't trust the directory's history; compare its files
+        keep = {f'{pk}.json' for pk in published.values_list('id', flat=True)}
+        for entry in os.scandir(lessons_dir):
+            if entry.name.endswith('.json') and entry.name not in keep:
+                stats['removed'] += _remove(Path(entry.path))
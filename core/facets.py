@@ -0,0 +1,187 @@
+"""
+Facet counts for the public catalog.
+
+Facets count catalog programs (those with a published lesson) by:
+
+    topic           each topic the program belongs to (by topic id)
+    language        language_primary
+    content_type    the content types of its published lessons
+    paid            'paid' and/or 'free', after its published lessons
+
+ProgramFacet holds every catalog program's facet values and FacetCount their
+totals. core.changes.catalog_changed passes ``refresh`` every program a write
+touches (model saves, bulk writes, imports, topic changes and
+publish_scheduled), which recomputes just those programs' values and applies
+the difference to the counters. Counts for the whole catalog are then one
+small read, and counts for a filtered catalog one aggregate over ProgramFacet
+instead of GROUP BYs over the Program -> Term -> Lesson joins.
+"""
+
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+
+from .catalog import catalog_programs
+from .models import Program, Term, Lesson, Topic, ProgramFacet, FacetCount
+
+TOPIC = 'topic'
+LANGUAGE = 'language'
+CONTENT_TYPE = 'content_type'
+PAID = 'paid'
+FACETS = (TOPIC, LANGUAGE, CONTENT_TYPE, PAID)
+
+BATCH_SIZE = 500
+
+
+def _flags():
+    """(facet, value, EXISTS over a term's published lessons) for the lesson-derived facet values."""
+    published = Lesson.objects.filter(term=OuterRef('pk'), status='published')
+    flags = [
+        (CONTENT_TYPE, content_type, Exists(published.filter(content_type=content_type)))
+        for content_type, _ in Lesson.TYPE_CHOICES
+    ]
+    flags.append((PAID, 'paid', Exists(published.filter(is_paid=True))))
+    flags.append((PAID, 'free', Exists(published.filter(is_paid=False))))
+    return flags
+
+
+def _values(program_ids):
+    """{(program id, facet, value)} for the catalog programs among ``program_ids``."""
+    # One row per term of a catalog program; each EXISTS stops at the first matching
+    # lesson on the (term, status) index instead of reading every published lesson
+    flags = _flags()
+    terms = Term.objects.filter(
+        program__in=catalog_programs().filter(pk__in=program_ids).values('pk'),
+    ).annotate(**{f'flag_{index}': flag for index, (_, _, flag) in enumerate(flags)})
+    values = set()
+    for program_id, language, *found in terms.values_list(
+        'program_id', 'program__language_primary', *(f'flag_{index}' for index in range(len(flags))),
+    ):
+        values.add((program_id, LANGUAGE, language))
+        values.update((program_id, facet, value) for (facet, value, _), hit in zip(flags, found) if hit)
+
+    program_ids = {program_id for program_id, _, _ in values}
+    if program_ids:
+        values.update(
+            (program_id, TOPIC, str(topic_id))
+            for program_id, topic_id in Program.topics.through.objects.filter(
+                program__in=program_ids,
+            ).values_list('program_id', 'topic_id')
+        )
+    return values
+
+
+def _apply(deltas):
+    """Add ``deltas`` ({(facet, value): change}) to the counters, one UPDATE per distinct change."""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet=facet, value=value) for facet, value in deltas],
+        ignore_conflicts=True,
+    )
+    by_change = defaultdict(list)
+    for (facet, value), delta in deltas.items():
+        by_change[delta].append(Q(facet=facet, value=value))
+    for delta, keys in by_change.items():
+        FacetCount.objects.filter(reduce(or_, keys)).update(count=F('count') + delta)
+
+
+def refresh(program_ids):
+    """
+    Recompute the facet values of ``program_ids`` (deleted ones included) and adjust the counters.
+
+    The programs' rows are locked (in pk order) before their ProgramFacet rows
+    are read, so concurrent refreshes of one program take turns: the second
+    diffs against what the first wrote instead of inserting the same rows or
+    applying the same change to the counters again.
+    """
+    program_ids = sorted(set(program_ids), key=str)
+    deltas = Counter()
+    # Callers are usually inside a transaction already; no savepoint needed
+    with transaction.atomic(savepoint=False):
+        for start in range(0, len(program_ids), BATCH_SIZE):
+            batch = program_ids[start:start + BATCH_SIZE]
+            list(
+                Program.objects.select_for_update().filter(pk__in=batch).order_by('pk').values_list('pk', flat=True)
+            )
+            current = {
+                (program_id, facet, value): pk
+                for pk, program_id, facet, value in ProgramFacet.objects.filter(
+                    program_id__in=batch,
+                ).values_list('pk', 'program_id', 'facet', 'value')
+            }
+            wanted = _values(batch)
+
+            removed = [key for key in current if key not in wanted]
+            added = [key for key in wanted if key not in current]
+            if removed:
+                ProgramFacet.objects.filter(pk__in=[current[key] for key in removed]).delete()
+            if added:
+                ProgramFacet.objects.bulk_create(
+                    [ProgramFacet(program_id=program_id, facet=facet, value=value) for program_id, facet, value in added],
+                    batch_size=BATCH_SIZE,
+                )
+            deltas.update((facet, value) for _, facet, value in added)
+            deltas.subtract((facet, value) for _, facet, value in removed)
+        _apply(deltas)
+
+
+def drop_topic(topic_id):
+    """Forget a deleted topic, whose memberships went without an m2m signal."""
+    ProgramFacet.objects.filter(facet=TOPIC, value=str(topic_id)).delete()
+    FacetCount.objects.filter(facet=TOPIC, value=str(topic_id)).delete()
+
+
+def rebuild_facets():
+    """Recompute every program's facet values and the counters from scratch; returns the programs counted."""
+    ProgramFacet.objects.all().delete()
+    FacetCount.objects.all().delete()
+    program_ids = list(catalog_programs().values_list('pk', flat=True))
+    refresh(program_ids)
+    return len(program_ids)
+
+
+def counts():
+    """{facet: {value: programs}} for the whole catalog, read from the counters."""
+    result = {facet: {} for facet in FACETS}
+    for facet, value, count in FacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'):
+        result.setdefault(facet, {})[value] = count
+    return result
+
+
+def filtered_counts(programs):
+    """Like ``counts`` for the catalog programs in ``programs`` (a queryset), in one aggregate query."""
+    result = {facet: {} for facet in FACETS}
+    rows = (
+        ProgramFacet.objects.filter(program_id__in=programs.values('pk'))
+        .values('facet', 'value')
+        .annotate(count=Count('pk'))
+        .order_by()
+    )
+    for row in rows:
+        result.setdefault(row['facet'], {})[row['value']] = row['count']
+    return result
+
+
+def facet_data(result):
+    """Response payload for ``counts``/``filtered_counts``: each facet's values, most programs first."""
+    def ordered(values):
+        return sorted(values.items(), key=lambda item: (-item[1], item[0]))
+
+    topic_names = dict(
+        Topic.objects.filter(pk__in=[int(value) for value in result[TOPIC]]).values_list('pk', 'name')
+    )
+    data = {
+        TOPIC: [
+            {'id': value, 'name': topic_names[int(value)], 'count': count}
+            for value, count in ordered(result[TOPIC])
+            if int(value) in topic_names
+        ],
+    }
+    for facet in (LANGUAGE, CONTENT_TYPE, PAID):
+        data[facet] = [{'value': value, 'count': count} for value, count in ordered(result[facet])]
+    return data
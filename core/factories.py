@@ -0,0 +1,46 @@
+"""
+Model factories for the test suites (core/tests_*.py, worker/tests.py).
+
+Each creates one row with valid defaults for the fields a test doesn't care
+about; keyword arguments override any model field. Published objects get a
+``published_at`` of now unless one is given.
+"""
+
+from django.utils import timezone
+
+from .models import Program, Term, Lesson
+
+
+def content_urls(*languages):
+    return {language: f'https://cdn.example.com/{language}.mp4' for language in languages}
+
+
+def _published_now(fields):
+    if fields.get('status') == 'published':
+        fields.setdefault('published_at', timezone.now())
+    return fields
+
+
+def create_program(title='Program', topics=(), **fields):
+    """A program available in its primary language only (English by default)."""
+    language = fields.setdefault('language_primary', 'en')
+    fields.setdefault('languages_available', [language])
+    program = Program.objects.create(title=title, **_published_now(fields))
+    if topics:
+        program.topics.set(topics)
+    return program
+
+
+def create_term(program=None, number=1, **fields):
+    """A term of ``program``, or of a new draft program."""
+    return Term.objects.create(program=program or create_program(), term_number=number, **fields)
+
+
+def create_lesson(term, number, languages=('en',), **fields):
+    """A video lesson with content in ``languages``, the first of them primary."""
+    fields.setdefault('title', f'Lesson {number}')
+    fields.setdefault('content_type', 'video')
+    fields.setdefault('content_language_primary', languages[0])
+    fields.setdefault('content_languages_available', list(languages))
+    fields.setdefault('content_urls_by_language', content_urls(*languages))
+    return Lesson.objects.create(term=term, lesson_number=number, **_published_now(fields))
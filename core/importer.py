@@ -0,0 +1,283 @@
+"""
+Streaming bulk import of programs, terms and lessons.
+
+Input is a stream of records, each tagged with a ``type``:
+
+    {"type": "program", "id": "<uuid>", "title": "…", "language_primary": "en", …, "topics": ["Algebra"]}
+    {"type": "term", "program_id": "<uuid>", "term_number": 1, "title": "…"}
+    {"type": "lesson", "program_id": "<uuid>", "term_number": 1, "lesson_number": 1, "title": "…", …}
+
+Programs are keyed by ``id``, terms by (program, term_number) and lessons by
+(term, lesson_number); importing the same input twice leaves the same rows.
+The catalog NDJSON dump (core.ndjson) is accepted as is: a program record may
+list its ``terms``, and a lesson may name its term by the ``term_id`` listed
+there instead of by ``term_number``.
+
+Records are read in chunks. Each chunk is validated with the CMS serializers
+in their bulk form (related rows resolved by one query, unique checks left to
+the upsert), written with ``bulk_create(update_conflicts=True)`` in one
+transaction, and announced with post_bulk_save so rollups, caches and the
+search index follow. Each record is the whole object (omitted fields take
+their defaults). Invalid records are skipped and reported; parents must come
+before their children in the input.
+"""
+
+import csv
+import json
+import uuid
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Program, Term, Lesson, Topic
+from .serializers import ProgramSerializer, TermSerializer, LessonSerializer
+from .signals import post_bulk_save
+
+CHUNK_SIZE = 1000
+
+# Keys that identify a record or belong to the catalog's read-only representation
+_PROGRAM_SKIP = {'type', 'id', 'topics', 'terms'}
+_LESSON_SKIP = {'type', 'id', 'program_id', 'term_id', 'term_number'}
+
+
+def _uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def read_ndjson(stream):
+    """Yield ``(line number, record)`` from an NDJSON text stream; malformed lines yield the error."""
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield number, {'_error': f'Invalid JSON: {exc}'}
+            continue
+        yield number, record if isinstance(record, dict) else {'_error': 'Expected a JSON object.'}
+
+
+def read_csv(stream, record_type=None):
+    """
+    Yield ``(line number, record)`` from CSV with a header row. Columns are
+    record keys; list and object values are JSON, and empty cells are omitted.
+    Without a ``type`` column every row is a ``record_type``.
+    """
+    reader = csv.DictReader(stream)
+    for record in reader:
+        parsed = {}
+        for key, value in record.items():
+            if not key or value in (None, ''):
+                continue
+            if value[0] in '[{':
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass
+            parsed[key] = value
+        if record_type and 'type' not in parsed:
+            parsed['type'] = record_type
+        yield reader.line_num, parsed
+
+
+class CatalogImporter:
+    """Upserts records in chunks; ``stats`` counts rows created, updated and rejected per model."""
+
+    def __init__(self, chunk_size=CHUNK_SIZE, on_chunk=None, on_error=None):
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.on_error = on_error
+        self.stats = {name: {'created': 0, 'updated': 0} for name in ('programs', 'terms', 'lessons')}
+        self.rejected = 0
+        # Term ids listed by program records in a catalog dump -> (program id, term number)
+        self.term_aliases = {}
+
+    def run(self, records):
+        records = iter(records)
+        while chunk := list(islice(records, self.chunk_size)):
+            self.import_chunk(chunk)
+        return self.stats
+
+    def _reject(self, line, errors):
+        self.rejected += 1
+        if self.on_error:
+            self.on_error(line, errors)
+
+    def import_chunk(self, chunk):
+        programs, terms, lessons = [], [], []
+        for line, record in chunk:
+            kind = record.get('type')
+            if '_error' in record:
+                self._reject(line, {'non_field_errors': [record['_error']]})
+            elif kind == 'program':
+                programs.append((line, record))
+                terms.extend((line, {'program_id': record.get('id'), **term}) for term in record.get('terms') or ())
+            elif kind == 'term':
+                terms.append((line, record))
+            elif kind == 'lesson':
+                lessons.append((line, record))
+            else:
+                self._reject(line, {'type': ['Expected "program", "term" or "lesson".']})
+
+        with transaction.atomic():
+            self._import_programs(programs)
+            self._import_terms(terms)
+            self._import_lessons(lessons)
+
+        if self.on_chunk:
+            self.on_chunk(len(chunk))
+
+    def _validate(self, serializer_class, items, context):
+        """Validated data per (line, data) item; rejected items are reported and dropped."""
+        valid = []
+        for line, data, extra in items:
+            serializer = serializer_class(data=data, context=context)
+            if serializer.is_valid():
+                valid.append((serializer.validated_data, extra))
+            else:
+                self._reject(line, serializer.errors)
+        return valid
+
+    def _upsert(self, model, objects, existing_keys, unique_fields, stat):
+        """bulk_create with update_conflicts; returns (created, updated) objects."""
+        if not objects:
+            return [], []
+        attnames = [model._meta.get_field(name).attname for name in unique_fields]
+        key = lambda obj: tuple(getattr(obj, attname) for attname in attnames)  # noqa: E731
+        # The last record for a key wins, as it would when imported one by one
+        objects = list({key(obj): obj for obj in objects}.values())
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in unique_fields
+            and field.editable and field.name != 'created_at'
+        ]
+        model.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields + ['updated_at'],
+        )
+        created = [obj for obj in objects if key(obj) not in existing_keys]
+        updated = [obj for obj in objects if key(obj) in existing_keys]
+        self.stats[stat]['created'] += len(created)
+        self.stats[stat]['updated'] += len(updated)
+        return created, updated
+
+    def _import_programs(self, records):
+        items = []
+        for line, record in records:
+            if record.get('id') is None:
+                self._reject(line, {'id': ['This field is required.']})
+                continue
+            program_id = _uuid(record['id'])
+            if program_id is None:
+                self._reject(line, {'id': ['Must be a valid UUID.']})
+                continue
+            data = {key: value for key, value in record.items() if key not in _PROGRAM_SKIP}
+            items.append((line, data, (program_id, record.get('topics'))))
+
+        valid = self._validate(ProgramSerializer, items, {'bulk': True})
+        if not valid:
+            return
+        programs = [Program(id=program_id, **data) for data, (program_id, _) in valid]
+        existing = set(Program.objects.filter(pk__in=[program.pk for program in programs]).values_list('pk'))
+        created, updated = self._upsert(Program, programs, existing, ['id'], 'programs')
+
+        topics = {program_id: names for _, (program_id, names) in valid if names is not None}
+        if topics:
+            self._set_topics(topics)
+        post_bulk_save.send(sender=Program, created=created, updated=updated)
+
+    def _set_topics(self, topics_by_program):
+        """Make each program's topics exactly the named ones (names or {"name": …} objects)."""
+        names = {
+            program_id: {topic['name'] if isinstance(topic, dict) else str(topic) for topic in topics}
+            for program_id, topics in topics_by_program.items()
+        }
+        all_names = set().union(*names.values())
+        Topic.objects.bulk_create([Topic(name=name) for name in all_names], ignore_conflicts=True)
+        topic_ids = dict(Topic.objects.filter(name__in=all_names).values_list('name', 'pk'))
+
+        through = Program.topics.through
+        current = {
+            (program_id, topic_id): pk
+            for pk, program_id, topic_id in through.objects.filter(program_id__in=names).values_list(
+                'pk', 'program_id', 'topic_id',
+            )
+        }
+        wanted = {(program_id, topic_ids[name]) for program_id, program_names in names.items() for name in program_names}
+        stale = current.keys() - wanted
+        added = wanted - current.keys()
+        through.objects.filter(pk__in=[current[key] for key in stale]).delete()
+        through.objects.bulk_create(
+            [through(program_id=program_id, topic_id=topic_id) for program_id, topic_id in added],
+            ignore_conflicts=True,
+        )
+        # Topics list their programs (see core.conditional)
+        changed = {topic_id for _, topic_id in stale | added}
+        Topic.objects.filter(pk__in=changed).update(updated_at=timezone.now())
+
+    def _import_terms(self, records):
+        items = []
+        for line, record in records:
+            data = {key: record[key] for key in ('program_id', 'term_number', 'title') if key in record}
+            items.append((line, data, record.get('id')))
+        if not items:
+            return
+
+        program_ids = {_uuid(data.get('program_id')) for _, data, _ in items} - {None}
+        context = {'bulk': True, 'related_instances': {Program: Program.objects.in_bulk(program_ids)}}
+        valid = self._validate(TermSerializer, items, context)
+        terms = [Term(**data) for data, _ in valid]
+        existing = set(
+            Term.objects.filter(program__in=program_ids).values_list('program_id', 'term_number')
+        )
+        created, updated = self._upsert(Term, terms, existing, ['program', 'term_number'], 'terms')
+        for data, alias in valid:
+            if alias is not None:
+                self.term_aliases[str(alias)] = (data['program'].pk, data['term_number'])
+        post_bulk_save.send(sender=Term, created=created, updated=updated)
+
+    def _term_key(self, record):
+        """(program id, term number) for a lesson record, or None."""
+        if record.get('term_number') is not None:
+            program_id = _uuid(record.get('program_id'))
+            try:
+                return program_id, int(record['term_number'])
+            except (TypeError, ValueError):
+                return None
+        return self.term_aliases.get(str(record.get('term_id')))
+
+    def _import_lessons(self, records):
+        keyed = [(line, record, self._term_key(record)) for line, record in records]
+        if not keyed:
+            return
+
+        program_ids = {key[0] for _, _, key in keyed if key and key[0]}
+        numbers = {key[1] for _, _, key in keyed if key}
+        terms = {
+            (term.program_id, term.term_number): term
+            for term in Term.objects.filter(program__in=program_ids, term_number__in=numbers).select_related('program')
+        }
+
+        items = []
+        for line, record, key in keyed:
+            term = terms.get(key)
+            if term is None:
+                self._reject(line, {'term': ['No such term; list programs and terms before their lessons.']})
+                continue
+            data = {name: value for name, value in record.items() if name not in _LESSON_SKIP}
+            items.append((line, {**data, 'term_id': term.pk}, None))
+
+        context = {'bulk': True, 'related_instances': {Term: {term.pk: term for term in terms.values()}}}
+        valid = self._validate(LessonSerializer, items, context)
+        lessons = [Lesson(**data) for data, _ in valid]
+        existing = set(
+            Lesson.objects.filter(term__in=[term.pk for term in terms.values()]).values_list('term_id', 'lesson_number')
+        )
+        created, updated = self._upsert(Lesson, lessons, existing, ['term', 'lesson_number'], 'lessons')
+        post_bulk_save.send(sender=Lesson, created=created, updated=updated)
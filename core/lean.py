@@ -0,0 +1,148 @@
+"""
+Lean read path for the public catalog.
+
+Builds the same payload as CatalogProgramSerializer and CatalogLessonSerializer
+(without sparse fieldsets) straight from ``.values()`` rows into plain dicts,
+skipping model instantiation and DRF's per-field ``to_representation`` calls.
+Values are formatted the way the serializer fields format them, and
+core.tests_lean_render checks that both paths render byte-identical JSON.
+Set CATALOG_LEAN_RENDERING=false to go back to the serializers.
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import models
+from django.db.models import QuerySet, prefetch_related_objects
+from rest_framework import serializers
+
+from .catalog import catalog_program_prefetches, catalog_topics_queryset, lessons_in_language, published_lessons_queryset
+from .models import Program, Term, Lesson
+from .serializers import CatalogProgramSerializer, CatalogLessonSerializer
+
+LESSON_FIELDS = tuple(CatalogLessonSerializer.Meta.fields)
+# Columns only; topics and terms are appended in the serializer's order
+PROGRAM_FIELDS = tuple(name for name in CatalogProgramSerializer.Meta.fields if name not in ('topics', 'terms'))
+
+
+def _datetime_fields(model, names):
+    return tuple(name for name in names if isinstance(model._meta.get_field(name), models.DateTimeField))
+
+
+LESSON_DATETIMES = _datetime_fields(Lesson, LESSON_FIELDS)
+PROGRAM_DATETIMES = _datetime_fields(Program, PROGRAM_FIELDS)
+
+
+def _datetime_formatter():
+    # DRF's own formatting (ISO 8601, current timezone, 'Z' for UTC), resolved once per render
+    to_representation = serializers.DateTimeField().to_representation
+
+    def format_datetime(value):
+        return None if value is None else to_representation(value)
+    return format_datetime
+
+
+def _format(row, datetime_fields, format_datetime):
+    for name in datetime_fields:
+        row[name] = format_datetime(row[name])
+    return row
+
+
+def render_lessons(lessons):
+    """Catalog representations of a Lesson queryset (read with .values()) or loaded instances."""
+    format_datetime = _datetime_formatter()
+    if isinstance(lessons, QuerySet):
+        rows = lessons.values(*LESSON_FIELDS)
+    else:
+        rows = ({name: getattr(lesson, name) for name in LESSON_FIELDS} for lesson in lessons)
+    return [_format(row, LESSON_DATETIMES, format_datetime) for row in rows]
+
+
+def program_rows(programs):
+    """Program column rows of a Program queryset (read with .values()) or loaded instances."""
+    if isinstance(programs, QuerySet):
+        return list(programs.values(*PROGRAM_FIELDS))
+    return [{name: getattr(program, name) for name in PROGRAM_FIELDS} for program in programs]
+
+
+def tree_querysets(program_ids, lang=None):
+    """
+    Row querysets for the topics, terms and published lessons of the given
+    programs (with ``lang``, the lessons available in that language). They are
+    independent of each other, so they can run concurrently.
+    """
+    lessons = published_lessons_queryset().filter(term__program__in=program_ids)
+    if lang:
+        lessons = lessons_in_language(lessons, lang)
+    return (
+        catalog_topics_queryset().filter(programs__in=program_ids).values('id', 'name', 'programs'),
+        Term.objects.filter(program__in=program_ids).order_by('term_number').values(
+            'id', 'program_id', 'term_number', 'title',
+        ),
+        lessons.values('term_id', *LESSON_FIELDS),
+    )
+
+
+def assemble_programs(rows, topic_rows, term_rows, lesson_rows):
+    """Catalog representations from ``program_rows`` and the results of ``tree_querysets``."""
+    format_datetime = _datetime_formatter()
+
+    topics = defaultdict(list)
+    for topic in topic_rows:
+        topics[topic['programs']].append({'id': str(topic['id']), 'name': topic['name']})
+
+    lessons = defaultdict(list)
+    for row in lesson_rows:
+        lessons[row.pop('term_id')].append(_format(row, LESSON_DATETIMES, format_datetime))
+
+    program_terms = defaultdict(list)
+    for term in term_rows:
+        # Only terms with published lessons are listed
+        term_lessons = lessons.get(term['id'])
+        if term_lessons:
+            program_terms[term['program_id']].append({
+                'id': str(term['id']),
+                'term_number': term['term_number'],
+                'title': term['title'],
+                'lessons': term_lessons,
+            })
+
+    for row in rows:
+        program_id = row['id']
+        row['id'] = str(program_id)
+        _format(row, PROGRAM_DATETIMES, format_datetime)
+        row['topics'] = topics.get(program_id, [])
+        row['terms'] = program_terms.get(program_id, [])
+    return rows
+
+
+def render_programs(programs, lang=None):
+    """
+    Catalog representations of a Program queryset (read with .values()) or
+    loaded instances, in order, with topics and terms of published lessons
+    (with ``lang``, of those available in that language). The tree loads in
+    three more queries, like catalog_program_prefetches.
+    """
+    rows = program_rows(programs)
+    if not rows:
+        return []
+    tree = tree_querysets([row['id'] for row in rows], lang)
+    return assemble_programs(rows, *(list(queryset) for queryset in tree))
+
+
+def program_data(programs, lang=None):
+    """Full catalog payload for ``programs`` (a queryset or instances), lean unless disabled."""
+    if settings.CATALOG_LEAN_RENDERING:
+        return render_programs(programs, lang)
+    if isinstance(programs, QuerySet):
+        programs = programs.prefetch_related(*catalog_program_prefetches(lang=lang))
+    else:
+        prefetch_related_objects(programs, *catalog_program_prefetches(lang=lang))
+    return CatalogProgramSerializer(programs, many=True).data
+
+
+def lesson_data(lesson):
+    """Full catalog payload for one loaded lesson, lean unless disabled."""
+    if settings.CATALOG_LEAN_RENDERING:
+        return render_lessons([lesson])[0]
+    return CatalogLessonSerializer(lesson).data
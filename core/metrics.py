@@ -0,0 +1,337 @@
+"""
+In-process metrics, served at /metrics in the Prometheus text format.
+
+Each process counts into its own counters and histograms (one lock per
+metric, held for a dict update). With METRICS_ENABLED, a process that has
+recorded anything writes its values to METRICS_DIR/<pid>.json at most every
+METRICS_FLUSH_INTERVAL seconds and at exit. /metrics adds up those files
+and the serving process's live values, so every web worker and the
+publish_scheduled worker appear in whichever process answers the scrape.
+Files of exited processes keep counting, so counters never go backwards;
+empty METRICS_DIR when deploying, as with any multi-process Prometheus setup.
+
+    http_request_duration_seconds     histogram by route and method
+    http_request_db_queries           histogram by route
+    catalog_cache_requests_total      counter by result (hit, miss)
+    catalog_cache_hit_ratio           gauge, hits / lookups so far
+    publish_lag_seconds               histogram of published_at - publish_at
+    publish_batch_size                histogram of lessons per publish batch
+    scheduled_lessons                 gauge, lessons waiting to be published
+    scheduled_due_lessons             gauge, of those, already due
+    scheduled_oldest_due_seconds      gauge, how overdue the oldest due lesson is
+
+The scheduler gauges are read from the database at scrape time.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from . import timing
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+LAG_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+BATCH_BUCKETS = (1, 5, 10, 50, 100, 250, 500, 1000)
+
+REGISTRY = []
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        # label values -> value
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self):
+        with self._lock:
+            return {json.dumps(key): self._copy(value) for key, value in self._values.items()}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _changed()
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    @staticmethod
+    def merge(total, value):
+        return (total or 0) + value
+
+    def lines(self, values):
+        for key, value in values.items():
+            yield f'{self.name}{_labels(self.labelnames, key)} {_number(value)}'
+
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf), then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+        _changed()
+
+    @staticmethod
+    def _copy(value):
+        return [list(value[0]), value[1], value[2]]
+
+    @staticmethod
+    def merge(total, value):
+        if total is None:
+            return [list(value[0]), value[1], value[2]]
+        return [[a + b for a, b in zip(total[0], value[0])], total[1] + value[1], total[2] + value[2]]
+
+    def lines(self, values):
+        names = (*self.labelnames, 'le')
+        for key, (counts, total, count) in values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += bucket_count
+                yield f'{self.name}_bucket{_labels(names, (*key, _number(bound)))} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}'
+            yield f'{self.name}_count{_labels(self.labelnames, key)} {count}'
+
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Time to handle a request, by URL route', ('route', 'method'),
+)
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries run per request, by URL route', ('route',), buckets=QUERY_BUCKETS,
+)
+CATALOG_CACHE = Counter('catalog_cache_requests_total', 'Catalog cache lookups, by result', ('result',))
+PUBLISH_LAG = Histogram(
+    'publish_lag_seconds', 'Delay between a lesson\'s publish_at and its actual publication', buckets=LAG_BUCKETS,
+)
+PUBLISH_BATCH_SIZE = Histogram(
+    'publish_batch_size', 'Lessons published per publish_scheduled batch', buckets=BATCH_BUCKETS,
+)
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+# Flushing to METRICS_DIR
+
+_flush_lock = threading.Lock()
+_flush_timer = None
+
+
+def _changed():
+    global _flush_timer
+    if _flush_timer is not None or not settings.METRICS_ENABLED:
+        return
+    with _flush_lock:
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(settings.METRICS_FLUSH_INTERVAL, flush)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def _snapshot():
+    return {metric.name: metric.snapshot() for metric in REGISTRY}
+
+
+def _own_file():
+    return Path(settings.METRICS_DIR) / f'{os.getpid()}.json'
+
+
+def flush():
+    """Write this process's values to METRICS_DIR for the other processes' scrapes."""
+    global _flush_timer
+    with _flush_lock:
+        _flush_timer = None
+    snapshot = _snapshot()
+    if not settings.METRICS_ENABLED or not any(snapshot.values()):
+        return
+    path = _own_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(snapshot, handle)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _forget():
+    # A forked child starts from zero; its parent's values are the parent's to report
+    global _flush_timer
+    _flush_timer = None
+    for metric in REGISTRY:
+        metric.reset()
+
+
+atexit.register(lambda: settings.configured and flush())
+os.register_at_fork(after_in_child=_forget)
+
+
+def collect():
+    """Values of every process: the files in METRICS_DIR plus this process's live values."""
+    merged = {metric.name: {} for metric in REGISTRY}
+    snapshots = []
+    own = _own_file()
+    if own.parent.is_dir():
+        for path in own.parent.glob('*.json'):
+            if path == own:
+                continue
+            try:
+                with open(path) as handle:
+                    snapshots.append(json.load(handle))
+            except (OSError, ValueError):
+                # Being replaced or removed; the next scrape reads it
+                continue
+    snapshots.append(_snapshot())
+
+    by_name = {metric.name: metric for metric in REGISTRY}
+    for snapshot in snapshots:
+        for name, values in snapshot.items():
+            metric = by_name.get(name)
+            if metric is None:
+                continue
+            for key, value in values.items():
+                merged[name][key] = metric.merge(merged[name].get(key), value)
+    return {name: {tuple(json.loads(key)): value for key, value in values.items()} for name, values in merged.items()}
+
+
+def _gauge(name, documentation, value):
+    return [f'# HELP {name} {documentation}', f'# TYPE {name} gauge', f'{name} {_number(value)}']
+
+
+def _scheduler_gauges():
+    from django.db.models import Count, Min, Q
+    from django.utils import timezone
+    from .models import Lesson
+
+    now = timezone.now()
+    backlog = Lesson.objects.filter(status='scheduled').aggregate(
+        waiting=Count('pk'),
+        due=Count('pk', filter=Q(publish_at__lte=now)),
+        oldest_due=Min('publish_at', filter=Q(publish_at__lte=now)),
+    )
+    oldest = (now - backlog['oldest_due']).total_seconds() if backlog['oldest_due'] else 0.0
+    return [
+        *_gauge('scheduled_lessons', 'Lessons waiting to be published', backlog['waiting']),
+        *_gauge('scheduled_due_lessons', 'Scheduled lessons whose publish_at has passed', backlog['due']),
+        *_gauge('scheduled_oldest_due_seconds', 'How long the oldest due lesson has been waiting', oldest),
+    ]
+
+
+def render():
+    """The Prometheus text exposition of every metric."""
+    values = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines += [f'# HELP {metric.name} {metric.documentation}', f'# TYPE {metric.name} {metric.type}']
+        lines += metric.lines(values[metric.name])
+
+    cache = values[CATALOG_CACHE.name]
+    hits, lookups = cache.get(('hit',), 0), sum(cache.values())
+    lines += _gauge('catalog_cache_hit_ratio', 'Catalog cache hits per lookup', hits / lookups if lookups else 0.0)
+    lines += _scheduler_gauges()
+    return '\n'.join(lines) + '\n'
+
+
+@require_GET
+def metrics_view(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
+
+
+def _route(request):
+    match = request.resolver_match
+    # Unmatched paths share one label so scanners can't grow the series without bound
+    return match.route if match else '<unmatched>'
+
+
+class MetricsMiddleware:
+    """Records each request's latency and query count by route when METRICS_ENABLED is on."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        timing.install_query_recorder()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with timing.request_timings() as timings:
+            response = self.get_response(request)
+        self._record(request, timings)
+        return response
+
+    async def __acall__(self, request):
+        with timing.request_timings() as timings:
+            response = await self.get_response(request)
+        self._record(request, timings)
+        return response
+
+    def _record(self, request, timings):
+        route = _route(request)
+        REQUEST_DURATION.observe(time.perf_counter() - timings.started, route=route, method=request.method)
+        REQUEST_QUERIES.observe(timings.queries, route=route)
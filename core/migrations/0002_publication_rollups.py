@@ -0,0 +1,75 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:42
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_rollups(apps, schema_editor):
+    Program = apps.get_model('core', 'Program')
+    Term = apps.get_model('core', 'Term')
+    Lesson = apps.get_model('core', 'Lesson')
+
+    def aggregate(queryset, group_field, expression, output_field):
+        return Subquery(
+            queryset.filter(**{group_field: OuterRef('pk')})
+            .order_by()
+            .values(group_field)
+            .annotate(value=expression)
+            .values('value'),
+            output_field=output_field,
+        )
+
+    lessons = Lesson.objects.filter(status='published')
+    Term.objects.update(
+        published_lesson_count=Coalesce(aggregate(lessons, 'term', Count('pk'), models.IntegerField()), 0),
+        total_published_duration_ms=Coalesce(aggregate(lessons, 'term', Sum('duration_ms'), models.BigIntegerField()), 0),
+        last_published_at=aggregate(lessons, 'term', Max('published_at'), models.DateTimeField()),
+    )
+    terms = Term.objects.all()
+    Program.objects.update(
+        published_lesson_count=Coalesce(aggregate(terms, 'program', Sum('published_lesson_count'), models.IntegerField()), 0),
+        total_published_duration_ms=Coalesce(aggregate(terms, 'program', Sum('total_published_duration_ms'), models.BigIntegerField()), 0),
+        last_published_at=aggregate(terms, 'program', Max('last_published_at'), models.DateTimeField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='published_lesson_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='total_published_duration_ms',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='term',
+            name='last_published_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='term',
+            name='published_lesson_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='term',
+            name='total_published_duration_ms',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-18 04:43
+
+from django.db import migrations, models
+
+
+def create_topic_name_trigram_index(apps, schema_editor):
+    # icontains lookups can only use a trigram index; other backends keep the unique b-tree
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS topic_name_trgm_idx '
+        'ON core_topic USING gin (UPPER(name::text) gin_trgm_ops)'
+    )
+
+
+def drop_topic_name_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS topic_name_trgm_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_publication_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['status', 'publish_at'], name='lesson_status_publish_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['publish_at'], name='lesson_scheduled_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['term', 'status', 'lesson_number'], name='lesson_term_status_number_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(fields=['status', 'language_primary', '-created_at'], name='program_cms_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(condition=models.Q(('published_lesson_count__gt', 0)), fields=['-created_at', '-id'], name='program_catalog_order_idx'),
+        ),
+        migrations.RunPython(create_topic_name_trigram_index, drop_topic_name_trigram_index),
+    ]
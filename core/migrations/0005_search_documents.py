@@ -0,0 +1,107 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:05
+
+from django.db import migrations, models
+
+
+SQLITE_INDEX = [
+    # External-content FTS5 table over core_searchdocument; titles weigh 10x bodies
+    "CREATE VIRTUAL TABLE core_search_fts USING fts5("
+    "title, body, content='core_searchdocument', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "INSERT INTO core_search_fts(core_search_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN "
+    "INSERT INTO core_search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN "
+    "INSERT INTO core_search_fts(core_search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN "
+    "INSERT INTO core_search_fts(core_search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO core_search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+SQLITE_DROP = [
+    'DROP TRIGGER IF EXISTS core_searchdocument_au',
+    'DROP TRIGGER IF EXISTS core_searchdocument_ad',
+    'DROP TRIGGER IF EXISTS core_searchdocument_ai',
+    'DROP TABLE IF EXISTS core_search_fts',
+]
+
+POSTGRES_INDEX = [
+    "ALTER TABLE core_searchdocument ADD COLUMN document tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B')) STORED",
+    'CREATE INDEX core_searchdocument_document_idx ON core_searchdocument USING gin (document)',
+]
+
+POSTGRES_DROP = [
+    'DROP INDEX IF EXISTS core_searchdocument_document_idx',
+    'ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS document',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, ()):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    # Other backends search core_searchdocument with plain substring matches
+    _run(schema_editor, {'sqlite': SQLITE_INDEX, 'postgresql': POSTGRES_INDEX})
+
+
+def drop_search_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_DROP, 'postgresql': POSTGRES_DROP})
+
+
+def backfill_documents(apps, schema_editor):
+    Program = apps.get_model('core', 'Program')
+    Lesson = apps.get_model('core', 'Lesson')
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    connection = schema_editor.connection
+
+    def key(model, pk):
+        return str(model._meta.pk.get_db_prep_value(pk, connection))
+
+    documents = [
+        SearchDocument(
+            kind='program',
+            object_id=key(Program, program.pk),
+            title=program.title,
+            body=' '.join([program.description, *(topic.name for topic in program.topics.all())]),
+        )
+        for program in Program.objects.prefetch_related('topics')
+    ]
+    documents.extend(
+        SearchDocument(
+            kind='lesson',
+            object_id=key(Lesson, lesson.pk),
+            title=lesson.title,
+            body=f'{lesson.term.title} {lesson.term.program.title}',
+        )
+        for lesson in Lesson.objects.select_related('term__program')
+    )
+    SearchDocument.objects.bulk_create(documents, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_term_topic_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.CharField(max_length=64)),
+                ('title', models.TextField(blank=True)),
+                ('body', models.TextField(blank=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(backfill_documents, migrations.RunPython.noop),
+    ]
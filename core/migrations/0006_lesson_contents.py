@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_contents(apps, schema_editor):
+    Lesson = apps.get_model('core', 'Lesson')
+    LessonContent = apps.get_model('core', 'LessonContent')
+    rows = []
+    for lesson in Lesson.objects.only('content_languages_available', 'content_urls_by_language').iterator():
+        urls = lesson.content_urls_by_language or {}
+        rows.extend(
+            LessonContent(lesson_id=lesson.pk, language=language, url=urls.get(language) or '')
+            for language in dict.fromkeys([*(lesson.content_languages_available or ()), *urls])
+        )
+    LessonContent.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_search_documents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=5)),
+                ('url', models.TextField(blank=True)),
+                ('lesson', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contents', to='core.lesson')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['language', 'lesson'], name='lessoncontent_language_idx')],
+                'unique_together': {('lesson', 'language')},
+            },
+        ),
+        migrations.RunPython(backfill_contents, migrations.RunPython.noop),
+    ]
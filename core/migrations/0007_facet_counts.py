@@ -0,0 +1,71 @@
+# Generated by Django 5.2.10 on 2026-10-18 05:44
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def backfill_facets(apps, schema_editor):
+    Program = apps.get_model('core', 'Program')
+    Lesson = apps.get_model('core', 'Lesson')
+    ProgramFacet = apps.get_model('core', 'ProgramFacet')
+    FacetCount = apps.get_model('core', 'FacetCount')
+
+    programs = Program.objects.filter(published_lesson_count__gt=0)
+    values = {(pk, 'language', language) for pk, language in programs.values_list('pk', 'language_primary')}
+    values.update(
+        (program_id, 'topic', str(topic_id))
+        for program_id, topic_id in Program.topics.through.objects.filter(
+            program__in=programs.values('pk'),
+        ).values_list('program_id', 'topic_id')
+    )
+    for program_id, content_type, is_paid in Lesson.objects.filter(
+        status='published', term__program__in=programs.values('pk'),
+    ).values_list('term__program_id', 'content_type', 'is_paid').distinct():
+        values.add((program_id, 'content_type', content_type))
+        values.add((program_id, 'paid', 'paid' if is_paid else 'free'))
+
+    ProgramFacet.objects.bulk_create(
+        [ProgramFacet(program_id=program_id, facet=facet, value=value) for program_id, facet, value in values],
+        batch_size=500,
+    )
+    counts = Counter((facet, value) for _, facet, value in values)
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet=facet, value=value, count=count) for (facet, value), count in counts.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_lesson_contents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=64)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProgramFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('program_id', models.UUIDField()),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=64)),
+            ],
+            options={
+                'unique_together': {('program_id', 'facet', 'value')},
+            },
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.10 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_facet_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LessonTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lesson_id', models.BigIntegerField(unique=True)),
+                ('removed_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
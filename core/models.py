@@ -1,7 +1,25 @@
 import uuid
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import Q
 
-class Program(models.Model):
+
+class AtomicSaveMixin:
+    """
+    Saves and deletes in one transaction with the post_save/post_delete
+    receivers (core.signals), so a row never commits without the rollups,
+    facets and lesson contents derived from it, even outside a view.
+    """
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            return super().delete(*args, **kwargs)
+
+
+class Program(AtomicSaveMixin, models.Model):
     STATUS_CHOICES = [('draft','draft'), ('published','published'), ('archived','archived')]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -14,22 +32,54 @@ class Program(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-class Topic(models.Model):
+    # Rollups over published lessons, maintained by core.rollups
+    published_lesson_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+    total_published_duration_ms = models.BigIntegerField(default=0, editable=False)
+    last_published_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # CMS list: filter by status/language, newest first
+            models.Index(fields=['status', 'language_primary', '-created_at'], name='program_cms_list_idx'),
+            # Public catalog ordering; only programs with published lessons are indexed
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='program_catalog_order_idx',
+                condition=Q(published_lesson_count__gt=0),
+            ),
+        ]
+
+class Topic(AtomicSaveMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     programs = models.ManyToManyField(Program, related_name='topics')
+    updated_at = models.DateTimeField(auto_now=True)
 
-class Term(models.Model):
+class Term(AtomicSaveMixin, models.Model):
     program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='terms')
     term_number = models.IntegerField()
     title = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Rollups over published lessons, maintained by core.rollups
+    published_lesson_count = models.PositiveIntegerField(default=0, editable=False)
+    total_published_duration_ms = models.BigIntegerField(default=0, editable=False)
+    last_published_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         unique_together = ('program', 'term_number')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded parent so moving a term refreshes both programs
+        instance._loaded_program_id = instance.__dict__.get('program_id')
+        return instance
+
 def _touch(): 
     pass
 
-class Lesson(models.Model):
+class Lesson(AtomicSaveMixin, models.Model):
     TYPE_CHOICES = [('video','video'), ('article','article')]
     STATUS_CHOICES = [('draft','draft'), ('scheduled','scheduled'), ('published','published'), ('archived','archived')]
 
@@ -53,3 +103,77 @@ class Lesson(models.Model):
 
     class Meta:
         unique_together = ('term', 'lesson_number')
+        indexes = [
+            # Scheduler: due lessons; the partial index stays small on backends that support it
+            models.Index(fields=['status', 'publish_at'], name='lesson_status_publish_at_idx'),
+            models.Index(
+                fields=['publish_at'],
+                name='lesson_scheduled_due_idx',
+                condition=Q(status='scheduled'),
+            ),
+            # Catalog: published lessons of a term in order
+            models.Index(fields=['term', 'status', 'lesson_number'], name='lesson_term_status_number_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded parent so moving a lesson refreshes both terms
+        instance._loaded_term_id = instance.__dict__.get('term_id')
+        # ...and the loaded status, so unpublishing leaves a LessonTombstone
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+
+class LessonTombstone(models.Model):
+    """A lesson that left the public catalog (unpublished or deleted), recorded for core.export."""
+    # Not a foreign key: the tombstone outlives a deleted lesson
+    lesson_id = models.BigIntegerField(unique=True)
+    removed_at = models.DateTimeField(db_index=True)
+
+
+class LessonContent(models.Model):
+    """One language of a lesson's content, mirrored from its JSON fields by core.contents."""
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name='contents')
+    language = models.CharField(max_length=5)
+    # Blank when the language is available but has no URL yet
+    url = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ('lesson', 'language')
+        indexes = [
+            # Catalog: lessons (and through them programs) available in a language
+            models.Index(fields=['language', 'lesson'], name='lessoncontent_language_idx'),
+        ]
+
+
+class ProgramFacet(models.Model):
+    """One facet value of a catalog program (e.g. topic 3, content_type video), maintained by core.facets."""
+    # Not a foreign key: rows must outlive their program until core.facets counts the deletion
+    program_id = models.UUIDField()
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ('program_id', 'facet', 'value')
+
+
+class FacetCount(models.Model):
+    """How many catalog programs have a facet value; the sums of ProgramFacet rows, kept by core.facets."""
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=64)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('facet', 'value')
+
+
+class SearchDocument(models.Model):
+    """Denormalized text of a program or lesson; the full-text index over it is kept by core.search."""
+    kind = models.CharField(max_length=20)
+    object_id = models.CharField(max_length=64)
+    title = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
@@ -0,0 +1,53 @@
+"""
+Newline-delimited JSON dump of the public catalog.
+
+One line per program (its catalog representation, with terms listed but not
+their lessons) followed by one line per published lesson of that program:
+
+    {"type":"program","id":"…","title":"…",…,"terms":[{"id":"…","term_number":1,"title":"…"}]}
+    {"type":"lesson","program_id":"…","term_id":"…","id":7,"title":"…",…}
+
+Programs are read with ``.iterator(chunk_size=...)`` and each chunk's tree is
+loaded with the lean renderer's fixed set of queries (see core.lean), so
+memory stays flat however large the catalog is.
+"""
+
+from itertools import islice
+
+from rest_framework.renderers import JSONRenderer
+
+from . import lean
+from .catalog import catalog_programs
+
+CHUNK_SIZE = 200
+CONTENT_TYPE = 'application/x-ndjson'
+
+_renderer = JSONRenderer()
+
+
+def _lines(program):
+    terms = program.pop('terms')
+    yield {
+        'type': 'program',
+        **program,
+        'terms': [{name: term[name] for name in ('id', 'term_number', 'title')} for term in terms],
+    }
+    for term in terms:
+        for lesson in term['lessons']:
+            yield {'type': 'lesson', 'program_id': program['id'], 'term_id': term['id'], **lesson}
+
+
+def iter_chunks(chunk_size=CHUNK_SIZE):
+    """Yield the dump as bytes, one chunk of programs (and their lessons) at a time."""
+    rows = (
+        catalog_programs().order_by('created_at', 'id')
+        .values(*lean.PROGRAM_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    while chunk := list(islice(rows, chunk_size)):
+        tree = lean.tree_querysets([row['id'] for row in chunk])
+        programs = lean.assemble_programs(chunk, *(list(queryset) for queryset in tree))
+        yield b''.join(
+            _renderer.render(line) + b'\n'
+            for program in programs for line in _lines(program)
+        )
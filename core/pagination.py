@@ -1,6 +1,108 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
 
 
 class DefaultPageNumberPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
+
+
+class CatalogCursorPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Cursors are opaque tokens holding the boundary row's key and a direction,
+    so each page is a single range query and no COUNT is ever run.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None, page_size=None):
+        self.request = request
+        self.page_size = min(page_size or self.page_size, self.max_page_size)
+        self.cursor = self.decode_cursor(request, queryset.model)
+
+        if self.cursor is None:
+            reverse = False
+            queryset = queryset.order_by('-created_at', '-id')
+        else:
+            created_at, pk, reverse = self.cursor
+            if reverse:
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                ).order_by('created_at', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+                ).order_by('-created_at', '-id')
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, self.cursor is not None
+
+        self.next_position = None
+        self.previous_position = None
+        if rows:
+            if has_next:
+                self.next_position = (rows[-1].created_at, rows[-1].pk, False)
+            if has_previous:
+                self.previous_position = (rows[0].created_at, rows[0].pk, True)
+        elif reverse:
+            # Nothing left before the boundary; point back to where we came from
+            created_at, pk, _ = self.cursor
+            self.next_position = (created_at, pk, False)
+
+        return rows
+
+    def get_next_link(self):
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        return self.encode_cursor(self.previous_position)
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'limit': self.page_size,
+            'results': data,
+        }
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            created_at = parse_datetime(created_at)
+            pk = model._meta.pk.to_python(pk)
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, bool(reverse)
+
+    def encode_cursor(self, position):
+        if position is None:
+            return None
+        created_at, pk, reverse = position
+        payload = json.dumps([created_at.isoformat(), str(pk), int(reverse)], separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, token)
@@ -0,0 +1,122 @@
+"""Denormalized publication rollups on Term and Program."""
+
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, F, IntegerField, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Program, Term, Lesson
+
+
+def _aggregate(queryset, group_field, expression, output_field):
+    """Correlated subquery computing one aggregate per outer row."""
+    return Subquery(
+        queryset.filter(**{group_field: OuterRef('pk')})
+        .order_by()
+        .values(group_field)
+        .annotate(value=expression)
+        .values('value'),
+        output_field=output_field,
+    )
+
+
+def _term_rollups():
+    lessons = Lesson.objects.filter(status='published')
+    return {
+        'published_lesson_count': Coalesce(
+            _aggregate(lessons, 'term', Count('pk'), IntegerField()), 0,
+        ),
+        'total_published_duration_ms': Coalesce(
+            _aggregate(lessons, 'term', Sum('duration_ms'), BigIntegerField()), 0,
+        ),
+        'last_published_at': _aggregate(lessons, 'term', Max('published_at'), Lesson._meta.get_field('published_at')),
+    }
+
+
+def _program_rollups():
+    terms = Term.objects.all()
+    return {
+        'published_lesson_count': Coalesce(
+            _aggregate(terms, 'program', Sum('published_lesson_count'), IntegerField()), 0,
+        ),
+        'total_published_duration_ms': Coalesce(
+            _aggregate(terms, 'program', Sum('total_published_duration_ms'), BigIntegerField()), 0,
+        ),
+        'last_published_at': _aggregate(terms, 'program', Max('last_published_at'), Term._meta.get_field('last_published_at')),
+    }
+
+
+def lock_rollups(term_ids=(), program_ids=()):
+    """
+    Lock the given terms, then their programs and any extra ``program_ids``,
+    each in primary key order; returns the ids of the locked programs. Must be
+    called inside a transaction.
+
+    The rollup UPDATEs read lessons in correlated subqueries. Under READ
+    COMMITTED (PostgreSQL) a statement that waited on a row lock still reads the
+    snapshot from when it started, so two writers refreshing the same term could
+    each miss the other's lessons. Taking the locks in a statement of its own
+    makes the UPDATEs that follow start after the other writer has committed.
+    SQLite serializes writers already, and ignores the locks.
+    """
+    program_ids = set(program_ids)
+    if term_ids:
+        program_ids.update(
+            Term.objects.select_for_update().filter(pk__in=set(term_ids)).order_by('pk')
+            .values_list('program_id', flat=True)
+        )
+    if program_ids:
+        list(Program.objects.select_for_update().filter(pk__in=program_ids).order_by('pk').values_list('pk', flat=True))
+    return program_ids
+
+
+def refresh_rollups(term_ids=(), program_ids=()):
+    """
+    Recompute rollups for the given terms, then for their programs and any
+    extra ``program_ids``. Runs two set-based UPDATEs however many ids are
+    passed, after locking the rows (see lock_rollups). Returns the ids of the
+    programs that were refreshed.
+
+    The refreshed rows also get a new ``updated_at``: a program's (and term's)
+    timestamp then covers everything beneath it, which is what the conditional
+    GET validators in core.conditional rely on.
+    """
+    term_ids = set(term_ids)
+    if not term_ids and not program_ids:
+        return set()
+
+    now = timezone.now()
+    with transaction.atomic():
+        program_ids = lock_rollups(term_ids, program_ids)
+        if term_ids:
+            Term.objects.filter(pk__in=term_ids).update(updated_at=now, **_term_rollups())
+        Program.objects.filter(pk__in=program_ids).update(updated_at=now, **_program_rollups())
+    return program_ids
+
+
+def _drifted(model, rollups):
+    """Rows of ``model`` whose stored rollup columns differ from the ``rollups`` expressions."""
+    computed = {f'computed_{name}': expression for name, expression in rollups.items()}
+    differs = Q()
+    for name in rollups:
+        # NULL (no published lesson yet) only matches NULL
+        differs |= Q(**{f'{name}__isnull': True}) ^ Q(**{f'computed_{name}__isnull': True})
+        differs |= Q(**{f'{name}__lt': F(f'computed_{name}')}) | Q(**{f'{name}__gt': F(f'computed_{name}')})
+    return model.objects.annotate(**computed).filter(differs)
+
+
+def rebuild_rollups():
+    """
+    Recompute every rollup from scratch; returns the number of terms and the
+    ids of the programs whose rollups had drifted. Only those rows get a new
+    ``updated_at``, so a maintenance run leaves the validators of everything
+    that was already right alone.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        terms = Term.objects.filter(pk__in=_drifted(Term, _term_rollups()).values('pk')).update(
+            updated_at=now, **_term_rollups(),
+        )
+        program_ids = set(_drifted(Program, _program_rollups()).values_list('pk', flat=True))
+        Program.objects.filter(pk__in=program_ids).update(updated_at=now, **_program_rollups())
+    return terms, program_ids
@@ -0,0 +1,91 @@
+"""
+Read-replica routing.
+
+Reads go to one of REPLICA_DATABASES only while ReplicaPinningMiddleware is
+handling a safe (GET, HEAD, OPTIONS) request, which covers the public catalog
+and CMS reads. Everything else reads and writes the primary: unsafe requests,
+management commands such as publish_scheduled, the shell and tests.
+
+A client that has just written is pinned to the primary for
+REPLICA_PIN_SECONDS by a cookie, so it reads its own writes while the
+replicas catch up. Within a request, the first write pins its remaining
+reads as well. Catalog cache entries filled from a replica expire after
+CATALOG_REPLICA_CACHE_TIMEOUT, which bounds how long replica lag can
+outlive the invalidation that follows a write (see core.cache).
+"""
+
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PIN_COOKIE = 'primary_pin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Alias the current request reads from; None outside replica-eligible requests
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def reading_from_replica():
+    return _read_alias.get() is not None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        if _read_alias.get() is not None:
+            # Read the rest of this request from the primary too
+            _read_alias.set(None)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows, so objects from any of them can be related
+        pool = {'default', *settings.REPLICA_DATABASES}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware:
+    """Routes safe, unpinned requests' reads to a replica and pins clients after they write."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _begin(self, request):
+        if request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES:
+            return _read_alias.set(random.choice(settings.REPLICA_DATABASES))
+        return _read_alias.set(None)
+
+    def _finish(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self._begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self._finish(request, response)
+
+    async def __acall__(self, request):
+        token = self._begin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+        return self._finish(request, response)
@@ -0,0 +1,205 @@
+"""
+Full-text search over programs and lessons.
+
+Every searchable object has a SearchDocument row (title plus body text). The
+database indexes those rows natively: an FTS5 table kept in sync by triggers on
+SQLite, a weighted tsvector column with a GIN index on PostgreSQL (see migration
+0005). Other backends fall back to substring matching. The model signals in
+core.signals keep documents current as objects are saved.
+"""
+
+import re
+from itertools import islice
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connection
+from django.db.models import CharField, Exists, F, FloatField, Func, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from .models import Program, Lesson, SearchDocument
+
+
+PROGRAM = 'program'
+LESSON = 'lesson'
+
+INDEX_BATCH_SIZE = 500
+
+_WORD = re.compile(r'\w+')
+
+
+def _terms(query):
+    return _WORD.findall(query.lower())
+
+
+def _key(model, pk):
+    """The model's primary key as the database stores it, matching a text cast of the column."""
+    return str(model._meta.pk.get_db_prep_value(pk, connection))
+
+
+class FallbackSearchBackend:
+    """Substring matching for databases without a native full-text index."""
+
+    def filter(self, queryset, kind, query):
+        documents = SearchDocument.objects.filter(kind=kind)
+        for term in _terms(query):
+            documents = documents.filter(Q(title__icontains=term) | Q(body__icontains=term))
+        pk_field = queryset.model._meta.pk
+        ids = [pk_field.to_python(object_id) for object_id in documents.values_list('object_id', flat=True)]
+        return queryset.filter(pk__in=ids).annotate(search_rank=Value(0.0))
+
+
+class _FTSRank(Func):
+    """
+    Relevance of one FTS5 row for a MATCH query, higher is better. Found by
+    rowid, so FTS5 seeks the query's doclists to that row instead of scanning.
+    """
+    # FTS5 rank is bm25, where lower is more relevant
+    template = '(SELECT -rank FROM core_search_fts WHERE core_search_fts MATCH %(expressions)s)'
+    arg_joiner = ' AND rowid = '
+    output_field = FloatField()
+
+    def __init__(self, match, rowid):
+        super().__init__(Value(match), rowid)
+
+
+def _document_of(kind):
+    """The ``kind`` documents of the outer query's object, matched on its text-cast primary key."""
+    return SearchDocument.objects.filter(kind=kind, object_id=Cast(OuterRef('pk'), CharField()))
+
+
+class SQLiteSearchBackend:
+    """FTS5 with bm25 ranking; every term is matched as a prefix."""
+
+    def match(self, query):
+        return ' '.join(f'"{term}"*' for term in _terms(query))
+
+    def filter(self, queryset, kind, query):
+        match = self.match(query)
+        matches = SearchDocument.objects.filter(
+            kind=kind,
+            id__in=RawSQL('SELECT rowid FROM core_search_fts WHERE core_search_fts MATCH %s', [match]),
+        )
+        # Text object ids compare with integer keys under SQLite's column affinity
+        return queryset.filter(pk__in=matches.values('object_id')).annotate(
+            search_rank=Subquery(_document_of(kind).annotate(rank=_FTSRank(match, F('pk'))).values('rank')),
+        )
+
+
+class PostgresSearchBackend:
+    """tsvector/GIN with ts_rank_cd ranking; every term is matched as a prefix."""
+
+    def tsquery(self, query):
+        return ' & '.join(f'{term}:*' for term in _terms(query))
+
+    def filter(self, queryset, kind, query):
+        tsquery = SearchQuery(self.tsquery(query), config='simple', search_type='raw')
+        # The generated tsvector column from migration 0005, which isn't a model field
+        matches = _document_of(kind).alias(
+            document=RawSQL('document', [], output_field=SearchVectorField()),
+        ).filter(document=tsquery)
+        return queryset.filter(Exists(matches)).annotate(
+            search_rank=Subquery(
+                matches.annotate(rank=SearchRank(F('document'), tsquery, cover_density=True)).values('rank'),
+            ),
+        )
+
+
+def search_backend():
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return FallbackSearchBackend()
+
+
+def search(queryset, kind, query):
+    """
+    Restrict ``queryset`` to objects of ``kind`` matching ``query``, annotated
+    with ``search_rank`` (higher is more relevant) but not ordered by it.
+    """
+    if not _terms(query):
+        return queryset.annotate(search_rank=Value(0.0)).none()
+    return search_backend().filter(queryset, kind, query)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    ``?q=`` ranked full-text search on viewsets that set ``search_document``.
+    Results are ordered by relevance unless the request asks for an ordering.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_document', None)
+        query = request.query_params.get(self.search_param, '').strip()
+        if not kind or not query:
+            return queryset
+        queryset = search(queryset, kind, query)
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-search_rank', 'pk')
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        if not getattr(view, 'search_document', None):
+            return []
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Full-text search, ranked by relevance',
+            'schema': {'type': 'string'},
+        }]
+
+
+def _program_documents(programs):
+    for program in programs:
+        body = ' '.join([program.description, *(topic.name for topic in program.topics.all())])
+        yield SearchDocument(kind=PROGRAM, object_id=_key(Program, program.pk), title=program.title, body=body)
+
+
+def _lesson_documents(lessons):
+    for lesson in lessons:
+        body = f'{lesson.term.title} {lesson.term.program.title}'
+        yield SearchDocument(kind=LESSON, object_id=_key(Lesson, lesson.pk), title=lesson.title, body=body)
+
+
+def _save(documents):
+    """Upsert documents in batches; returns how many were written."""
+    documents = iter(documents)
+    saved = 0
+    while batch := list(islice(documents, INDEX_BATCH_SIZE)):
+        SearchDocument.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['kind', 'object_id'],
+            update_fields=['title', 'body'],
+        )
+        saved += len(batch)
+    return saved
+
+
+def index_programs(program_ids):
+    programs = Program.objects.filter(pk__in=program_ids).only('title', 'description').prefetch_related('topics')
+    return _save(_program_documents(programs))
+
+
+def index_lessons(lessons):
+    """(Re)index the lessons in ``lessons``, a queryset."""
+    lessons = lessons.select_related('term__program').only('title', 'term__title', 'term__program__title')
+    return _save(_lesson_documents(lessons.iterator(chunk_size=INDEX_BATCH_SIZE)))
+
+
+def remove(kind, model, pks):
+    SearchDocument.objects.filter(kind=kind, object_id__in=[_key(model, pk) for pk in pks]).delete()
+
+
+def rebuild_index():
+    """Drop and re-create every document; returns (programs, lessons) indexed."""
+    SearchDocument.objects.all().delete()
+    programs = _save(_program_documents(
+        Program.objects.only('title', 'description').prefetch_related('topics').iterator(chunk_size=INDEX_BATCH_SIZE)
+    ))
+    return programs, index_lessons(Lesson.objects.all())
@@ -1,12 +1,40 @@
 """DRF serializers with validation for language and scheduling rules."""
 
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
 from rest_framework import serializers
 from .models import Program, Term, Lesson, Topic
 from .services import ensure_primary_in_available
+from .sparse import SparseFieldsMixin
 
 
-class ProgramSerializer(serializers.ModelSerializer):
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves ids from ``context['related_instances'][model]`` when a bulk view preloaded them."""
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        preloaded = self.context.get('related_instances', {}).get(model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            return preloaded[pk]
+        except (KeyError, TypeError):
+            self.fail('does_not_exist', pk_value=data)
+
+
+class BulkValidationMixin:
+    def get_validators(self):
+        # Bulk views check unique constraints for the whole batch with one query
+        if self.context.get('bulk'):
+            return []
+        return super().get_validators()
+
+
+class ProgramSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     languages_available = serializers.ListField(
         child=serializers.CharField(max_length=5),
         allow_empty=False,
@@ -24,6 +52,9 @@ class ProgramSerializer(serializers.ModelSerializer):
             'published_at',
             'created_at',
             'updated_at',
+            'published_lesson_count',
+            'total_published_duration_ms',
+            'last_published_at',
         ]
 
     def validate_languages_available(self, value):
@@ -60,15 +91,15 @@ class ProgramSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class TopicSerializer(serializers.ModelSerializer):
+class TopicSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Topic
         fields = '__all__'
 
 
-class TermSerializer(serializers.ModelSerializer):
+class TermSerializer(SparseFieldsMixin, BulkValidationMixin, serializers.ModelSerializer):
     program = ProgramSerializer(read_only=True)
-    program_id = serializers.PrimaryKeyRelatedField(
+    program_id = PrefetchedPrimaryKeyRelatedField(
         queryset=Program.objects.all(),
         source='program',
         write_only=True,
@@ -84,12 +115,16 @@ class TermSerializer(serializers.ModelSerializer):
             'term_number',
             'title',
             'created_at',
+            'updated_at',
+            'published_lesson_count',
+            'total_published_duration_ms',
+            'last_published_at',
         ]
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class LessonSerializer(SparseFieldsMixin, BulkValidationMixin, serializers.ModelSerializer):
     term = TermSerializer(read_only=True)
-    term_id = serializers.PrimaryKeyRelatedField(
+    term_id = PrefetchedPrimaryKeyRelatedField(
         queryset=Term.objects.all(),
         source='term',
         write_only=True,
@@ -201,7 +236,7 @@ class LessonSerializer(serializers.ModelSerializer):
 
 
 # Catalog API Serializers (Public read-only)
-class CatalogLessonSerializer(serializers.ModelSerializer):
+class CatalogLessonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     
     class Meta:
         model = Lesson
@@ -210,24 +245,46 @@ class CatalogLessonSerializer(serializers.ModelSerializer):
                   'published_at', 'content_urls_by_language', 'status']
 
 
-class CatalogProgramSerializer(serializers.ModelSerializer):
+class CatalogProgramSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     terms = serializers.SerializerMethodField()
     topics = serializers.SerializerMethodField()
     
     class Meta:
         model = Program
         fields = ['id', 'title', 'description', 'language_primary', 
-                  'languages_available', 'published_at', 'status', 'topics', 'terms']
+                  'languages_available', 'published_at', 'status',
+                  'published_lesson_count', 'total_published_duration_ms', 'last_published_at',
+                  'topics', 'terms']
     
     def get_topics(self, obj):
+        sparse = self.context.get('sparse')
+        if sparse is not None:
+            if not sparse.expands('topics'):
+                return [str(topic.id) for topic in obj.topics.all()]
+            return [
+                {name: value for name, value in (('id', str(topic.id)), ('name', topic.name))
+                 if sparse.includes('topics', name)}
+                for topic in obj.topics.all()
+            ]
         return [{'id': str(topic.id), 'name': topic.name} for topic in obj.topics.all()]
     
     def get_terms(self, obj):
+        sparse = self.context.get('sparse')
+        if sparse is not None:
+            return self._sparse_terms(obj, sparse)
+
         # Only include terms with published lessons
+        # Uses the catalog prefetches when present (see core.catalog)
+        terms = getattr(obj, 'catalog_terms', None)
+        if terms is None:
+            terms = obj.terms.order_by('term_number')
+
         terms_data = []
-        for term in obj.terms.all():
-            published_lessons = term.lessons.filter(status='published')
-            if published_lessons.exists():
+        for term in terms:
+            published_lessons = getattr(term, 'published_lessons', None)
+            if published_lessons is None:
+                published_lessons = list(term.lessons.filter(status='published').order_by('lesson_number'))
+            if published_lessons:
                 lessons_data = CatalogLessonSerializer(published_lessons, many=True).data
                 terms_data.append({
                     'id': str(term.id),
@@ -238,3 +295,32 @@ class CatalogProgramSerializer(serializers.ModelSerializer):
         
         return terms_data
 
+    def _sparse_terms(self, obj, sparse):
+        # Empty terms are skipped via the rollups, so lessons load only when requested
+        terms = getattr(obj, 'catalog_terms', None)
+        if terms is None:
+            terms = obj.terms.filter(published_lesson_count__gt=0).order_by('term_number')
+        if not sparse.expands('terms'):
+            return [str(term.id) for term in terms]
+
+        terms_data = []
+        for term in terms:
+            data = {}
+            if sparse.includes('terms', 'id'):
+                data['id'] = str(term.id)
+            if sparse.includes('terms', 'term_number'):
+                data['term_number'] = term.term_number
+            if sparse.includes('terms', 'title'):
+                data['title'] = term.title
+            if sparse.includes('terms', 'lessons'):
+                lessons = getattr(term, 'published_lessons', None)
+                if lessons is None:
+                    lessons = term.lessons.filter(status='published').order_by('lesson_number')
+                if sparse.expands('terms.lessons'):
+                    data['lessons'] = CatalogLessonSerializer(
+                        lessons, many=True, context=self.context, sparse_path='terms.lessons',
+                    ).data
+                else:
+                    data['lessons'] = [lesson.id for lesson in lessons]
+            terms_data.append(data)
+        return terms_data
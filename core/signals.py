@@ -0,0 +1,221 @@
+"""Model signal receivers that feed catalog writes into core.changes, lesson contents and the search index."""
+
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import contents, export, facets, search
+from .changes import catalog_changed
+from .models import Program, Term, Lesson, Topic
+
+
+# Sent by bulk writers, which bypass per-object signals.
+# Arguments: sender (model class), created and updated (lists of instances).
+post_bulk_save = Signal()
+
+
+@receiver(post_save, sender=Program)
+@receiver(post_delete, sender=Program)
+def program_changed(sender, instance, **kwargs):
+    catalog_changed(program_ids=[instance.pk])
+
+
+@receiver(pre_delete, sender=Program)
+def program_deleting(sender, instance, **kwargs):
+    # The program drops out of its topics' program lists without an m2m signal
+    Topic.objects.filter(programs=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Term)
+@receiver(post_delete, sender=Term)
+def term_changed(sender, instance, **kwargs):
+    program_ids = {instance.program_id, getattr(instance, '_loaded_program_id', None)} - {None}
+    catalog_changed(program_ids=program_ids)
+    instance._loaded_program_id = instance.program_id
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def lesson_changed(sender, instance, **kwargs):
+    term_ids = {instance.term_id, getattr(instance, '_loaded_term_id', None)} - {None}
+    catalog_changed(term_ids=term_ids, lesson_ids=[instance.pk])
+    instance._loaded_term_id = instance.term_id
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, created, **kwargs):
+    if not created:
+        catalog_changed(program_ids=instance.programs.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Topic)
+def topic_deleted(sender, instance, **kwargs):
+    # The through rows are gone by post_delete, so collect programs up front
+    catalog_changed(program_ids=list(instance.programs.values_list('pk', flat=True)))
+
+
+@receiver(post_delete, sender=Topic)
+def topic_dropped(sender, instance, **kwargs):
+    facets.drop_topic(instance.pk)
+
+
+@receiver(m2m_changed, sender=Topic.programs.through)
+def topic_programs_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, Program):
+        program_ids = [instance.pk]
+        if action == 'pre_clear':
+            topic_ids = list(instance.topics.values_list('pk', flat=True))
+        else:
+            topic_ids = pk_set or ()
+    else:
+        topic_ids = [instance.pk]
+        if action == 'pre_clear':
+            program_ids = list(instance.programs.values_list('pk', flat=True))
+        else:
+            program_ids = pk_set or ()
+    # Topics list their programs, so membership changes are topic changes too
+    Topic.objects.filter(pk__in=topic_ids).update(updated_at=timezone.now())
+    catalog_changed(program_ids=program_ids)
+
+
+@receiver(post_bulk_save, sender=Program)
+def programs_bulk_saved(sender, created, updated, **kwargs):
+    catalog_changed(program_ids=[program.pk for program in created + updated])
+
+
+@receiver(post_bulk_save, sender=Term)
+def terms_bulk_saved(sender, created, updated, **kwargs):
+    program_ids = {term.program_id for term in created + updated}
+    program_ids.update(getattr(term, '_loaded_program_id', None) for term in updated)
+    catalog_changed(program_ids=program_ids - {None})
+    for term in updated:
+        term._loaded_program_id = term.program_id
+
+
+@receiver(post_bulk_save, sender=Lesson)
+def lessons_bulk_saved(sender, created, updated, **kwargs):
+    term_ids = {lesson.term_id for lesson in created + updated}
+    term_ids.update(getattr(lesson, '_loaded_term_id', None) for lesson in updated)
+    catalog_changed(term_ids=term_ids - {None}, lesson_ids=[lesson.pk for lesson in created + updated])
+    for lesson in updated:
+        lesson._loaded_term_id = lesson.term_id
+
+
+# Per-language lesson content (see core.contents)
+
+@receiver(post_save, sender=Lesson)
+def sync_lesson_contents(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or contents.CONTENT_FIELDS & set(update_fields):
+        contents.sync_lessons([instance])
+
+
+@receiver(post_bulk_save, sender=Lesson)
+def sync_bulk_lesson_contents(sender, created, updated, **kwargs):
+    contents.sync_lessons(created + updated)
+
+
+# Export tombstones (see core.export) for lessons that leave the catalog
+
+def _left_catalog(lesson):
+    # Lessons saved without being loaded first may have been published
+    return lesson.status != 'published' and getattr(lesson, '_loaded_status', 'published') == 'published'
+
+
+@receiver(post_save, sender=Lesson)
+def tombstone_unpublished_lesson(sender, instance, created, **kwargs):
+    if not created and _left_catalog(instance):
+        export.record_removed_lessons([instance.pk])
+    instance._loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Lesson)
+def tombstone_deleted_lesson(sender, instance, **kwargs):
+    if 'published' in (instance.status, getattr(instance, '_loaded_status', None)):
+        export.record_removed_lessons([instance.pk])
+
+
+@receiver(post_bulk_save, sender=Lesson)
+def tombstone_bulk_unpublished_lessons(sender, created, updated, **kwargs):
+    export.record_removed_lessons([lesson.pk for lesson in updated if _left_catalog(lesson)])
+    for lesson in updated:
+        lesson._loaded_status = lesson.status
+
+
+# Search documents (see core.search). Lesson documents carry their term and
+# program titles, so saving either re-indexes the lessons beneath it.
+
+@receiver(post_save, sender=Program)
+def index_program(sender, instance, created, **kwargs):
+    search.index_programs([instance.pk])
+    if not created:
+        search.index_lessons(Lesson.objects.filter(term__program=instance))
+
+
+@receiver(post_delete, sender=Program)
+def unindex_program(sender, instance, **kwargs):
+    search.remove(search.PROGRAM, Program, [instance.pk])
+
+
+@receiver(post_save, sender=Term)
+def index_term_lessons(sender, instance, created, **kwargs):
+    if not created:
+        search.index_lessons(instance.lessons.all())
+
+
+@receiver(post_save, sender=Lesson)
+def index_lesson(sender, instance, **kwargs):
+    search.index_lessons(Lesson.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Lesson)
+def unindex_lesson(sender, instance, **kwargs):
+    search.remove(search.LESSON, Lesson, [instance.pk])
+
+
+@receiver(post_save, sender=Topic)
+def index_topic_programs(sender, instance, created, **kwargs):
+    if not created:
+        search.index_programs(instance.programs.values_list('pk', flat=True))
+
+
+@receiver(pre_delete, sender=Topic)
+def remember_topic_programs(sender, instance, **kwargs):
+    instance._indexed_program_ids = list(instance.programs.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Topic)
+def reindex_topic_programs(sender, instance, **kwargs):
+    search.index_programs(getattr(instance, '_indexed_program_ids', ()))
+
+
+@receiver(m2m_changed, sender=Topic.programs.through)
+def index_topic_membership(sender, instance, action, pk_set, **kwargs):
+    if action == 'pre_clear':
+        if isinstance(instance, Program):
+            instance._indexed_program_ids = [instance.pk]
+        else:
+            instance._indexed_program_ids = list(instance.programs.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        search.index_programs(instance.__dict__.pop('_indexed_program_ids', ()))
+    elif action in ('post_add', 'post_remove'):
+        search.index_programs([instance.pk] if isinstance(instance, Program) else pk_set or ())
+
+
+@receiver(post_bulk_save, sender=Program)
+def index_bulk_programs(sender, created, updated, **kwargs):
+    search.index_programs([program.pk for program in created + updated])
+    if updated:
+        search.index_lessons(Lesson.objects.filter(term__program__in=[program.pk for program in updated]))
+
+
+@receiver(post_bulk_save, sender=Term)
+def index_bulk_term_lessons(sender, created, updated, **kwargs):
+    if updated:
+        search.index_lessons(Lesson.objects.filter(term__in=[term.pk for term in updated]))
+
+
+@receiver(post_bulk_save, sender=Lesson)
+def index_bulk_lessons(sender, created, updated, **kwargs):
+    search.index_lessons(Lesson.objects.filter(pk__in=[lesson.pk for lesson in created + updated]))
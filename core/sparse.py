@@ -0,0 +1,176 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?expand=`` on read endpoints.
+
+``fields`` is a comma-separated list of field names; dotted names (``term.title``)
+select fields of a nested object. ``expand`` lists the relations rendered as nested
+objects (``term``, ``term.program``). Once either parameter is present, relations
+that are not expanded render as their primary key, and the queryset is projected
+to the columns, joins and prefetches the response actually needs.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _split(value):
+    return {part.strip() for part in value.split(',') if part.strip()}
+
+
+def _join(path, name):
+    return f'{path}.{name}' if path else name
+
+
+class SparseFieldset:
+    def __init__(self, fields=None, expand=()):
+        self.fields = set(fields) if fields else None
+        self.expand = set()
+        # Selecting a nested field or expanding a nested relation expands its parents
+        for path in set(expand) | {field.rpartition('.')[0] for field in self.fields or ()}:
+            parts = path.split('.') if path else []
+            for index in range(1, len(parts) + 1):
+                self.expand.add('.'.join(parts[:index]))
+
+    @classmethod
+    def from_request(cls, request):
+        """Returns None unless the (read) request asks for a sparse response."""
+        if request.method not in SAFE_METHODS:
+            return None
+        fields = request.query_params.get('fields')
+        expand = request.query_params.get('expand')
+        if fields is None and expand is None:
+            return None
+        return cls(_split(fields or ''), _split(expand or ''))
+
+    def fields_at(self, path=''):
+        """Names requested at ``path``, or None for all of them."""
+        if self.fields is None:
+            return None
+        prefix = f'{path}.' if path else ''
+        names = {field[len(prefix):].split('.')[0] for field in self.fields if field.startswith(prefix)}
+        return names or None
+
+    def includes(self, path, name):
+        names = self.fields_at(path)
+        return names is None or name in names
+
+    def expands(self, path):
+        return path in self.expand
+
+    def cache_params(self):
+        return {
+            'fields': ','.join(sorted(self.fields or ())),
+            'expand': ','.join(sorted(self.expand)),
+        }
+
+
+class SparseFieldsMixin:
+    """
+    Serializer side of sparse fieldsets; reads the SparseFieldset from
+    ``context['sparse']``. Serializers rendered outside a parent serializer can
+    pass ``sparse_path`` to say where they sit in the response.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._sparse_path = kwargs.pop('sparse_path', None)
+        super().__init__(*args, **kwargs)
+
+    @property
+    def sparse_path(self):
+        if self._sparse_path is not None:
+            return self._sparse_path
+        names = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                names.append(node.field_name)
+            node = node.parent
+        return '.'.join(reversed(names))
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse = self.context.get('sparse')
+        if sparse is None:
+            return fields
+
+        path = self.sparse_path
+        names = sparse.fields_at(path)
+        if names is not None:
+            fields = {name: field for name, field in fields.items() if name in names}
+        for name, field in fields.items():
+            if isinstance(field, serializers.BaseSerializer) and not sparse.expands(_join(path, name)):
+                fields[name] = self._collapsed_field(name, field)
+        return fields
+
+    def _collapsed_field(self, name, field):
+        source = field.source or name
+        if isinstance(field, serializers.ListSerializer):
+            kwargs = {'source': source} if source != name else {}
+            return serializers.PrimaryKeyRelatedField(many=True, read_only=True, **kwargs)
+        # Render the foreign key column itself so the relation is never joined
+        return serializers.ReadOnlyField(source=self.Meta.model._meta.get_field(source).attname)
+
+
+def project_queryset(queryset, serializer, also=()):
+    """
+    Restrict ``queryset`` to what ``serializer`` renders: ``only()`` the concrete
+    columns, ``select_related`` expanded foreign keys and prefetch to-many relations
+    (just their keys when collapsed). ``also`` names extra columns the caller reads.
+    """
+    only, related, prefetches = set(also), [], []
+
+    def walk(serializer, model, prefix):
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source.split('.')[0])
+            except FieldDoesNotExist:
+                model_field = None
+            if model_field is None or field.source == '*':
+                # Method fields and properties may read any column
+                only.update(prefix + f.name for f in model._meta.concrete_fields)
+            elif model_field.many_to_many or model_field.one_to_many:
+                lookup = prefix + model_field.name
+                if isinstance(field, serializers.ManyRelatedField):
+                    prefetches.append(Prefetch(lookup, queryset=model_field.related_model.objects.only('pk')))
+                else:
+                    prefetches.append(lookup)
+            elif model_field.is_relation:
+                only.add(prefix + model_field.name)
+                if isinstance(field, serializers.BaseSerializer):
+                    related.append(prefix + model_field.name)
+                    walk(field, model_field.related_model, f'{prefix}{model_field.name}__')
+            elif model_field.concrete:
+                only.add(prefix + model_field.name)
+
+    walk(serializer, queryset.model, '')
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if related:
+        # select_related() without arguments would follow every foreign key
+        queryset = queryset.select_related(*related)
+    return queryset.prefetch_related(*prefetches).only(*only)
+
+
+class SparseFieldsViewMixin:
+    """Viewset side: passes the SparseFieldset to serializers and projects the queryset."""
+
+    def get_sparse_fieldset(self):
+        if not hasattr(self, '_sparse'):
+            # No request when the schema generator introspects the view
+            self._sparse = SparseFieldset.from_request(self.request) if getattr(self, 'request', None) else None
+        return self._sparse
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        sparse = self.get_sparse_fieldset()
+        if sparse is not None:
+            context['sparse'] = sparse
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.get_sparse_fieldset() is None:
+            return queryset
+        return project_queryset(queryset, self.get_serializer())
@@ -0,0 +1,177 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_program, create_term
+from core.models import Term, Lesson
+
+
+class BulkWriteTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        User = get_user_model()
+        User.objects.create_user(username="bulk", password="Test12345!", is_staff=True)
+        User.objects.create_user(username="viewer", password="Test12345!", is_staff=False)
+        self.client = APIClient()
+        self.client.login(username="bulk", password="Test12345!")
+
+        self.program = create_program("Bulk")
+        self.term = create_term(self.program)
+
+    def _payload(self, number, **kwargs):
+        payload = {
+            "term_id": self.term.id,
+            "lesson_number": number,
+            "title": f"Lesson {number}",
+            "content_type": "video",
+            "content_language_primary": "en",
+            "content_languages_available": ["en"],
+            "content_urls_by_language": {"en": "https://cdn.example.com/en.mp4"},
+        }
+        payload.update(kwargs)
+        return payload
+
+    def _post(self, items, url="/api/lessons/bulk/"):
+        return self.client.post(url, items, format="json")
+
+    def test_bulk_create_uses_constant_queries(self):
+        def run(start, count):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self._post([self._payload(n) for n in range(start, start + count)])
+            self.assertEqual(resp.status_code, 201, resp.data)
+            self.assertEqual(resp.data["created"], count)
+            return len(ctx.captured_queries)
+
+        small = run(1, 2)
+        large = run(100, 50)
+        self.assertEqual(small, large)
+        self.assertEqual(Lesson.objects.count(), 52)
+
+    def test_results_follow_item_order(self):
+        resp = self._post([self._payload(3), self._payload(1), self._payload(2)])
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual([item["lesson_number"] for item in resp.data["results"]], [3, 1, 2])
+        self.assertTrue(all(item["id"] for item in resp.data["results"]))
+        self.assertEqual(resp.data["results"][0]["term"]["program"]["title"], "Bulk")
+
+    def test_errors_are_reported_per_item_and_nothing_is_saved(self):
+        resp = self._post([
+            self._payload(1),
+            self._payload(2, content_languages_available=["fr"]),
+            self._payload(3, term_id=999999),
+        ])
+
+        self.assertEqual(resp.status_code, 400)
+        errors = resp.data["errors"]
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(errors[0], {})
+        self.assertIn("content_languages_available", errors[1])
+        self.assertIn("term_id", errors[2])
+        self.assertFalse(Lesson.objects.exists())
+
+    def test_update_by_id(self):
+        first = self._post([self._payload(1), self._payload(2)]).data["results"]
+
+        resp = self._post([
+            {"id": first[0]["id"], "title": "Renamed"},
+            self._payload(3),
+        ])
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual((resp.data["created"], resp.data["updated"]), (1, 1))
+        renamed = Lesson.objects.get(pk=first[0]["id"])
+        self.assertEqual(renamed.title, "Renamed")
+        self.assertGreater(renamed.updated_at, renamed.created_at)
+        self.assertEqual(Lesson.objects.count(), 3)
+
+    def test_unknown_id_is_an_item_error(self):
+        resp = self._post([{"id": 999999, "title": "Missing"}])
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["errors"], [{"id": ["Not found."]}])
+
+    def test_unique_together_within_batch_and_against_existing_rows(self):
+        self._post([self._payload(1)])
+
+        resp = self._post([self._payload(1), self._payload(2), self._payload(2)])
+
+        self.assertEqual(resp.status_code, 400)
+        errors = resp.data["errors"]
+        self.assertIn("non_field_errors", errors[0])
+        self.assertEqual(errors[1], {})
+        self.assertEqual(
+            errors[2]["non_field_errors"],
+            ["The fields term, lesson_number must make a unique set."],
+        )
+        self.assertEqual(Lesson.objects.count(), 1)
+
+    def test_swapping_numbers_is_not_a_conflict_with_itself(self):
+        created = self._post([self._payload(1)]).data["results"]
+
+        resp = self._post([{"id": created[0]["id"], "lesson_number": 1, "title": "Same"}])
+
+        self.assertEqual(resp.status_code, 200, resp.data)
+
+    def test_rejects_non_list_and_oversized_payloads(self):
+        self.assertEqual(self._post({"title": "x"}).status_code, 400)
+        self.assertEqual(self._post([]).status_code, 400)
+        self.assertEqual(self._post([self._payload(n) for n in range(1, 1003)]).status_code, 400)
+
+    def test_rollups_and_catalog_cache_are_refreshed(self):
+        now = timezone.now().isoformat()
+        self.assertEqual(self.client.get("/catalog/programs/").data["count"], 0)
+
+        resp = self._post([
+            self._payload(1, status="published", published_at=now, duration_ms=1000),
+            self._payload(2, status="published", published_at=now, duration_ms=500),
+        ])
+
+        self.assertEqual(resp.status_code, 201, resp.data)
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.published_lesson_count, 2)
+        self.assertEqual(self.program.total_published_duration_ms, 1500)
+        self.assertEqual(self.client.get("/catalog/programs/").data["count"], 1)
+
+    def test_moving_lessons_refreshes_the_previous_term(self):
+        now = timezone.now().isoformat()
+        other = create_term(self.program, 2)
+        created = self._post([self._payload(1, status="published", published_at=now)]).data["results"]
+
+        self._post([{"id": created[0]["id"], "term_id": other.id}])
+
+        self.term.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(self.term.published_lesson_count, 0)
+        self.assertEqual(other.published_lesson_count, 1)
+
+    def test_bulk_terms(self):
+        resp = self._post(
+            [
+                {"program_id": self.program.id, "term_number": 2, "title": "Two"},
+                {"program_id": self.program.id, "term_number": 1},
+            ],
+            url="/api/terms/bulk/",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["errors"][0], {})
+        self.assertIn("non_field_errors", resp.data["errors"][1])
+
+        resp = self._post(
+            [{"program_id": self.program.id, "term_number": 2, "title": "Two"}],
+            url="/api/terms/bulk/",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(Term.objects.filter(program=self.program).count(), 2)
+
+    def test_non_staff_cannot_bulk_write(self):
+        self.client.logout()
+        self.client.login(username="viewer", password="Test12345!")
+
+        self.assertEqual(self._post([self._payload(1)]).status_code, 403)
+        self.assertFalse(Lesson.objects.exists())
@@ -0,0 +1,120 @@
+import threading
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from core import cache
+from core.catalog_async import (
+    _gather, alist_catalog_programs, aget_catalog_program, aget_catalog_lesson, aexport_catalog_ndjson,
+)
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Topic
+
+
+# Async views run queries on pool threads with their own connections, which
+# only see committed rows, so these tests don't wrap each test in a transaction
+class AsyncCatalogViewTests(TransactionTestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        self.programs = []
+        for number in range(3):
+            program = create_program(
+                f"Program {number}",
+                language_primary="en" if number else "fr",
+                languages_available=["en", "fr"],
+                status="published",
+            )
+            Topic.objects.get_or_create(name="Shared")[0].programs.add(program)
+            term = create_term(program, title="Term")
+            self.lesson = create_lesson(term, 1, title="Lesson", status="published")
+            self.programs.append(program)
+
+    async def _both(self, view, url, **kwargs):
+        """(async response, sync response) for ``url``, each from a cold cache."""
+        await sync_to_async(cache.catalog_cache().clear)()
+        async_response = await view(self.factory.get(url), **kwargs)
+        await sync_to_async(cache.catalog_cache().clear)()
+        sync_response = await sync_to_async(self.client.get)(url)
+        return async_response, sync_response
+
+    async def test_responses_match_the_sync_views(self):
+        cases = [
+            (alist_catalog_programs, "/catalog/programs/?limit=2&offset=1", {}),
+            (alist_catalog_programs, "/catalog/programs/?language=en&topic=shar", {}),
+            (aget_catalog_program, f"/catalog/programs/{self.programs[0].id}/", {"id": self.programs[0].id}),
+            (aget_catalog_lesson, f"/catalog/lessons/{self.lesson.id}/", {"id": self.lesson.id}),
+        ]
+        for view, url, kwargs in cases:
+            async_response, sync_response = await self._both(view, url, **kwargs)
+            self.assertEqual(async_response.status_code, 200, url)
+            self.assertEqual(async_response.content, sync_response.content, url)
+            self.assertEqual(async_response["ETag"], sync_response["ETag"], url)
+            self.assertEqual(async_response["Cache-Control"], "public, max-age=300")
+
+    @override_settings(CATALOG_COMPRESSION_CODECS=["gzip"], CATALOG_COMPRESSION_MIN_SIZE=0)
+    async def test_precompressed_bodies_match_the_sync_views(self):
+        url = "/catalog/programs/"
+        await sync_to_async(cache.catalog_cache().clear)()
+        async_response = await alist_catalog_programs(self.factory.get(url, headers={"Accept-Encoding": "gzip"}))
+        await sync_to_async(cache.catalog_cache().clear)()
+        sync_response = await sync_to_async(self.client.get)(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(async_response["Content-Encoding"], "gzip")
+        self.assertEqual(async_response.content, sync_response.content)
+        self.assertEqual(async_response["ETag"], sync_response["ETag"])
+        self.assertTrue(async_response["ETag"].startswith("W/"))
+
+    async def test_conditional_get_and_cache(self):
+        url = "/catalog/programs/"
+        first = await alist_catalog_programs(self.factory.get(url))
+        # Served from the entry the first request cached
+        cached = await alist_catalog_programs(self.factory.get(url))
+        self.assertEqual(cached.content, first.content)
+
+        resp = await alist_catalog_programs(self.factory.get(url, headers={"If-None-Match": first["ETag"]}))
+        self.assertEqual(resp.status_code, 304)
+
+        await sync_to_async(cache.catalog_cache().clear)()
+        resp = await alist_catalog_programs(self.factory.get(url, headers={"If-None-Match": first["ETag"]}))
+        self.assertEqual(resp.status_code, 304)
+
+    async def test_not_found(self):
+        resp = await aget_catalog_lesson(self.factory.get("/catalog/lessons/999999/"), id=999999)
+        self.assertEqual(resp.status_code, 404)
+        self.assertEqual(resp.content, b'{"error":"Lesson not found or not published"}')
+
+        draft = await Program.objects.acreate(title="Draft", language_primary="en", languages_available=["en"])
+        resp = await aget_catalog_program(self.factory.get(f"/catalog/programs/{draft.id}/"), id=draft.id)
+        self.assertEqual(resp.status_code, 404)
+
+    async def test_other_variants_use_the_sync_views(self):
+        for url in ("/catalog/programs/?fields=id,title", "/catalog/programs/?pagination=cursor"):
+            async_response, sync_response = await self._both(alist_catalog_programs, url)
+            await sync_to_async(async_response.render)()
+            self.assertEqual(async_response.content, sync_response.content, url)
+
+    async def test_ndjson_export_streams_asynchronously(self):
+        resp = await aexport_catalog_ndjson(self.factory.get("/catalog/export.ndjson"))
+        self.assertTrue(resp.is_async)
+        body = b"".join([chunk async for chunk in resp.streaming_content])
+
+        sync_body = await sync_to_async(
+            lambda: b"".join(self.client.get("/catalog/export.ndjson").streaming_content)
+        )()
+        self.assertEqual(body, sync_body)
+        self.assertEqual(len(body.splitlines()), 6)
+
+    async def test_independent_queries_run_concurrently(self):
+        # Each call waits for the other; run one after another they would time out
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait(result):
+            barrier.wait()
+            return result
+
+        results = await _gather(partial(wait, 1), partial(wait, 2))
+        self.assertEqual(results, [1, 2])
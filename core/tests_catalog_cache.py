@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_lesson, create_program, create_term
+from core.models import Lesson, Topic
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.topic = Topic.objects.create(name="Science")
+        self.program = create_program("Physics", topics=[self.topic], status="published")
+        self.term = create_term(self.program, title="Mechanics")
+        self.lesson = create_lesson(self.term, 1, status="published")
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(ctx.captured_queries)
+
+    def test_tests_use_an_in_memory_catalog_cache(self):
+        # Clearing it in setUp must not wipe a development server's file cache
+        self.assertIsInstance(cache.catalog_cache(), LocMemCache)
+
+    def test_repeat_requests_are_served_from_cache(self):
+        for url in (
+            "/catalog/programs/",
+            f"/catalog/programs/{self.program.id}/",
+            f"/catalog/lessons/{self.lesson.id}/",
+        ):
+            first, first_queries = self._get(url)
+            second, second_queries = self._get(url)
+            self.assertGreater(first_queries, 0)
+            self.assertEqual(second_queries, 0)
+            self.assertEqual(first.data, second.data)
+
+    def test_equivalent_query_strings_share_an_entry(self):
+        self._get("/catalog/programs/?offset=0&limit=10")
+        _, queries = self._get("/catalog/programs/")
+        self.assertEqual(queries, 0)
+
+    def test_new_published_lesson_appears_immediately(self):
+        self._get("/catalog/programs/")
+        self._get(f"/catalog/programs/{self.program.id}/")
+
+        create_lesson(self.term, 2, status="published")
+
+        listing, _ = self._get("/catalog/programs/")
+        detail, _ = self._get(f"/catalog/programs/{self.program.id}/")
+        self.assertEqual(len(listing.data["results"][0]["terms"][0]["lessons"]), 2)
+        self.assertEqual(len(detail.data["terms"][0]["lessons"]), 2)
+
+    def test_lesson_edit_invalidates_lesson_detail(self):
+        self._get(f"/catalog/lessons/{self.lesson.id}/")
+        self.lesson.title = "Renamed"
+        self.lesson.save()
+
+        resp, _ = self._get(f"/catalog/lessons/{self.lesson.id}/")
+        self.assertEqual(resp.data["title"], "Renamed")
+
+    def test_topic_changes_invalidate_programs(self):
+        self._get(f"/catalog/programs/{self.program.id}/")
+        self.topic.name = "Natural Science"
+        self.topic.save()
+        resp, _ = self._get(f"/catalog/programs/{self.program.id}/")
+        self.assertEqual(resp.data["topics"][0]["name"], "Natural Science")
+
+        self.program.topics.remove(self.topic)
+        resp, _ = self._get(f"/catalog/programs/{self.program.id}/")
+        self.assertEqual(resp.data["topics"], [])
+
+    def test_other_programs_stay_cached(self):
+        other = create_program("Chemistry")
+        self._get(f"/catalog/programs/{self.program.id}/")
+        other.title = "Organic Chemistry"
+        other.save()
+        _, queries = self._get(f"/catalog/programs/{self.program.id}/")
+        self.assertEqual(queries, 0)
+
+    def test_publish_scheduled_invalidates_catalog(self):
+        scheduled = create_lesson(self.term, 2, status="scheduled", publish_at=timezone.now() + timedelta(minutes=5))
+        self._get("/catalog/programs/")
+        Lesson.objects.filter(pk=scheduled.pk).update(publish_at=timezone.now() - timedelta(minutes=1))
+
+        call_command("publish_scheduled", stdout=open("/dev/null", "w"))
+
+        listing, _ = self._get("/catalog/programs/")
+        self.assertEqual(len(listing.data["results"][0]["terms"][0]["lessons"]), 2)
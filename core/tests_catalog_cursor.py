@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program
+
+
+class CatalogCursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        base = timezone.now()
+        for idx in range(7):
+            program = create_program(f"Program {idx}")
+            create_lesson(create_term(program), 1, title="Intro", status="published", published_at=base)
+            # Programs 2-4 share a timestamp so ties are broken by id
+            created_at = base - timedelta(minutes=min(idx, 2) if idx <= 4 else idx)
+            Program.objects.filter(pk=program.pk).update(created_at=created_at)
+
+        self.expected = [
+            str(pk) for pk in Program.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+
+    def _walk(self, url, link):
+        ids = []
+        while url:
+            resp = self.client.get(url)
+            self.assertEqual(resp.status_code, 200)
+            page = [item["id"] for item in resp.data["results"]]
+            ids = page + ids if link == "previous" else ids + page
+            url = resp.data[link]
+        return ids, resp
+
+    def test_forward_walk_visits_every_program_once(self):
+        ids, last = self._walk("/catalog/programs/?pagination=cursor&limit=3", "next")
+        self.assertEqual(ids, self.expected)
+        self.assertIsNone(last.data["next"])
+        self.assertNotIn("count", last.data)
+
+    def test_backward_walk_from_last_page(self):
+        url = "/catalog/programs/?pagination=cursor&limit=3"
+        while True:
+            resp = self.client.get(url)
+            if not resp.data["next"]:
+                break
+            url = resp.data["next"]
+
+        ids, first = self._walk(resp.data["previous"], "previous")
+        self.assertEqual(ids + [item["id"] for item in resp.data["results"]], self.expected)
+        self.assertIsNone(first.data["previous"])
+
+    def test_first_page_has_no_previous_link(self):
+        resp = self.client.get("/catalog/programs/?pagination=cursor&limit=3")
+        self.assertIsNone(resp.data["previous"])
+        self.assertIn("cursor=", resp.data["next"])
+
+    def test_cursor_mode_runs_no_count_query(self):
+        first = self.client.get("/catalog/programs/?pagination=cursor&limit=3")
+        cache.catalog_cache().clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(first.data["next"])
+        self.assertFalse(any("COUNT(" in q["sql"].upper() for q in ctx.captured_queries))
+
+    def test_invalid_cursor_is_rejected(self):
+        resp = self.client.get("/catalog/programs/?cursor=not-a-cursor")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_offset_mode_is_unchanged(self):
+        resp = self.client.get("/catalog/programs/?limit=3&offset=3")
+        self.assertEqual(resp.data["count"], 7)
+        self.assertEqual([item["id"] for item in resp.data["results"]], self.expected[3:6])
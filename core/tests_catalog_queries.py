@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Topic
+
+
+class CatalogQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.topic = Topic.objects.create(name="Math")
+
+    def _create_programs(self, count, terms=3, lessons=4):
+        programs = []
+        for p_idx in range(count):
+            program = create_program(f"Program {Program.objects.count()}", topics=[self.topic], status="published")
+            for t_idx in range(1, terms + 1):
+                term = create_term(program, t_idx, title=f"Term {t_idx}")
+                for l_idx in range(1, lessons + 1):
+                    # Every other lesson stays a draft to exercise the published filter
+                    create_lesson(term, l_idx, status="published" if l_idx % 2 else "draft")
+            programs.append(program)
+        return programs
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries), resp
+
+    def test_list_query_count_is_constant(self):
+        self._create_programs(1)
+        small, _ = self._count_queries("/catalog/programs/?limit=50")
+
+        self._create_programs(9, terms=5)
+        large, resp = self._count_queries("/catalog/programs/?limit=50")
+
+        self.assertEqual(resp.data["count"], 10)
+        self.assertEqual(small, large)
+        # count + programs + topics + terms + published lessons
+        self.assertLessEqual(large, 5)
+
+    def test_detail_query_count_is_constant(self):
+        small_program = self._create_programs(1, terms=1, lessons=1)[0]
+        small, _ = self._count_queries(f"/catalog/programs/{small_program.id}/")
+
+        large_program = self._create_programs(1, terms=8, lessons=10)[0]
+        large, resp = self._count_queries(f"/catalog/programs/{large_program.id}/")
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(resp.data["terms"]), 8)
+
+    def test_only_published_lessons_are_listed_in_order(self):
+        program = self._create_programs(1, terms=2, lessons=4)[0]
+        resp = self.client.get(f"/catalog/programs/{program.id}/")
+
+        self.assertEqual([t["term_number"] for t in resp.data["terms"]], [1, 2])
+        for term in resp.data["terms"]:
+            self.assertEqual([l["lesson_number"] for l in term["lessons"]], [1, 3])
+            self.assertTrue(all(l["status"] == "published" for l in term["lessons"]))
+
+    def test_terms_without_published_lessons_are_hidden(self):
+        program = self._create_programs(1, terms=1, lessons=1)[0]
+        create_term(program, 2, title="Empty")
+        resp = self.client.get(f"/catalog/programs/{program.id}/")
+        self.assertEqual(len(resp.data["terms"]), 1)
@@ -0,0 +1,75 @@
+import gzip
+import json
+import zlib
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core import cache, compression
+from core.factories import create_lesson, create_program, create_term
+
+
+@override_settings(CATALOG_COMPRESSION=True, CATALOG_COMPRESSION_CODECS=["gzip", "deflate"], CATALOG_COMPRESSION_MIN_SIZE=1024)
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        for number in range(5):
+            program = create_program(
+                f"Program {number}", description="A long description. " * 10, status="published",
+            )
+            term = create_term(program, title="Term")
+            self.lesson = create_lesson(term, 1, title="Lesson", status="published")
+
+    def test_negotiation(self):
+        encodings = {"gzip": b"", "deflate": b""}
+        self.assertEqual(compression.negotiate("gzip, deflate, br", encodings), "gzip")
+        self.assertEqual(compression.negotiate("deflate, gzip;q=0.5", encodings), "deflate")
+        self.assertEqual(compression.negotiate("gzip;q=0, *", encodings), "deflate")
+        self.assertEqual(compression.negotiate("*;q=0.1", encodings), "gzip")
+        self.assertIsNone(compression.negotiate("br, identity", encodings))
+        self.assertIsNone(compression.negotiate("", encodings))
+
+    def test_compressed_bodies_are_served_from_the_cache(self):
+        plain = self.client.get("/catalog/programs/")
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        # The first response filled the entry; hits neither render nor compress
+        gzip_codec = mock.Mock(wraps=compression.CODECS["gzip"])
+        with mock.patch.dict(compression.CODECS, gzip=gzip_codec), \
+                mock.patch.object(compression._renderer, "render") as render:
+            resp = self.client.get("/catalog/programs/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+            resp = self.client.get("/catalog/programs/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        gzip_codec.assert_not_called()
+        render.assert_not_called()
+
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(resp.content)), json.loads(plain.content))
+        self.assertLess(len(resp.content), len(plain.content))
+        self.assertEqual(resp["ETag"], f"W/{plain['ETag']}")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+
+        resp = self.client.get("/catalog/programs/", HTTP_ACCEPT_ENCODING="deflate")
+        self.assertEqual(json.loads(zlib.decompress(resp.content)), json.loads(plain.content))
+
+        # The weak validator still revalidates
+        resp = self.client.get(
+            "/catalog/programs/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=resp["ETag"],
+        )
+        self.assertEqual(resp.status_code, 304)
+
+    def test_small_and_non_json_responses_are_not_compressed(self):
+        resp = self.client.get(f"/catalog/lessons/{self.lesson.pk}/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", resp)
+        self.assertNotIn("Accept-Encoding", resp.get("Vary", ""))
+
+        resp = self.client.get("/catalog/programs/", HTTP_ACCEPT_ENCODING="gzip", HTTP_ACCEPT="text/html")
+        self.assertNotIn("Content-Encoding", resp)
+        self.assertContains(resp, "Program 4")
+
+        with override_settings(CATALOG_COMPRESSION=False):
+            cache.catalog_cache().clear()
+            resp = self.client.get("/catalog/programs/", HTTP_ACCEPT_ENCODING="gzip")
+            self.assertNotIn("Content-Encoding", resp)
@@ -0,0 +1,116 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_lesson, create_program, create_term
+from core.models import Topic
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.program = create_program("Validators", status="published")
+        self.term = create_term(self.program, title="One")
+        self.lesson = create_lesson(self.term, 1, status="published")
+
+    def _revalidate(self, url, etag):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return resp, len(ctx.captured_queries)
+
+    def test_catalog_detail_revalidates_without_serializing(self):
+        url = f"/catalog/programs/{self.program.id}/"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", first)
+
+        resp, queries = self._revalidate(url, first["ETag"])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp["ETag"], first["ETag"])
+        self.assertEqual(resp["Cache-Control"], "public, max-age=300")
+        self.assertEqual(queries, 0)  # served from the cached validators
+
+        cache.catalog_cache().clear()
+        resp, queries = self._revalidate(url, first["ETag"])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(queries, 1)  # the program row only; no prefetches
+
+    def test_nested_changes_change_the_program_etag(self):
+        url = f"/catalog/programs/{self.program.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        self.lesson.title = "Renamed"
+        self.lesson.save()
+
+        resp, _ = self._revalidate(url, etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_if_modified_since(self):
+        url = f"/catalog/lessons/{self.lesson.id}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        resp = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_catalog_list_etag_tracks_deletions(self):
+        other = create_program("Other", status="published")
+        create_lesson(create_term(other), 1, status="published")
+        etag = self.client.get("/catalog/programs/")["ETag"]
+
+        self.assertEqual(self._revalidate("/catalog/programs/", etag)[0].status_code, 304)
+
+        other.delete()
+        resp, _ = self._revalidate("/catalog/programs/", etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["count"], 1)
+
+    def test_catalog_list_variants_have_distinct_etags(self):
+        full = self.client.get("/catalog/programs/")["ETag"]
+        sparse = self.client.get("/catalog/programs/?fields=id")["ETag"]
+        cursor = self.client.get("/catalog/programs/?pagination=cursor")
+
+        self.assertEqual(len({full, sparse, cursor["ETag"]}), 3)
+        self.assertEqual(self._revalidate("/catalog/programs/?pagination=cursor", cursor["ETag"])[0].status_code, 304)
+
+    def test_cms_list_revalidates_with_one_query(self):
+        first = self.client.get("/api/lessons/")
+        self.assertEqual(first.status_code, 200)
+
+        resp, queries = self._revalidate("/api/lessons/", first["ETag"])
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(queries, 1)
+
+    def test_cms_list_etag_follows_nested_objects(self):
+        etag = self.client.get("/api/lessons/")["ETag"]
+
+        self.term.title = "Renamed"
+        self.term.save()
+
+        self.assertEqual(self._revalidate("/api/lessons/", etag)[0].status_code, 200)
+
+    def test_cms_retrieve(self):
+        url = f"/api/terms/{self.term.id}/"
+        first = self.client.get(url)
+        self.assertIn("Last-Modified", first)
+        self.assertEqual(self._revalidate(url, first["ETag"])[0].status_code, 304)
+
+        create_lesson(self.term, 2, status="published")  # rollups change the term's representation
+        self.assertEqual(self._revalidate(url, first["ETag"])[0].status_code, 200)
+
+        self.assertEqual(self.client.get("/api/terms/999999/").status_code, 404)
+
+    def test_topic_membership_changes_the_topic_etag(self):
+        topic = Topic.objects.create(name="Algebra")
+        etag = self.client.get("/api/topics/")["ETag"]
+
+        topic.programs.add(self.program)
+        self.assertEqual(self._revalidate("/api/topics/", etag)[0].status_code, 200)
+
+        etag = self.client.get("/api/topics/")["ETag"]
+        self.program.delete()
+        self.assertEqual(self._revalidate("/api/topics/", etag)[0].status_code, 200)
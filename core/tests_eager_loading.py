@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.eager import LazyLoadError
+from core.factories import create_lesson, create_program, create_term
+from core.models import Topic
+from core.views import LessonViewSet
+
+
+@override_settings(LAZY_LOAD_GUARD=True)
+class EagerLoadingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.program_count = 0
+
+    def _add_program(self, lessons=2):
+        self.program_count += 1
+        topic = Topic.objects.create(name=f"Topic {self.program_count}")
+        term = create_term(create_program(f"Program {self.program_count}", topics=[topic]))
+        for number in range(1, lessons + 1):
+            create_lesson(term, number)
+
+    def _query_count(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assertConstantQueries(self, url):
+        self._add_program()
+        small = self._query_count(url)
+        for _ in range(4):
+            self._add_program()
+        self.assertEqual(self._query_count(url), small)
+
+    def test_lesson_list(self):
+        self.assertConstantQueries("/api/lessons/")
+
+    def test_term_list(self):
+        self.assertConstantQueries("/api/terms/")
+
+    def test_topic_list(self):
+        self.assertConstantQueries("/api/topics/")
+
+    def test_program_list(self):
+        self.assertConstantQueries("/api/programs/")
+
+    def test_guard_raises_on_lazy_relation(self):
+        self._add_program()
+        with mock.patch.object(LessonViewSet, "select_related_fields", ()):
+            with self.assertRaises(LazyLoadError):
+                self.client.get("/api/lessons/")
+
+    @override_settings(LAZY_LOAD_GUARD=False)
+    def test_guard_is_off_outside_debug(self):
+        self._add_program()
+        with mock.patch.object(LessonViewSet, "select_related_fields", ()):
+            self.assertEqual(self.client.get("/api/lessons/").status_code, 200)
@@ -0,0 +1,173 @@
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache
+from core.export import TOMBSTONE_RETENTION, export_catalog
+from core.factories import create_lesson, create_program, create_term
+from core.models import Lesson, LessonTombstone
+
+
+class CatalogExportTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir, ignore_errors=True)
+        # Without the overlap, rows saved during setUp are older than the first watermark
+        patcher = mock.patch("core.export.WATERMARK_OVERLAP", timedelta(0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.programs = []
+        self.lessons = []
+        for number in range(3):
+            program = create_program(f"Program {number}", status="published")
+            self.programs.append(program)
+            self.lessons.append(create_lesson(create_term(program, title="Term"), 1, status="published"))
+
+    def _read(self, name):
+        return (self.dir / name).read_bytes()
+
+    def _file_versions(self):
+        versions = {}
+        for root, _, names in os.walk(self.dir):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                # Rewrites rename a new file into place, so the inode changes
+                versions[path] = (stat.st_ino, stat.st_mtime_ns)
+        return versions
+
+    def test_full_export_matches_the_api(self):
+        stats = export_catalog(self.dir, page_size=2)
+        self.assertEqual((stats["full"], stats["programs"], stats["pages"], stats["lessons"]), (True, 3, 2, 3))
+
+        self.assertEqual(
+            self._read("programs/page-1.json"),
+            self.client.get("/catalog/programs/?limit=2").content,
+        )
+        self.assertEqual(
+            self._read("programs/page-2.json"),
+            self.client.get("/catalog/programs/?limit=2&offset=2").content,
+        )
+        program = self.programs[0]
+        self.assertEqual(
+            self._read(f"programs/{program.id}.json"),
+            self.client.get(f"/catalog/programs/{program.id}/").content,
+        )
+        lesson = self.lessons[0]
+        self.assertEqual(
+            self._read(f"lessons/{lesson.id}.json"),
+            self.client.get(f"/catalog/lessons/{lesson.id}/").content,
+        )
+        manifest = json.loads(self._read("manifest.json"))
+        self.assertEqual(manifest["programs"], [str(p.id) for p in reversed(self.programs)])
+
+    def test_incremental_export_rewrites_only_affected_files(self):
+        export_catalog(self.dir, page_size=2)
+        stats = export_catalog(self.dir, page_size=2)
+        self.assertEqual((stats["full"], stats["programs"], stats["pages"], stats["lessons"]), (False, 0, 0, 0))
+
+        # Program 0 is last in the list, alone on page 2
+        before = self._file_versions()
+        lesson = self.lessons[0]
+        lesson.title = "Renamed"
+        lesson.save()
+        stats = export_catalog(self.dir, page_size=2)
+
+        self.assertEqual((stats["programs"], stats["pages"], stats["lessons"]), (1, 1, 1))
+        changed = {path for path, version in self._file_versions().items() if before.get(path) != version}
+        self.assertEqual(
+            {os.path.relpath(path, self.dir) for path in changed},
+            {
+                f"lessons/{lesson.id}.json",
+                f"programs/{self.programs[0].id}.json",
+                "programs/page-2.json",
+                "manifest.json",
+            },
+        )
+        self.assertIn(b"Renamed", self._read("programs/page-2.json"))
+
+    def test_removed_content_is_removed_from_the_export(self):
+        export_catalog(self.dir, page_size=2)
+
+        extra = create_lesson(self.lessons[1].term, 2, status="published")
+        export_catalog(self.dir, page_size=2)
+        self.assertTrue((self.dir / f"lessons/{extra.id}.json").exists())
+
+        extra.status = "draft"
+        extra.save()
+        self.programs[0].delete()
+        stats = export_catalog(self.dir, page_size=2)
+
+        self.assertFalse((self.dir / f"lessons/{extra.id}.json").exists())
+        self.assertFalse((self.dir / f"lessons/{self.lessons[0].id}.json").exists())
+        self.assertFalse((self.dir / f"programs/{self.programs[0].id}.json").exists())
+        self.assertFalse((self.dir / "programs/page-2.json").exists())
+        self.assertEqual(stats["removed"], 4)
+        self.assertEqual(json.loads(self._read("programs/page-1.json"))["count"], 2)
+
+    def test_incremental_export_removes_lessons_by_tombstone(self):
+        export_catalog(self.dir, page_size=2)
+        unpublished, deleted, republished = self.lessons
+        unpublished.status = "draft"
+        unpublished.save()
+        Lesson.objects.get(pk=deleted.pk).delete()
+        republished.status = "draft"
+        republished.save()
+        republished.status = "published"
+        republished.save()
+        self.assertEqual(
+            set(LessonTombstone.objects.values_list("lesson_id", flat=True)),
+            {unpublished.id, deleted.id, republished.id},
+        )
+
+        # Neither the export directory nor the published lessons are listed
+        with mock.patch("core.export.os.scandir") as scandir:
+            stats = export_catalog(self.dir, page_size=2)
+        scandir.assert_not_called()
+
+        self.assertFalse(stats["full"])
+        self.assertFalse((self.dir / f"lessons/{unpublished.id}.json").exists())
+        self.assertFalse((self.dir / f"lessons/{deleted.id}.json").exists())
+        self.assertTrue((self.dir / f"lessons/{republished.id}.json").exists())
+
+    def test_export_older_than_the_tombstones_is_redone_in_full(self):
+        export_catalog(self.dir, page_size=2)
+        stale = self.dir / "lessons/0.json"
+        stale.write_bytes(b"{}")
+        LessonTombstone.objects.create(lesson_id=0, removed_at=timezone.now() - TOMBSTONE_RETENTION * 2)
+
+        later = timezone.now() + TOMBSTONE_RETENTION * 2
+        with mock.patch("core.export.timezone.now", return_value=later):
+            stats = export_catalog(self.dir, page_size=2)
+
+        self.assertTrue(stats["full"])
+        self.assertFalse(stale.exists())
+        self.assertFalse(LessonTombstone.objects.exists())
+
+    def test_command_and_publish_hook(self):
+        out = StringIO()
+        call_command("export_catalog", "--dir", str(self.dir), stdout=out)
+        self.assertIn("Full export: wrote 3 program(s), 1 list page(s) and 3 lesson(s)", out.getvalue())
+
+        scheduled = create_lesson(self.lessons[2].term, 2, status="scheduled", publish_at=timezone.now() + timedelta(hours=1))
+        Lesson.objects.filter(pk=scheduled.pk).update(publish_at=timezone.now() - timedelta(minutes=1))
+        out = StringIO()
+        call_command("publish_scheduled", "--export-dir", str(self.dir), stdout=out)
+
+        self.assertIn("Exported catalog", out.getvalue())
+        self.assertTrue((self.dir / f"lessons/{scheduled.id}.json").exists())
+        page = json.loads(self._read("programs/page-1.json"))
+        self.assertEqual(page["results"][0]["published_lesson_count"], 2)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache, facets
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Lesson, Topic, FacetCount
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.algebra = Topic.objects.create(name="Algebra")
+        self.poetry = Topic.objects.create(name="Poetry")
+
+        self.math = create_program("Math", language_primary="en", topics=[self.algebra], status="published")
+        self.math_term = create_term(self.math)
+        create_lesson(self.math_term, 1, is_paid=True, status="published")
+        create_lesson(self.math_term, 2, content_type="article", status="published")
+
+        self.verse = create_program("Verse", language_primary="hi", topics=[self.algebra, self.poetry], status="published")
+        self.verse_term = create_term(self.verse)
+        create_lesson(self.verse_term, 1, status="published")
+
+        # No published lessons: not in the catalog, so not counted
+        self.draft = create_program("Draft", language_primary="en", topics=[self.poetry], status="published")
+        self.draft_term = create_term(self.draft)
+        create_lesson(self.draft_term, 1, content_type="article", status="draft")
+
+    def _facets(self, query=""):
+        cache.catalog_cache().clear()
+        resp = self.client.get(f"/catalog/facets/{query}")
+        self.assertEqual(resp.status_code, 200)
+        return {
+            facet: {entry.get("name", entry.get("value")): entry["count"] for entry in entries}
+            for facet, entries in resp.data.items()
+        }
+
+    def assertCountersExact(self):
+        """The incrementally maintained counters equal a recount from scratch."""
+        maintained = facets.counts()
+        facets.rebuild_facets()
+        self.assertEqual(maintained, facets.counts())
+        # Also the same as the aggregate used for filtered requests
+        self.assertEqual(maintained, facets.filtered_counts(Program.objects.all()))
+
+    def test_counts(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self._facets(), {
+                "topic": {"Algebra": 2, "Poetry": 1},
+                "language": {"en": 1, "hi": 1},
+                "content_type": {"video": 2, "article": 1},
+                "paid": {"free": 2, "paid": 1},
+            })
+        self.assertCountersExact()
+
+    def test_filtered_counts_use_one_aggregate(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self._facets("?topic=poet"), {
+                "topic": {"Algebra": 1, "Poetry": 1},
+                "language": {"hi": 1},
+                "content_type": {"video": 1},
+                "paid": {"free": 1},
+            })
+        self.assertEqual(self._facets("?language=en")["paid"], {"free": 1, "paid": 1})
+
+    def test_writes_keep_counters_current(self):
+        self._facets()
+        # Publishing the draft program's only lesson brings it into the catalog
+        lesson = self.draft_term.lessons.get()
+        Lesson.objects.filter(pk=lesson.pk).update(status="scheduled", publish_at=timezone.now() - timedelta(minutes=1))
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("publish_scheduled", stdout=StringIO())
+        counts = self._facets()
+        self.assertEqual(counts["topic"], {"Algebra": 2, "Poetry": 2})
+        self.assertEqual(counts["content_type"], {"video": 2, "article": 2})
+        self.assertCountersExact()
+
+        paid = self.math_term.lessons.get(lesson_number=1)
+        paid.is_paid = False
+        paid.save()
+        self.assertEqual(self._facets()["paid"], {"free": 3})
+
+        self.math.language_primary = "hi"
+        self.math.languages_available = ["hi"]
+        self.math.save()
+        self.poetry.programs.remove(self.verse)
+        self.algebra.delete()
+        counts = self._facets()
+        self.assertEqual(counts["language"], {"hi": 2, "en": 1})
+        self.assertEqual(counts["topic"], {"Poetry": 1})
+        self.assertCountersExact()
+
+        self.verse.delete()
+        self.math_term.lessons.all().delete()
+        self.assertEqual(self._facets(), {
+            "topic": {"Poetry": 1},
+            "language": {"en": 1},
+            "content_type": {"article": 1},
+            "paid": {"free": 1},
+        })
+        self.assertCountersExact()
+
+    def test_recompute_facets_repairs_drift(self):
+        FacetCount.objects.update(count=42)
+        out = StringIO()
+        call_command("recompute_facets", stdout=out)
+        self.assertIn("Recomputed facets for 2 catalog program(s)", out.getvalue())
+        self.assertEqual(self._facets()["language"], {"en": 1, "hi": 1})
@@ -0,0 +1,186 @@
+import json
+import os
+import tempfile
+import uuid
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import cache
+from core.importer import CatalogImporter, read_csv, read_ndjson
+from core.models import Program, Term, Lesson, Topic
+
+PROGRAM_ID = "8f14e45f-ceea-467f-a0e6-1b8b7c4d2a10"
+
+
+def _lines(*records):
+    return StringIO("".join(json.dumps(record) + "\n" for record in records))
+
+
+def _lesson(number, **extra):
+    return {
+        "type": "lesson",
+        "program_id": PROGRAM_ID,
+        "term_number": 1,
+        "lesson_number": number,
+        "title": f"Lesson {number}",
+        "content_type": "video",
+        "content_language_primary": "en",
+        "content_languages_available": ["en"],
+        "content_urls_by_language": {"en": "https://cdn.example.com/en.mp4"},
+        "status": "published",
+        "published_at": "2026-01-01T00:00:00Z",
+        **extra,
+    }
+
+
+RECORDS = [
+    {
+        "type": "program",
+        "id": PROGRAM_ID,
+        "title": "Imported algebra",
+        "language_primary": "en",
+        "languages_available": ["en"],
+        "status": "published",
+        "published_at": "2026-01-01T00:00:00Z",
+        "topics": ["Algebra", "Maths"],
+    },
+    {"type": "term", "program_id": PROGRAM_ID, "term_number": 1, "title": "Term 1"},
+    _lesson(1),
+    _lesson(2),
+    _lesson(3, status="draft", published_at=None),
+]
+
+
+class CatalogImportTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+
+    def _import(self, stream, chunk_size=1000):
+        errors = []
+        importer = CatalogImporter(chunk_size, on_error=lambda line, error: errors.append((line, error)))
+        stats = importer.run(read_ndjson(stream))
+        return stats, errors
+
+    def test_ndjson_import_is_idempotent(self):
+        stats, errors = self._import(_lines(*RECORDS), chunk_size=2)
+        self.assertEqual(errors, [])
+        self.assertEqual(stats["programs"], {"created": 1, "updated": 0})
+        self.assertEqual(stats["terms"], {"created": 1, "updated": 0})
+        self.assertEqual(stats["lessons"], {"created": 3, "updated": 0})
+
+        program = Program.objects.get()
+        self.assertEqual(str(program.id), PROGRAM_ID)
+        self.assertEqual(sorted(program.topics.values_list("name", flat=True)), ["Algebra", "Maths"])
+        # Rollups and the catalog follow the import
+        self.assertEqual(program.published_lesson_count, 2)
+        resp = self.client.get(f"/catalog/programs/{PROGRAM_ID}/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([lesson["title"] for lesson in resp.data["terms"][0]["lessons"]], ["Lesson 1", "Lesson 2"])
+
+        changed = [dict(RECORDS[0], title="Renamed", topics=["Maths"]), *RECORDS[1:4], _lesson(3)]
+        stats, errors = self._import(_lines(*changed))
+        self.assertEqual(errors, [])
+        self.assertEqual(stats["programs"], {"created": 0, "updated": 1})
+        self.assertEqual(stats["lessons"], {"created": 0, "updated": 3})
+        self.assertEqual((Program.objects.count(), Term.objects.count(), Lesson.objects.count()), (1, 1, 3))
+
+        program.refresh_from_db()
+        self.assertEqual(program.title, "Renamed")
+        self.assertEqual(list(program.topics.values_list("name", flat=True)), ["Maths"])
+        self.assertEqual(program.published_lesson_count, 3)
+        resp = self.client.get(f"/catalog/programs/{PROGRAM_ID}/")
+        self.assertEqual(resp.data["title"], "Renamed")
+        self.assertEqual(len(resp.data["terms"][0]["lessons"]), 3)
+
+    def test_search_index_follows(self):
+        self._import(_lines(*RECORDS))
+        resp = self.client.get("/catalog/search/?q=algebra")
+        self.assertEqual([program["title"] for program in resp.data["programs"]], ["Imported algebra"])
+
+    def test_invalid_records_are_reported_and_skipped(self):
+        records = [
+            dict(RECORDS[0], id="not-a-uuid"),
+            dict(RECORDS[0], languages_available=["fr"]),
+            RECORDS[0],
+            RECORDS[1],
+            {"type": "term", "program_id": str(uuid.uuid4()), "term_number": 1, "title": "Orphan"},
+            _lesson(1, content_type="podcast"),
+            _lesson(2, term_number=9),
+            {"type": "course"},
+        ]
+        stream = StringIO("".join(json.dumps(record) + "\n" for record in records) + "{oops\n")
+        stats, errors = self._import(stream)
+
+        errors = dict(errors)
+        self.assertEqual(sorted(errors), [1, 2, 5, 6, 7, 8, 9])
+        self.assertIn("id", errors[1])
+        self.assertIn("languages_available", errors[2])
+        self.assertIn("program_id", errors[5])
+        self.assertIn("content_type", errors[6])
+        self.assertIn("term", errors[7])
+        self.assertIn("type", errors[8])
+        self.assertIn("Invalid JSON", errors[9]["non_field_errors"][0])
+        self.assertEqual(Program.objects.count(), 1)
+        self.assertEqual(Term.objects.count(), 1)
+        self.assertEqual(Lesson.objects.count(), 0)
+
+    def test_catalog_dump_round_trip(self):
+        self._import(_lines(*RECORDS))
+        out = StringIO()
+        call_command("export_catalog_ndjson", stdout=out)
+        dump = out.getvalue()
+
+        Program.objects.all().delete()
+        Topic.objects.all().delete()
+        stats, errors = self._import(StringIO(dump))
+        self.assertEqual(errors, [])
+        self.assertEqual(stats["lessons"], {"created": 2, "updated": 0})
+        program = Program.objects.get()
+        self.assertEqual(program.title, "Imported algebra")
+        self.assertEqual(program.terms.get().title, "Term 1")
+        self.assertEqual(sorted(Lesson.objects.values_list("title", flat=True)), ["Lesson 1", "Lesson 2"])
+
+    def test_csv(self):
+        rows = StringIO(
+            "program_id,term_number,lesson_number,title,content_type,content_language_primary,"
+            "content_languages_available,content_urls_by_language\n"
+            f'{PROGRAM_ID},1,1,From CSV,article,en,"[""en""]","{{""en"": ""https://cdn.example.com/a""}}"\n'
+            f"{PROGRAM_ID},1,2,,article,en,,\n"
+        )
+        self._import(_lines(*RECORDS[:2]))
+        importer = CatalogImporter(on_error=lambda line, error: self.errors.append((line, error)))
+        self.errors = []
+        stats = importer.run(read_csv(rows, "lesson"))
+
+        self.assertEqual(stats["lessons"], {"created": 1, "updated": 0})
+        self.assertEqual([line for line, _ in self.errors], [3])
+        lesson = Lesson.objects.get()
+        self.assertEqual(lesson.title, "From CSV")
+        self.assertEqual(lesson.content_urls_by_language, {"en": "https://cdn.example.com/a"})
+
+    def test_command(self):
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        with os.fdopen(fd, "w") as handle:
+            handle.write(_lines(*RECORDS).getvalue())
+        self.addCleanup(os.unlink, path)
+
+        out = StringIO()
+        call_command("import_catalog", path, "--chunk-size", "2", stdout=out)
+        output = out.getvalue()
+        self.assertEqual(output.count("rows/s"), 4)
+        self.assertIn("Chunk 3: imported 1 record(s)", output)
+        self.assertIn("Lessons: 3 created, 0 updated", output)
+        self.assertIn("Imported 5 row(s)", output)
+
+        with open(path, "a") as handle:
+            handle.write('{"type": "lesson"}\n')
+        err = StringIO()
+        with self.assertRaisesMessage(CommandError, "Rejected 1 record(s)"):
+            call_command("import_catalog", path, stdout=StringIO(), stderr=err)
+        self.assertIn("Line 6:", err.getvalue())
+        self.assertEqual(Lesson.objects.count(), 3)
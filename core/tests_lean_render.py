@@ -0,0 +1,114 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import cache, lean
+from core.catalog import catalog_programs, catalog_program_prefetches
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Lesson, Topic
+from core.serializers import CatalogProgramSerializer, CatalogLessonSerializer
+
+
+class LeanRenderTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        published_at = datetime(2024, 3, 1, 9, 30, 15, 123456, tzinfo=dt_timezone.utc)
+
+        self.first = self._program("Café basics", published_at=published_at)
+        self.second = self._program("Second")
+        for name in ("Grammaire", "Algebra"):
+            Topic.objects.create(name=name).programs.add(self.first)
+
+        term = create_term(self.first, 2, title="Later")
+        self._lesson(term, 2, duration_ms=None, is_paid=True, published_at=published_at)
+        self._lesson(term, 1, content_urls_by_language={"fr": "https://cdn.example.com/é.mp4", "en": "x"})
+        self._lesson(term, 3, status="draft", published_at=None)
+        # Terms without published lessons are left out
+        empty = create_term(self.first, title="Drafts only")
+        self._lesson(empty, 1, status="draft", published_at=None)
+        create_term(self.first, 3)
+
+        self._lesson(create_term(self.second), 1)
+
+    def _program(self, title, **kwargs):
+        # Published, without a publication date unless given
+        kwargs.setdefault("published_at", None)
+        return create_program(
+            title, description="Ünïcode ✓", language_primary="fr", languages_available=["fr", "en"],
+            status="published", **kwargs,
+        )
+
+    def _lesson(self, term, number, **kwargs):
+        kwargs.setdefault("status", "published")
+        kwargs.setdefault("published_at", datetime(2024, 3, 2, tzinfo=dt_timezone.utc))
+        kwargs.setdefault("content_urls_by_language", {"fr": "https://cdn.example.com/fr.mp4"})
+        kwargs.setdefault("duration_ms", 60000)
+        return create_lesson(term, number, languages=("fr", "en"), title=f"Leçon {number}", **kwargs)
+
+    def _programs(self):
+        return catalog_programs().order_by("-created_at", "-id")
+
+    def _assert_identical(self):
+        renderer = JSONRenderer()
+        serialized = CatalogProgramSerializer(
+            self._programs().prefetch_related(*catalog_program_prefetches()), many=True,
+        ).data
+        self.assertEqual(renderer.render(lean.render_programs(self._programs())), renderer.render(serialized))
+
+        lessons = Lesson.objects.order_by("id")
+        self.assertEqual(
+            renderer.render(lean.render_lessons(lessons)),
+            renderer.render(CatalogLessonSerializer(lessons, many=True).data),
+        )
+        self.assertEqual(
+            renderer.render(lean.render_lessons(list(lessons))),
+            renderer.render(CatalogLessonSerializer(lessons, many=True).data),
+        )
+
+    def test_output_is_byte_identical_to_the_serializers(self):
+        self._assert_identical()
+
+    @override_settings(TIME_ZONE="Europe/Paris")
+    def test_output_is_byte_identical_in_other_timezones(self):
+        self._assert_identical()
+
+    def test_topics_are_listed_in_the_same_order(self):
+        # Created and linked out of name order, several per program
+        for name in ("Zoologie", "Mécanique", "Botanique"):
+            Topic.objects.create(name=name).programs.add(self.second, self.first)
+        self._assert_identical()
+
+        data = lean.render_programs(self._programs())
+        self.assertEqual([topic["name"] for topic in data[0]["topics"]], ["Botanique", "Mécanique", "Zoologie"])
+        self.assertEqual(
+            [topic["name"] for topic in data[1]["topics"]],
+            ["Algebra", "Botanique", "Grammaire", "Mécanique", "Zoologie"],
+        )
+
+    def test_program_tree_loads_in_fixed_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = lean.render_programs(self._programs())
+        self.assertEqual(len(ctx.captured_queries), 4)
+        self.assertEqual([term["term_number"] for term in data[1]["terms"]], [2])
+        self.assertEqual([lesson["lesson_number"] for lesson in data[1]["terms"][0]["lessons"]], [1, 2])
+
+        self.assertEqual(lean.render_programs(Program.objects.none()), [])
+
+    def test_catalog_views_match_the_serializer_path(self):
+        urls = [
+            "/catalog/programs/",
+            "/catalog/programs/?pagination=cursor",
+            f"/catalog/programs/{self.first.id}/",
+            f"/catalog/lessons/{self.first.terms.get(term_number=2).lessons.get(lesson_number=2).id}/",
+        ]
+        lean_bodies = [self.client.get(url).content for url in urls]
+
+        cache.catalog_cache().clear()
+        with override_settings(CATALOG_LEAN_RENDERING=False):
+            serializer_bodies = [self.client.get(url).content for url in urls]
+        self.assertEqual(lean_bodies, serializer_bodies)
@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core import cache, contents
+from core.factories import content_urls, create_lesson, create_program, create_term
+from core.models import Lesson, LessonContent
+
+
+class LessonContentTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.staff = APIClient()
+        self.staff.force_authenticate(User.objects.create_user("editor", is_staff=True))
+
+        self.program = create_program("Languages", languages_available=["en", "hi"], status="published")
+        self.term = create_term(self.program, title="Term")
+        self.bilingual = create_lesson(self.term, 1, ["en", "hi"], status="published")
+        self.english = create_lesson(self.term, 2, status="published")
+
+        term = create_term(create_program("English only", status="published"))
+        create_lesson(term, 1, status="published")
+        # Hindi, but not published: doesn't make its program available in Hindi
+        create_lesson(term, 2, ["en", "hi"], status="draft")
+
+    def _contents(self, lesson):
+        return dict(LessonContent.objects.filter(lesson=lesson).values_list("language", "url"))
+
+    def test_rows_follow_the_json_fields(self):
+        self.assertEqual(self._contents(self.bilingual), content_urls("en", "hi"))
+
+        # A language can be available before it has a URL
+        resp = self.staff.patch(
+            f"/api/lessons/{self.bilingual.pk}/",
+            {"content_languages_available": ["en", "fr"], "content_urls_by_language": {"en": "https://cdn.example.com/new.mp4"}},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200, resp.data)
+        self.assertEqual(self._contents(self.bilingual), {"en": "https://cdn.example.com/new.mp4", "fr": ""})
+
+        resp = self.staff.post("/api/lessons/bulk/", [{
+            "id": self.english.pk,
+            "content_language_primary": "hi",
+            "content_languages_available": ["hi"],
+            "content_urls_by_language": content_urls("hi"),
+        }], format="json")
+        self.assertIn(resp.status_code, (200, 201), resp.data)
+        self.assertEqual(self._contents(self.english), content_urls("hi"))
+
+        self.bilingual.delete()
+        self.assertFalse(LessonContent.objects.filter(lesson_id=self.bilingual.pk).exists())
+
+    def test_imports_and_rebuild(self):
+        path = os.path.join(tempfile.mkdtemp(), "lessons.ndjson")
+        self.addCleanup(os.unlink, path)
+        with open(path, "w") as handle:
+            handle.write(json.dumps({
+                "type": "lesson", "program_id": str(self.program.pk), "term_number": 1, "lesson_number": 3,
+                "title": "Imported", "content_type": "article", "content_language_primary": "hi",
+                "content_languages_available": ["hi", "ta"], "content_urls_by_language": content_urls("hi", "ta"),
+            }) + "\n")
+        call_command("import_catalog", path, stdout=StringIO())
+        imported = Lesson.objects.get(term=self.term, lesson_number=3)
+        self.assertEqual(self._contents(imported), content_urls("hi", "ta"))
+
+        LessonContent.objects.all().delete()
+        self.assertEqual(contents.rebuild_contents(), 8)
+        self.assertEqual(self._contents(self.bilingual), content_urls("en", "hi"))
+
+    def test_lang_filters_programs_and_projects_urls(self):
+        resp = self.client.get("/catalog/programs/?lang=hi")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([program["id"] for program in resp.data["results"]], [str(self.program.pk)])
+        lessons = resp.data["results"][0]["terms"][0]["lessons"]
+        self.assertEqual([lesson["content_urls_by_language"] for lesson in lessons], [content_urls("hi")])
+        # The rest of the lesson is untouched
+        self.assertEqual(lessons[0]["content_languages_available"], ["en", "hi"])
+
+        # Cached separately from the unprojected list
+        resp = self.client.get("/catalog/programs/")
+        self.assertEqual(resp.data["count"], 2)
+        self.assertEqual(
+            resp.data["results"][1]["terms"][0]["lessons"][0]["content_urls_by_language"], content_urls("en", "hi"),
+        )
+        self.assertEqual(self.client.get("/catalog/programs/?lang=hi").data["count"], 1)
+        self.assertEqual(self.client.get("/catalog/programs/?lang=fr").data["count"], 0)
+
+        resp = self.client.get("/catalog/programs/?lang=hi&fields=id,terms&expand=terms.lessons")
+        self.assertEqual(resp.data["results"][0]["terms"][0]["lessons"][0]["content_urls_by_language"], content_urls("hi"))
+
+    def test_lang_on_details(self):
+        resp = self.client.get(f"/catalog/programs/{self.program.pk}/?lang=hi")
+        self.assertEqual(resp.data["terms"][0]["lessons"][0]["content_urls_by_language"], content_urls("hi"))
+        self.assertEqual(self.client.get(f"/catalog/programs/{self.program.pk}/?lang=fr").status_code, 404)
+
+        resp = self.client.get(f"/catalog/lessons/{self.bilingual.pk}/?lang=hi")
+        self.assertEqual(resp.data["content_urls_by_language"], content_urls("hi"))
+        self.assertNotEqual(resp["ETag"], self.client.get(f"/catalog/lessons/{self.bilingual.pk}/")["ETag"])
+        self.assertEqual(self.client.get(f"/catalog/lessons/{self.english.pk}/?lang=hi").status_code, 404)
+
+    def test_lang_lists_only_lessons_in_that_language(self):
+        # A second term whose only lesson has no Hindi content
+        english_term = create_term(self.program, 2, title="English term")
+        create_lesson(english_term, 1, status="published")
+
+        def lessons(payload):
+            return {term["term_number"]: [lesson["lesson_number"] for lesson in term["lessons"]] for term in payload["terms"]}
+
+        for lean in (True, False):
+            with self.subTest(lean=lean), override_settings(CATALOG_LEAN_RENDERING=lean):
+                cache.catalog_cache().clear()
+                program = self.client.get("/catalog/programs/?lang=hi").data["results"][0]
+                self.assertEqual(lessons(program), {1: [1]})
+                program = self.client.get(f"/catalog/programs/{self.program.pk}/?lang=hi").data
+                self.assertEqual(lessons(program), {1: [1]})
+                # Without lang every published lesson is listed
+                program = self.client.get(f"/catalog/programs/{self.program.pk}/").data
+                self.assertEqual(lessons(program), {1: [1, 2], 2: [1]})
+
+        resp = self.client.get("/catalog/programs/?lang=hi&fields=id,terms&expand=terms.lessons")
+        self.assertEqual(lessons(resp.data["results"][0]), {1: [1]})
+        resp = self.client.get(f"/catalog/programs/{self.program.pk}/?lang=hi&fields=id,terms")
+        self.assertEqual(resp.data["terms"], [str(self.term.pk)])
+        resp = self.client.get(f"/catalog/programs/{self.program.pk}/?lang=hi&fields=id,terms&expand=terms")
+        self.assertEqual(resp.data["terms"][0]["lessons"], [self.bilingual.pk])
+
+    def test_availability_changes_reach_the_catalog(self):
+        self.assertEqual(self.client.get("/catalog/programs/?lang=ta").data["count"], 0)
+        self.english.content_languages_available = ["en", "ta"]
+        self.english.content_urls_by_language = content_urls("en", "ta")
+        self.english.save()
+        self.assertEqual(self.client.get("/catalog/programs/?lang=ta").data["count"], 1)
@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache, metrics
+from core.factories import create_lesson, create_program, create_term
+from core.models import Lesson
+
+
+def _samples(text):
+    """{'name{labels}': value} from a Prometheus text exposition."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        for metric in metrics.REGISTRY:
+            metric.reset()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(
+            METRICS_ENABLED=True, METRICS_DIR=self.directory, METRICS_FLUSH_INTERVAL=60,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+
+        self.term = create_term(create_program("Measured", status="published"), title="Term")
+        self.lesson = create_lesson(self.term, 1, status="published")
+
+    def _scrape(self):
+        resp = self.client.get("/metrics")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp["Content-Type"], metrics.CONTENT_TYPE)
+        return _samples(resp.content.decode())
+
+    def test_disabled(self):
+        with override_settings(METRICS_ENABLED=False):
+            self.assertEqual(APIClient().get("/metrics").status_code, 404)
+
+    def test_request_latency_queries_and_cache_ratio(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get("/api/programs/").status_code, 200)
+            self.assertEqual(self.client.get("/catalog/programs/").status_code, 200)
+        self.client.get("/no/such/page/")
+        samples = self._scrape()
+
+        route = 'route="api/programs/$",method="GET"'
+        self.assertEqual(samples[f"http_request_duration_seconds_count{{{route}}}"], 2)
+        self.assertEqual(samples[f'http_request_duration_seconds_bucket{{{route},le="+Inf"}}'], 2)
+        self.assertGreater(samples[f"http_request_duration_seconds_sum{{{route}}}"], 0)
+        self.assertEqual(samples['http_request_duration_seconds_count{route="<unmatched>",method="GET"}'], 1)
+        # The CMS list runs the same queries every time
+        self.assertEqual(samples['http_request_db_queries_count{route="api/programs/$"}'], 2)
+        self.assertEqual(
+            samples['http_request_db_queries_bucket{route="api/programs/$",le="0"}'], 0,
+        )
+
+        self.assertEqual(samples['catalog_cache_requests_total{result="miss"}'], 1)
+        self.assertEqual(samples['catalog_cache_requests_total{result="hit"}'], 1)
+        self.assertEqual(samples["catalog_cache_hit_ratio"], 0.5)
+
+    def test_publish_lag_batches_and_backlog(self):
+        overdue = create_lesson(self.term, 2)
+        Lesson.objects.filter(pk=overdue.pk).update(status="scheduled", publish_at=timezone.now() - timedelta(seconds=30))
+        create_lesson(self.term, 3, status="scheduled", publish_at=timezone.now() + timedelta(days=1))
+
+        samples = self._scrape()
+        self.assertEqual(samples["scheduled_lessons"], 2)
+        self.assertEqual(samples["scheduled_due_lessons"], 1)
+        self.assertGreaterEqual(samples["scheduled_oldest_due_seconds"], 30)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("publish_scheduled", stdout=StringIO())
+        samples = self._scrape()
+        self.assertEqual(samples["publish_batch_size_count"], 1)
+        self.assertEqual(samples["publish_batch_size_sum"], 1)
+        self.assertEqual(samples["publish_lag_seconds_count"], 1)
+        self.assertGreaterEqual(samples["publish_lag_seconds_sum"], 30)
+        self.assertEqual(samples['publish_lag_seconds_bucket{le="15.0"}'], 0)
+        self.assertEqual(samples['publish_lag_seconds_bucket{le="60.0"}'], 1)
+        self.assertEqual(samples["scheduled_due_lessons"], 0)
+
+    def test_values_from_other_processes_are_added(self):
+        script = (
+            "import django; django.setup()\n"
+            "from core import metrics\n"
+            "metrics.PUBLISH_BATCH_SIZE.observe(40)\n"
+            "metrics.CATALOG_CACHE.inc(3, result='hit')\n"
+        )
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "cms_backend.settings",
+            "METRICS_ENABLED": "1",
+            "METRICS_DIR": self.directory,
+        }
+        # Written at exit
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, cwd=settings.BASE_DIR)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+        metrics.PUBLISH_BATCH_SIZE.observe(2)
+        metrics.CATALOG_CACHE.inc(result="miss")
+        samples = self._scrape()
+        self.assertEqual(samples["publish_batch_size_count"], 2)
+        self.assertEqual(samples["publish_batch_size_sum"], 42)
+        self.assertEqual(samples['publish_batch_size_bucket{le="5"}'], 1)
+        self.assertEqual(samples["catalog_cache_hit_ratio"], 0.75)
+
+        # This process's own file is replaced by its live values, not added twice
+        metrics.flush()
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertEqual(self._scrape()["publish_batch_size_count"], 2)
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import cache, ndjson
+from core.factories import create_lesson, create_program, create_term
+from core.models import Topic
+
+
+class CatalogNDJSONTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.topic = Topic.objects.create(name="Algebra")
+        self.programs = []
+        for number in range(5):
+            program = create_program(f"Program {number}", topics=[self.topic], status="published")
+            term = create_term(program, title="Term")
+            for lesson_number in (1, 2):
+                create_lesson(term, lesson_number, status="published")
+            create_lesson(term, 3, status="draft")
+            self.programs.append(program)
+        # No published lessons, so not in the catalog
+        create_program("Empty")
+
+    def _records(self, body):
+        self.assertTrue(body.endswith(b"\n"))
+        return [json.loads(line) for line in body.decode().splitlines()]
+
+    def test_endpoint_streams_programs_then_their_lessons(self):
+        resp = self.client.get("/catalog/export.ndjson")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        records = self._records(b"".join(resp.streaming_content))
+
+        self.assertEqual([record["type"] for record in records], ["program", "lesson", "lesson"] * 5)
+        self.assertEqual(
+            [record["title"] for record in records if record["type"] == "program"],
+            [f"Program {number}" for number in range(5)],
+        )
+
+        program, lesson = records[0], records[1]
+        detail = self.client.get(f"/catalog/programs/{program['id']}/").json()
+        self.assertEqual(program["topics"], detail["topics"])
+        self.assertEqual(program["terms"], [{key: term[key] for key in ("id", "term_number", "title")} for term in detail["terms"]])
+        self.assertEqual(lesson["program_id"], program["id"])
+        self.assertEqual(lesson["term_id"], detail["terms"][0]["id"])
+        lesson_detail = self.client.get(f"/catalog/lessons/{lesson['id']}/").json()
+        self.assertEqual({k: v for k, v in lesson.items() if k not in ("type", "program_id", "term_id")}, lesson_detail)
+
+        self.assertEqual(self.client.post("/catalog/export.ndjson").status_code, 405)
+
+    def test_queries_grow_with_chunks_not_rows(self):
+        with CaptureQueriesContext(connection) as ctx:
+            chunks = list(ndjson.iter_chunks(chunk_size=2))
+        self.assertEqual(len(chunks), 3)
+        # The program iterator, then topics, terms and lessons per chunk
+        self.assertEqual(len(ctx.captured_queries), 1 + 3 * 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("export_catalog_ndjson", stdout=out)
+        self.assertEqual(len(self._records(out.getvalue().encode())), 15)
+
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        out = StringIO()
+        call_command("export_catalog_ndjson", "--output", path, "--chunk-size", "2", stdout=out)
+        self.assertIn("Wrote 15 line(s)", out.getvalue())
+        with open(path, "rb") as handle:
+            self.assertEqual(len(self._records(handle.read())), 15)
@@ -0,0 +1,105 @@
+import re
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Lesson, Topic
+
+
+FULL_SCAN = re.compile(r'\bSCAN (\S+)$')
+SUBQUERY = re.compile(r'\b(?:CO-ROUTINE|MATERIALIZE) (\S+)$')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are captured with SQLite EXPLAIN QUERY PLAN')
+class HotQueryPlanTests(TestCase):
+    """Every query on the hot paths must be answered from an index, not a table scan."""
+
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        topic = Topic.objects.create(name="Algebra")
+        self.program = create_program("Math", topics=[topic], status="published")
+        term = create_term(self.program)
+        self.lesson = create_lesson(term, 1, title="Intro", status="published")
+        scheduled = create_lesson(
+            term, 2, title="Next", status="scheduled", publish_at=timezone.now() + timedelta(minutes=5),
+        )
+        Lesson.objects.filter(pk=scheduled.pk).update(publish_at=timezone.now() - timedelta(minutes=1))
+
+    def _plans(self, ctx):
+        plans = []
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def assertNoFullScans(self, ctx, allowed=()):
+        plans = self._plans(ctx)
+        self.assertTrue(plans)
+        for sql, plan in plans:
+            # Scanning a derived table (e.g. COUNT over a DISTINCT subquery) isn't a table scan
+            derived = {m.group(1) for m in map(SUBQUERY.search, plan) if m}
+            for line in plan:
+                match = FULL_SCAN.search(line)
+                if match and match.group(1) not in derived and match.group(1) not in allowed:
+                    self.fail(f'Full table scan "{line}" for query:\n{sql}\nPlan: {plan}')
+
+    def _capture(self, url):
+        cache.catalog_cache().clear()
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return ctx
+
+    def test_catalog_list(self):
+        self.assertNoFullScans(self._capture("/catalog/programs/"))
+        self.assertNoFullScans(self._capture("/catalog/programs/?language=en"))
+
+    def test_catalog_list_cursor_mode(self):
+        other = create_program("Art")
+        # Only the rollup matters for catalog visibility here
+        Program.objects.filter(pk=other.pk).update(published_lesson_count=1)
+
+        first = self.client.get("/catalog/programs/?pagination=cursor&limit=1")
+        self.assertIsNotNone(first.data["next"])
+        self.assertNoFullScans(self._capture(first.data["next"]))
+
+    def test_catalog_list_topic_filter(self):
+        # Substring matches on the small topic dictionary can't use a b-tree on
+        # SQLite (PostgreSQL gets a trigram index); everything else must be indexed.
+        ctx = self._capture("/catalog/programs/?topic=alg")
+        self.assertNoFullScans(ctx, allowed=('core_topic', 'U0'))
+
+    def test_catalog_details(self):
+        self.assertNoFullScans(self._capture(f"/catalog/programs/{self.program.id}/"))
+        self.assertNoFullScans(self._capture(f"/catalog/lessons/{self.lesson.id}/"))
+
+    def test_catalog_content_language(self):
+        self.assertNoFullScans(self._capture("/catalog/programs/?lang=en"))
+        self.assertNoFullScans(self._capture(f"/catalog/programs/{self.program.id}/?lang=en"))
+        self.assertNoFullScans(self._capture(f"/catalog/lessons/{self.lesson.id}/?lang=en"))
+
+    def test_catalog_search(self):
+        self.assertNoFullScans(self._capture("/catalog/search/?q=intro"))
+        self.assertNoFullScans(self._capture("/api/lessons/?q=intro"))
+
+    def test_cms_program_list(self):
+        self.assertNoFullScans(self._capture("/api/programs/?status=published&language_primary=en"))
+
+    def test_scheduler(self):
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("publish_scheduled", stdout=StringIO())
+        self.assertNoFullScans(ctx)
@@ -0,0 +1,96 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import cache, routers
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Lesson
+
+
+def _replicate():
+    """Copy the primary into the replica (see cms_backend.test_settings), as replication would."""
+    connections["default"].ensure_connection()
+    connections["replica"].ensure_connection()
+    connections["default"].connection.backup(connections["replica"].connection)
+
+
+@override_settings(REPLICA_DATABASES=["replica"], REPLICA_PIN_SECONDS=5)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.staff = APIClient()
+        self.staff.force_authenticate(User.objects.create_user("editor", is_staff=True))
+
+    def _published_program(self, title):
+        program = create_program(title, status="published")
+        create_lesson(create_term(program, title="Term"), 1, title="Lesson", status="published")
+        return program
+
+    def test_safe_requests_read_from_the_replica(self):
+        self._published_program("Fresh")
+        client = APIClient()
+        self.assertEqual(client.get("/catalog/programs/").data["count"], 0)
+        self.assertEqual(client.get("/api/programs/").data["count"], 0)
+
+        _replicate()
+        cache.catalog_cache().clear()
+        self.assertEqual(client.get("/catalog/programs/").data["count"], 1)
+        self.assertEqual(client.get("/api/programs/").data["count"], 1)
+
+    def test_writers_read_their_writes(self):
+        _replicate()
+        resp = self.staff.post(
+            "/api/programs/",
+            {"title": "Just written", "language_primary": "en", "languages_available": ["en"]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.cookies[routers.PIN_COOKIE]["max-age"], 5)
+        url = f"/api/programs/{resp.data['id']}/"
+
+        # The writer is pinned to the primary; everyone else reads the lagging replica
+        self.assertEqual(self.staff.get(url).status_code, 200)
+        self.assertEqual(APIClient().get(url).status_code, 404)
+
+        self.staff.cookies.pop(routers.PIN_COOKIE)
+        self.assertEqual(self.staff.get(url).status_code, 404)
+
+    def test_rejected_writes_do_not_pin(self):
+        resp = self.staff.post("/api/programs/", {"title": ""}, format="json")
+        self.assertEqual(resp.status_code, 400)
+        self.assertNotIn(routers.PIN_COOKIE, resp.cookies)
+
+    def test_outside_requests_everything_uses_the_primary(self):
+        self.assertEqual(Program.objects.all().db, "default")
+
+        program = self._published_program("Scheduled")
+        _replicate()
+        lesson = create_lesson(program.terms.get(), 2, title="Due")
+        Lesson.objects.filter(pk=lesson.pk).update(status="scheduled", publish_at=timezone.now())
+
+        # The replica has never seen the lesson; the scheduler finds it on the primary
+        call_command("publish_scheduled", stdout=StringIO())
+        lesson.refresh_from_db()
+        self.assertEqual(lesson.status, "published")
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=3600, CATALOG_REPLICA_CACHE_TIMEOUT=60)
+    def test_entries_filled_from_a_replica_expire_sooner(self):
+        self._published_program("Cached")
+        _replicate()
+        backend = mock.MagicMock()
+        backend.get.return_value = None
+        with mock.patch.object(cache, "catalog_cache", return_value=backend):
+            APIClient().get("/catalog/programs/")
+            self.assertEqual(backend.set.call_args.kwargs["timeout"], 60)
+
+            backend.set.reset_mock()
+            cache.set_cached("key", {})
+            self.assertEqual(backend.set.call_args.kwargs["timeout"], 3600)
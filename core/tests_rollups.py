@@ -0,0 +1,166 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import facets
+from core.catalog import catalog_programs
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Term, Lesson
+from core.rollups import rebuild_rollups
+
+
+class PublicationRollupTests(TestCase):
+    def setUp(self):
+        self.program = create_program("Rollups")
+        self.term = create_term(self.program)
+        self.other_term = create_term(self.program, 2)
+
+    def _assert_rollups(self, obj, count, duration, last):
+        obj.refresh_from_db()
+        self.assertEqual(obj.published_lesson_count, count)
+        self.assertEqual(obj.total_published_duration_ms, duration)
+        self.assertEqual(obj.last_published_at, last)
+
+    def test_create_update_and_delete_keep_rollups_current(self):
+        first_at = timezone.now() - timedelta(hours=2)
+        second_at = timezone.now() - timedelta(hours=1)
+        first = create_lesson(self.term, 1, status="published", published_at=first_at, duration_ms=1000)
+        create_lesson(self.term, 2, status="draft", duration_ms=5000)
+        second = create_lesson(self.other_term, 1, status="published", published_at=second_at, duration_ms=250)
+
+        self._assert_rollups(self.term, 1, 1000, first_at)
+        self._assert_rollups(self.program, 2, 1250, second_at)
+
+        first.duration_ms = 3000
+        first.save()
+        self._assert_rollups(self.program, 2, 3250, second_at)
+
+        second.status = "archived"
+        second.save()
+        self._assert_rollups(self.other_term, 0, 0, None)
+        self._assert_rollups(self.program, 1, 3000, first_at)
+
+        first.delete()
+        self._assert_rollups(self.program, 0, 0, None)
+
+    def test_moving_a_lesson_refreshes_both_terms(self):
+        lesson = create_lesson(self.term, 1, status="published", duration_ms=10)
+        lesson = Lesson.objects.get(pk=lesson.pk)
+        lesson.term = self.other_term
+        lesson.save()
+
+        self._assert_rollups(self.term, 0, 0, None)
+        self.other_term.refresh_from_db()
+        self.assertEqual(self.other_term.published_lesson_count, 1)
+
+    def test_deleting_a_term_refreshes_the_program(self):
+        create_lesson(self.term, 1, status="published", duration_ms=10)
+        self.term.delete()
+        self._assert_rollups(self.program, 0, 0, None)
+
+    def test_publish_scheduled_updates_rollups(self):
+        lesson = create_lesson(
+            self.term, 1, status="scheduled", publish_at=timezone.now() + timedelta(minutes=1), duration_ms=40,
+        )
+        Lesson.objects.filter(pk=lesson.pk).update(publish_at=timezone.now() - timedelta(minutes=1))
+
+        call_command("publish_scheduled", stdout=StringIO())
+
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.published_lesson_count, 1)
+        self.assertEqual(self.program.total_published_duration_ms, 40)
+
+    def test_recompute_rollups_repairs_drift(self):
+        create_lesson(self.term, 1, status="published", duration_ms=10)
+        Program.objects.filter(pk=self.program.pk).update(published_lesson_count=0, total_published_duration_ms=99)
+        Term.objects.filter(pk=self.term.pk).update(published_lesson_count=7)
+
+        untouched = Term.objects.get(pk=self.other_term.pk).updated_at
+
+        out = StringIO()
+        call_command("recompute_rollups", stdout=out)
+
+        self.assertIn("Recomputed rollups: 1 term(s) and 1 program(s) had drifted", out.getvalue())
+        self.program.refresh_from_db()
+        self.term.refresh_from_db()
+        self.assertEqual(self.term.published_lesson_count, 1)
+        self.assertEqual(self.program.published_lesson_count, 1)
+        self.assertEqual(self.program.total_published_duration_ms, 10)
+        # Rows whose rollups were already right keep their validators
+        self.assertEqual(Term.objects.get(pk=self.other_term.pk).updated_at, untouched)
+
+        repaired = self.program.updated_at
+        out = StringIO()
+        call_command("recompute_rollups", stdout=out)
+        self.assertIn("0 term(s) and 0 program(s) had drifted", out.getvalue())
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.updated_at, repaired)
+
+    def test_recompute_rollups_refreshes_facets_of_drifted_programs(self):
+        lesson = create_lesson(self.term, 1, status="draft")
+        # Published behind the signals' back: not in the catalog, nor in the facet counts
+        Lesson.objects.filter(pk=lesson.pk).update(status="published", published_at=timezone.now())
+        self.assertEqual(facets.counts()["content_type"], {})
+
+        call_command("recompute_rollups", stdout=StringIO())
+        self.assertEqual(facets.counts()["content_type"], {"video": 1})
+        self.assertEqual(facets.counts()["language"], {"en": 1})
+
+    def test_rebuild_compares_missing_publication_dates(self):
+        create_lesson(self.term, 1, status="published", duration_ms=10)
+        self.assertEqual(rebuild_rollups(), (0, set()))
+        Term.objects.filter(pk=self.term.pk).update(last_published_at=None)
+        Term.objects.filter(pk=self.other_term.pk).update(last_published_at=timezone.now())
+        self.assertEqual(rebuild_rollups(), (2, set()))
+        self._assert_rollups(self.other_term, 0, 0, None)
+
+    def test_catalog_filter_uses_the_rollup_column(self):
+        create_lesson(self.term, 1, status="published")
+        with CaptureQueriesContext(connection) as ctx:
+            ids = list(catalog_programs().values_list("id", flat=True))
+        self.assertEqual(ids, [self.program.id])
+        self.assertNotIn("EXISTS", ctx.captured_queries[0]["sql"].upper())
+
+    def test_api_writes_roll_back_with_their_rollups(self):
+        lesson = create_lesson(self.term, 1, status="published", duration_ms=10)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("editor", is_staff=True))
+
+        with mock.patch("core.changes.refresh_rollups", side_effect=RuntimeError("rollups failed")):
+            with self.assertRaises(RuntimeError):
+                client.post("/api/lessons/", {
+                    "term_id": self.term.pk, "lesson_number": 2, "title": "Lesson 2", "content_type": "video",
+                    "content_language_primary": "en", "content_languages_available": ["en"],
+                    "content_urls_by_language": {"en": "https://cdn.example.com/en.mp4"},
+                    "status": "published", "published_at": timezone.now().isoformat(), "duration_ms": 20,
+                }, format="json")
+            with self.assertRaises(RuntimeError):
+                client.patch(f"/api/lessons/{lesson.pk}/", {"duration_ms": 500}, format="json")
+            with self.assertRaises(RuntimeError):
+                client.delete(f"/api/lessons/{lesson.pk}/")
+
+        self.assertEqual(list(self.term.lessons.values_list("lesson_number", "duration_ms")), [(1, 10)])
+        self._assert_rollups(self.program, 1, 10, lesson.published_at)
+
+    def test_direct_saves_roll_back_with_their_rollups(self):
+        lesson = create_lesson(self.term, 1, status="published", duration_ms=10)
+
+        with mock.patch("core.changes.refresh_rollups", side_effect=RuntimeError("rollups failed")):
+            with self.assertRaises(RuntimeError):
+                create_lesson(self.term, 2, status="published", duration_ms=20)
+            lesson.duration_ms = 500
+            with self.assertRaises(RuntimeError):
+                lesson.save()
+            with self.assertRaises(RuntimeError):
+                lesson.delete()
+
+        self.assertEqual(list(self.term.lessons.values_list("lesson_number", "duration_ms")), [(1, 10)])
+        self._assert_rollups(self.program, 1, 10, lesson.published_at)
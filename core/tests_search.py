@@ -0,0 +1,140 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_lesson, create_program, create_term
+from core.models import Lesson, Topic, SearchDocument
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.algebra = Topic.objects.create(name="Algebra")
+        self.geometry = Topic.objects.create(name="Geometry")
+
+        self.math = create_program(
+            "Mathematics for everyone", description="Numbers and shapes", topics=[self.algebra, self.geometry],
+        )
+        self.history = create_program("World history", description="Includes the history of mathematics")
+        self.cooking = create_program("Cooking", description="Knife skills")
+
+        self.term = create_term(self.math, title="Foundations")
+        self.published = create_lesson(self.term, 1, title="Linear equations", status="published")
+        self.draft = create_lesson(self.term, 2, title="Quadratic equations")
+
+    def _titles(self, url):
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return [item["title"] for item in resp.data["results"]]
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertEqual(
+            self._titles("/api/programs/?q=mathematics"),
+            ["Mathematics for everyone", "World history"],
+        )
+
+    def test_prefix_matches_and_topics_without_duplicates(self):
+        resp = self.client.get("/api/programs/?q=alg")
+        self.assertEqual(resp.data["count"], 1)
+
+        # Two matching topics still yield one row
+        resp = self.client.get("/api/programs/?q=e")
+        self.assertEqual(len({item["id"] for item in resp.data["results"]}), resp.data["count"])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._titles("/api/programs/?q=history+mathematics"), ["World history"])
+        self.assertEqual(self._titles("/api/programs/?q=history+knife"), [])
+
+    def test_punctuation_is_not_query_syntax(self):
+        self.assertEqual(self._titles('/api/programs/?q="cook*"+(-'), ["Cooking"])
+        self.assertEqual(self._titles("/api/programs/?q=***"), [])
+
+    def test_lessons_match_program_titles_and_combine_with_filters(self):
+        self.assertEqual(
+            self._titles("/api/lessons/?q=mathematics&ordering=lesson_number"),
+            ["Linear equations", "Quadratic equations"],
+        )
+        self.assertEqual(self._titles("/api/lessons/?q=equations&status=draft"), ["Quadratic equations"])
+
+    def test_index_follows_renames(self):
+        self.math.title = "Arithmetic"
+        self.math.save()
+        self.assertEqual(self._titles("/api/lessons/?q=arithmetic&ordering=lesson_number"), ["Linear equations", "Quadratic equations"])
+
+        self.term.title = "Basics"
+        self.term.save()
+        self.assertEqual(len(self._titles("/api/lessons/?q=basics")), 2)
+
+        self.geometry.name = "Trigonometry"
+        self.geometry.save()
+        self.assertEqual(self._titles("/api/programs/?q=trigonometry"), ["Arithmetic"])
+
+    def test_index_follows_topic_membership(self):
+        self.math.topics.remove(self.algebra)
+        self.assertEqual(self._titles("/api/programs/?q=algebra"), [])
+
+        self.algebra.programs.add(self.cooking)
+        self.assertEqual(self._titles("/api/programs/?q=algebra"), ["Cooking"])
+
+        self.cooking.topics.clear()
+        self.assertEqual(self._titles("/api/programs/?q=algebra"), [])
+
+        self.geometry.delete()
+        self.assertEqual(self._titles("/api/programs/?q=geometry"), [])
+
+    def test_deletes_remove_documents(self):
+        self.draft.delete()
+        self.assertEqual(self._titles("/api/lessons/?q=quadratic"), [])
+
+        self.math.delete()
+        self.assertFalse(SearchDocument.objects.filter(title__icontains="equations").exists())
+        self.assertEqual(self._titles("/api/programs/?q=numbers"), [])
+
+    def test_bulk_writes_are_indexed(self):
+        get_user_model().objects.create_user(username="staff", password="Test12345!", is_staff=True)
+        self.client.login(username="staff", password="Test12345!")
+
+        resp = self.client.post(
+            "/api/lessons/bulk/",
+            [{
+                "term_id": self.term.id,
+                "lesson_number": 3,
+                "title": "Polynomials",
+                "content_type": "video",
+                "content_language_primary": "en",
+                "content_languages_available": ["en"],
+                "content_urls_by_language": {"en": "https://cdn.example.com/en.mp4"},
+            }],
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(self._titles("/api/lessons/?q=polynomials"), ["Polynomials"])
+
+    def test_catalog_search(self):
+        Lesson.objects.filter(pk=self.draft.pk).update(title="Linear draft")
+        call_command("rebuild_search_index", stdout=StringIO())
+
+        resp = self.client.get("/catalog/search/?q=linear")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([lesson["title"] for lesson in resp.data["lessons"]], ["Linear equations"])
+        self.assertEqual([program["title"] for program in resp.data["programs"]], [])
+
+        resp = self.client.get("/catalog/search/?q=mathematics")
+        # Only programs with published lessons are in the catalog
+        self.assertEqual([program["title"] for program in resp.data["programs"]], ["Mathematics for everyone"])
+        self.assertEqual(resp.data["programs"][0]["terms"][0]["lessons"][0]["title"], "Linear equations")
+
+        self.assertEqual(self.client.get("/catalog/search/").status_code, 400)
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("Indexed 3 program(s) and 2 lesson(s)", out.getvalue())
+        self.assertEqual(self._titles("/api/programs/?q=knife"), ["Cooking"])
@@ -0,0 +1,102 @@
+import json
+import re
+
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import cache
+from core.catalog_async import aget_catalog_lesson
+from core.factories import create_lesson, create_program, create_term
+from core.timing import ServerTimingMiddleware
+
+
+def _metrics(response):
+    """{name: (duration ms, description)} from a Server-Timing header."""
+    metrics = {}
+    for metric in response["Server-Timing"].split(", "):
+        name, *params = metric.split(";")
+        params = dict(param.split("=", 1) for param in params)
+        metrics[name] = (float(params["dur"]), params.get("desc", "").strip('"'))
+    return metrics
+
+
+def _catalog():
+    program = create_program("Timed", status="published")
+    lesson = create_lesson(create_term(program, title="Term"), 1, title="Lesson", status="published")
+    return program, lesson
+
+
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.program, self.lesson = _catalog()
+
+    def test_off_by_default(self):
+        resp = APIClient().get("/api/programs/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotIn("Server-Timing", resp)
+
+    @override_settings(SERVER_TIMING=True, SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_sampled_request_reports_queries_and_phases(self):
+        client = APIClient()
+        with self.assertLogs("core.timing", "INFO") as logs, CaptureQueriesContext(connection) as queries:
+            resp = client.get("/api/lessons/")
+        self.assertEqual(resp.status_code, 200)
+
+        metrics = _metrics(resp)
+        self.assertEqual(list(metrics), ["db", "serialize", "render", "total"])
+        self.assertEqual(metrics["db"][1], f"{len(queries)} queries")
+        self.assertLessEqual(metrics["serialize"][0] + metrics["render"][0], metrics["total"][0])
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].timing, record)
+        self.assertEqual(record["route"], "api/lessons/$")
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["db_queries"], len(queries))
+        self.assertIn("serialize_ms", record)
+
+    @override_settings(SERVER_TIMING=True, SERVER_TIMING_SAMPLE_RATE=1.0)
+    def test_catalog_and_detail_views(self):
+        client = APIClient()
+        with self.assertLogs("core.timing", "INFO"):
+            for url in (
+                "/catalog/programs/",
+                f"/catalog/programs/{self.program.id}/",
+                f"/catalog/lessons/{self.lesson.id}/",
+                f"/api/programs/{self.program.id}/",
+            ):
+                metrics = _metrics(client.get(url))
+                self.assertIn("serialize", metrics, url)
+                self.assertIn("render", metrics, url)
+
+            # Served from the catalog cache: nothing to serialize
+            metrics = _metrics(client.get("/catalog/programs/"))
+            self.assertNotIn("serialize", metrics)
+
+    @override_settings(SERVER_TIMING=True, SERVER_TIMING_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_are_untouched(self):
+        with self.assertNoLogs("core.timing"):
+            resp = APIClient().get("/api/programs/")
+        self.assertNotIn("Server-Timing", resp)
+
+
+@override_settings(SERVER_TIMING=True, SERVER_TIMING_SAMPLE_RATE=1.0)
+class AsyncServerTimingTests(TransactionTestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        _, self.lesson = _catalog()
+
+    async def test_queries_on_pool_threads_are_counted(self):
+        async def view(request):
+            return await aget_catalog_lesson(request, id=self.lesson.id)
+
+        middleware = ServerTimingMiddleware(view)
+        with self.assertLogs("core.timing", "INFO"):
+            resp = await middleware(AsyncRequestFactory().get(f"/catalog/lessons/{self.lesson.id}/"))
+        self.assertEqual(resp.status_code, 200)
+        metrics = _metrics(resp)
+        self.assertRegex(metrics["db"][1], re.compile(r"^[1-9]\d* queries$"))
+        self.assertIn("serialize", metrics)
+        self.assertIn("render", metrics)
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core import cache
+from core.factories import create_lesson, create_program, create_term
+from core.models import Program, Topic
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.catalog_cache().clear()
+        self.client = APIClient()
+        self.topic = Topic.objects.create(name="Algebra")
+        self.program = create_program(
+            "Sparse", description="A long description", topics=[self.topic], status="published",
+        )
+        self.term = create_term(self.program, title="One")
+        create_term(self.program, 2, title="Empty")
+        self.lesson = create_lesson(self.term, 1, title="Intro", status="published")
+
+    def _get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        return resp, [query["sql"] for query in ctx.captured_queries]
+
+    def test_fields_trim_output_and_columns(self):
+        resp, queries = self._get("/api/lessons/?fields=id,title,term")
+
+        self.assertEqual(resp.data["results"], [{"id": self.lesson.id, "title": "Intro", "term": self.term.id}])
+        select = next(sql for sql in queries if '"core_lesson"."title"' in sql)
+        self.assertNotIn("content_urls_by_language", select)
+        self.assertNotIn("core_term", select)
+
+    def test_expand_renders_nested_objects_and_collapses_the_rest(self):
+        resp, queries = self._get("/api/lessons/?expand=term")
+
+        term = resp.data["results"][0]["term"]
+        self.assertEqual(term["id"], self.term.id)
+        self.assertEqual(term["program"], self.program.id)
+        self.assertTrue(any("core_term" in sql for sql in queries))
+        self.assertFalse(any('"core_program"."description"' in sql for sql in queries))
+
+    def test_nested_field_paths_expand_their_parents(self):
+        resp, _ = self._get("/api/lessons/?fields=id,term.title,term.program.title")
+
+        self.assertEqual(
+            resp.data["results"],
+            [{"id": self.lesson.id, "term": {"title": "One", "program": {"title": "Sparse"}}}],
+        )
+
+    def test_default_response_is_unchanged(self):
+        resp, _ = self._get("/api/lessons/")
+
+        self.assertEqual(resp.data["results"][0]["term"]["program"]["title"], "Sparse")
+        self.assertIn("content_urls_by_language", resp.data["results"][0])
+
+    def test_retrieve_and_collapsed_many_relations(self):
+        resp, _ = self._get(f"/api/topics/{self.topic.id}/?fields=name,programs")
+        self.assertEqual(resp.data, {"name": "Algebra", "programs": [self.program.id]})
+
+        resp, queries = self._get("/api/topics/?fields=id,name")
+        self.assertEqual(resp.data["results"], [{"id": self.topic.id, "name": "Algebra"}])
+        self.assertFalse(any("core_topic_programs" in sql for sql in queries))
+
+    def test_writes_ignore_sparse_parameters(self):
+        get_user_model().objects.create_user(username="staff", password="Test12345!", is_staff=True)
+        self.client.login(username="staff", password="Test12345!")
+
+        resp = self.client.patch(f"/api/programs/{self.program.id}/?fields=id", {"title": "Renamed"}, format="json")
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["title"], "Renamed")
+        self.program.refresh_from_db()
+        self.assertEqual(self.program.description, "A long description")
+
+    def test_catalog_list_skips_unrequested_relations(self):
+        resp, queries = self._get("/catalog/programs/?fields=id,title")
+
+        self.assertEqual(resp.data["results"], [{"id": str(self.program.id), "title": "Sparse"}])
+        self.assertEqual(len(queries), 2)  # count + page
+        self.assertFalse(any("description" in sql for sql in queries))
+
+    def test_catalog_collapsed_terms_use_rollups(self):
+        resp, queries = self._get("/catalog/programs/?fields=id,terms,topics")
+
+        self.assertEqual(
+            resp.data["results"],
+            [{"id": str(self.program.id), "topics": [str(self.topic.id)], "terms": [str(self.term.id)]}],
+        )
+        self.assertFalse(any("core_lesson" in sql for sql in queries))
+
+    def test_catalog_nested_lesson_fields(self):
+        resp, queries = self._get(f"/catalog/programs/{self.program.id}/?fields=title,terms.title,terms.lessons.title")
+
+        self.assertEqual(resp.data, {"title": "Sparse", "terms": [{"title": "One", "lessons": [{"title": "Intro"}]}]})
+        lesson_query = next(sql for sql in queries if "core_lesson" in sql)
+        self.assertNotIn("content_urls_by_language", lesson_query)
+
+    def test_catalog_variants_are_cached_separately(self):
+        full = self.client.get("/catalog/programs/").data
+        sparse = self.client.get("/catalog/programs/?fields=id").data
+
+        self.assertIn("terms", full["results"][0])
+        self.assertEqual(sparse["results"], [{"id": str(self.program.id)}])
+        self.assertEqual(self.client.get("/catalog/programs/").data, full)
+
+    def test_catalog_lesson_fields(self):
+        resp, queries = self._get(f"/catalog/lessons/{self.lesson.id}/?fields=id,title")
+
+        self.assertEqual(resp.data, {"id": self.lesson.id, "title": "Intro"})
+        self.assertNotIn("content_urls_by_language", queries[0])
+
+    def test_catalog_cursor_mode_with_sparse_fields(self):
+        other = create_program("Other")
+        Program.objects.filter(pk=other.pk).update(published_lesson_count=1)
+
+        first, _ = self._get("/catalog/programs/?pagination=cursor&limit=1&fields=id")
+        second, queries = self._get(first.data["next"])
+
+        self.assertEqual(second.data["results"], [{"id": str(self.program.id)}])
+        self.assertEqual(len(queries), 1)
@@ -4,38 +4,54 @@ from rest_framework import viewsets
 from .models import Program, Topic, Term, Lesson
 from .serializers import ProgramSerializer, TopicSerializer, TermSerializer, LessonSerializer
 from .permissions import StaffWritePermission
+from .bulk import BulkWriteMixin
+from .changes import AtomicWriteMixin
+from .conditional import ConditionalGetMixin
+from .eager import EagerLoadingMixin
+from .sparse import SparseFieldsViewMixin
 
-class ProgramViewSet(viewsets.ModelViewSet):
+class ProgramViewSet(AtomicWriteMixin, ConditionalGetMixin, SparseFieldsViewMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
     permission_classes = [StaffWritePermission]
     filterset_fields = ['status', 'language_primary', 'topics__name']
     search_fields = ['title', 'description', 'topics__name']
+    search_document = 'program'
     ordering_fields = ['created_at', 'updated_at', 'published_at', 'title']
     ordering = ['-created_at']
 
-class TopicViewSet(viewsets.ModelViewSet):
+class TopicViewSet(AtomicWriteMixin, ConditionalGetMixin, SparseFieldsViewMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Topic.objects.all()
     serializer_class = TopicSerializer
     permission_classes = [StaffWritePermission]
+    prefetch_related_fields = ('programs',)
     search_fields = ['name']
     ordering_fields = ['name']
     ordering = ['name']
 
-class TermViewSet(viewsets.ModelViewSet):
+class TermViewSet(AtomicWriteMixin, BulkWriteMixin, ConditionalGetMixin, SparseFieldsViewMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Term.objects.all()
     serializer_class = TermSerializer
     permission_classes = [StaffWritePermission]
+    select_related_fields = ('program',)
+    conditional_fields = ('updated_at', 'program__updated_at')
+    bulk_related_field = ('program_id', Program, ())
+    bulk_select_related = ('program',)
     filterset_fields = ['program', 'term_number']
     search_fields = ['title', 'program__title']
     ordering_fields = ['term_number', 'created_at']
     ordering = ['term_number']
 
-class LessonViewSet(viewsets.ModelViewSet):
+class LessonViewSet(AtomicWriteMixin, BulkWriteMixin, ConditionalGetMixin, SparseFieldsViewMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     permission_classes = [StaffWritePermission]
+    select_related_fields = ('term__program',)
+    conditional_fields = ('updated_at', 'term__updated_at', 'term__program__updated_at')
+    bulk_related_field = ('term_id', Term, ('program',))
+    bulk_select_related = ('term__program',)
     filterset_fields = ['term', 'status', 'content_type', 'content_language_primary']
     search_fields = ['title', 'term__program__title']
+    search_document = 'lesson'
     ordering_fields = ['lesson_number', 'publish_at', 'published_at', 'created_at']
     ordering = ['lesson_number']
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cms_backend.settings')
+    # The test suite has settings of its own (see cms_backend.test_settings)
+    settings_module = 'cms_backend.test_settings' if sys.argv[1:2] == ['test'] else 'cms_backend.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
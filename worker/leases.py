@@ -0,0 +1,22 @@
+"""Acquire and release SchedulerLease rows with single conditional UPDATEs."""
+
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SchedulerLease
+
+
+def acquire(name, owner, ttl_seconds):
+    """Take or renew the lease; returns False while another owner holds an unexpired lease."""
+    now = timezone.now()
+    SchedulerLease.objects.get_or_create(name=name)
+    return SchedulerLease.objects.filter(
+        Q(owner=owner) | Q(expires_at__isnull=True) | Q(expires_at__lte=now),
+        name=name,
+    ).update(owner=owner, expires_at=now + timedelta(seconds=ttl_seconds)) == 1
+
+
+def release(name, owner):
+    SchedulerLease.objects.filter(name=name, owner=owner).update(owner='', expires_at=None)
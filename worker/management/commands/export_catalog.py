@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.export import PAGE_SIZE, export_catalog
+
+
+class Command(BaseCommand):
+    help = 'Export the public catalog as static JSON files, rewriting only what changed since the last export'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir',
+            default=None,
+            help='Output directory (defaults to settings.CATALOG_EXPORT_DIR)',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rewrite every file instead of only those changed since the last export',
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=PAGE_SIZE,
+            help='Programs per list page',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        stats = export_catalog(options['dir'], full=options['full'], page_size=options['page_size'])
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'Full' if stats['full'] else 'Incremental'} export: wrote {stats['programs']} program(s), "
+                f"{stats['pages']} list page(s) and {stats['lessons']} lesson(s), "
+                f"removed {stats['removed']} file(s) in {elapsed * 1000:.1f} ms"
+            )
+        )
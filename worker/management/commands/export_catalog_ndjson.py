@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from core.ndjson import CHUNK_SIZE, iter_chunks
+
+
+class Command(BaseCommand):
+    help = 'Write the public catalog as newline-delimited JSON, one line per program and lesson'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='File to write (default: standard output)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Programs loaded per round of queries',
+        )
+
+    def handle(self, *args, **options):
+        chunks = iter_chunks(options['chunk_size'])
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
+            return
+
+        written = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += chunk.count(b'\n')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} line(s) to {options["output"]}'))
@@ -0,0 +1,81 @@
+import io
+import json
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from core.importer import CHUNK_SIZE, CatalogImporter, read_csv, read_ndjson
+
+
+class Command(BaseCommand):
+    help = 'Stream programs, terms and lessons from NDJSON or CSV and upsert them in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='File to read, or - for standard input',
+        )
+        parser.add_argument(
+            '--format',
+            choices=('ndjson', 'csv'),
+            default=None,
+            help='Input format (default: from the file extension, else ndjson)',
+        )
+        parser.add_argument(
+            '--type',
+            choices=('program', 'term', 'lesson'),
+            default=None,
+            help='Record type of CSV rows without a type column',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Maximum number of records written per transaction',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as exc:
+                raise CommandError(f'Cannot read {path}: {exc.strerror}')
+
+        started = time.monotonic()
+        chunk_started = started
+        chunk_number = 0
+
+        def on_chunk(count):
+            nonlocal chunk_started, chunk_number
+            chunk_number += 1
+            elapsed = time.monotonic() - chunk_started
+            self.stdout.write(
+                f'Chunk {chunk_number}: imported {count} record(s) in '
+                f'{elapsed * 1000:.1f} ms ({count / max(elapsed, 1e-9):.0f} rows/s)'
+            )
+            chunk_started = time.monotonic()
+
+        def on_error(line, errors):
+            self.stderr.write(f'Line {line}: {json.dumps(errors)}')
+
+        importer = CatalogImporter(options['chunk_size'], on_chunk=on_chunk, on_error=on_error)
+        with stream:
+            records = read_csv(stream, options['type']) if input_format == 'csv' else read_ndjson(stream)
+            stats = importer.run(records)
+        elapsed = time.monotonic() - started
+
+        rows = sum(counts['created'] + counts['updated'] for counts in stats.values())
+        for name, counts in stats.items():
+            self.stdout.write(f"{name.capitalize()}: {counts['created']} created, {counts['updated']} updated")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {rows} row(s) in {elapsed * 1000:.1f} ms ({rows / max(elapsed, 1e-9):.0f} rows/s)'
+            )
+        )
+        if importer.rejected:
+            raise CommandError(f'Rejected {importer.rejected} record(s); see the errors above')
@@ -1,42 +1,146 @@
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+
 from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Min
 from django.utils import timezone
+from core import metrics
+from core.changes import catalog_changed
+from core.export import export_catalog
 from core.models import Lesson, Program
+from worker import leases
+from worker.wakeup import WakeupListener
+
+LEASE_NAME = 'publish_scheduled'
+LEASE_TTL_SECONDS = 60
 
 
 class Command(BaseCommand):
     help = 'Publish scheduled lessons whose publish_at time has passed'
+    batch_size = 1000
+    export_dir = None
+    lease_retry_delay = 0.05
 
-    def handle(self, *args, **options):
-        now = timezone.now()
-        
-        # Query all lessons that are scheduled and ready to be published
-        scheduled_lessons = Lesson.objects.filter(
-            status='scheduled',
-            publish_at__lte=now
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--daemon',
+            action='store_true',
+            help='Stay resident and sleep until the next lesson is due',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Maximum number of lessons published per transaction',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=300.0,
+            help='Upper bound in seconds between schedule checks in daemon mode',
         )
-        
+        parser.add_argument(
+            '--export-dir',
+            default=None,
+            help='Incrementally export the static catalog here after each run (see export_catalog)',
+        )
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.export_dir = options['export_dir']
+        if options['daemon']:
+            self.run_daemon(options['max_sleep'])
+        else:
+            self.publish_due()
+            self.export()
+
+    def run_daemon(self, max_sleep):
+        self.stopping = False
+        try:
+            self.listener = WakeupListener()
+        except OSError as exc:
+            self.stderr.write(f'Wakeup channel unavailable ({exc}); relying on timers only')
+            self.listener = WakeupListener(udp=False)
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self._request_stop)
+            signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(self.style.SUCCESS('Scheduler daemon started'))
+        try:
+            while not self.stopping:
+                close_old_connections()
+                self.publish_due(report_idle=False)
+                self.export()
+                if self.stopping:
+                    break
+                self.listener.wait(self.seconds_until_next_due(max_sleep))
+        finally:
+            self.listener.close()
+            close_old_connections()
+        self.stdout.write(self.style.SUCCESS('Scheduler daemon stopped'))
+
+    def stop(self):
+        self.stopping = True
+        self.listener.interrupt()
+
+    def _request_stop(self, signum, frame):
+        self.stop()
+
+    def record_metrics(self, published_at, due, published):
+        metrics.PUBLISH_BATCH_SIZE.observe(published)
+        for _, _, publish_at in due:
+            metrics.PUBLISH_LAG.observe((published_at - publish_at).total_seconds())
+
+    def export(self):
+        """Bring the static catalog export up to date when --export-dir is set."""
+        if not self.export_dir:
+            return
+        stats = export_catalog(self.export_dir)
+        written = stats['programs'] + stats['pages'] + stats['lessons']
+        if written or stats['removed']:
+            self.stdout.write(f"Exported catalog: wrote {written} file(s), removed {stats['removed']}")
+
+    def seconds_until_next_due(self, max_sleep):
+        next_publish_at = Lesson.objects.filter(status='scheduled').aggregate(
+            next_publish_at=Min('publish_at'),
+        )['next_publish_at']
+        if next_publish_at is None:
+            return max_sleep
+        delay = (next_publish_at - timezone.now()).total_seconds()
+        return min(max(delay, 0.0), max_sleep)
+
+    def publish_due(self, report_idle=True):
         published_count = 0
-        
-        for lesson in scheduled_lessons:
-            # Update lesson status
-            lesson.status = 'published'
-            lesson.published_at = timezone.now()
-            lesson.save()
-            
-            published_count += 1
-            
-            # Check and update program status if needed
-            program = lesson.term.program
-            if program.status != 'published':
-                program.status = 'published'
-                program.published_at = timezone.now()
-                program.save()
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Auto-published program: {program.title}'
-                    )
-                )
-        
+        batch_number = 0
+
+        while True:
+            started = time.monotonic()
+            published = self.publish_batch()
+            if published is None:
+                # Another worker holds the lease and is publishing; try again shortly
+                time.sleep(self.lease_retry_delay)
+                continue
+            if not published:
+                break
+
+            batch_number += 1
+            published_count += published
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'Batch {batch_number}: published {published} lesson(s) in '
+                f'{elapsed * 1000:.1f} ms ({published / max(elapsed, 1e-9):.0f} lessons/s)'
+            )
+
         # Print summary
         if published_count > 0:
             self.stdout.write(
@@ -44,7 +148,82 @@ class Command(BaseCommand):
                     f'Successfully published {published_count} lesson(s)'
                 )
             )
-        else:
+        elif report_idle:
             self.stdout.write(
                 self.style.WARNING('No lessons to publish at this time')
             )
+
+        return published_count
+
+    def publish_batch(self):
+        """
+        Claim and publish one batch. Returns the number published, or None when
+        the lease is held by another worker.
+
+        Workers claim disjoint rows with SKIP LOCKED where the database supports
+        it; otherwise batches are serialized through a SchedulerLease row.
+        """
+        if connection.features.has_select_for_update_skip_locked:
+            return self._publish_claimed(skip_locked=True)
+
+        if not leases.acquire(LEASE_NAME, self.worker_id, LEASE_TTL_SECONDS):
+            return None
+        try:
+            return self._publish_claimed(skip_locked=False)
+        finally:
+            leases.release(LEASE_NAME, self.worker_id)
+
+    def _publish_claimed(self, skip_locked):
+        """Publish up to batch_size due lessons and promote their programs in one transaction."""
+        with transaction.atomic():
+            now = timezone.now()
+            due = Lesson.objects.filter(status='scheduled', publish_at__lte=now)
+            if skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            due = list(
+                due.order_by('publish_at', 'id')
+                .values_list('id', 'term_id', 'publish_at')[:self.batch_size]
+            )
+            if not due:
+                return 0
+
+            lesson_ids = [lesson_id for lesson_id, _, _ in due]
+            term_ids = {term_id for _, term_id, _ in due}
+
+            published = Lesson.objects.filter(id__in=lesson_ids, status='scheduled').update(
+                status='published',
+                published_at=now,
+                updated_at=now,
+            )
+
+            # update() bypasses model signals; refresh rollups and caches directly.
+            # Newly published lessons were never cached, so only their programs are invalidated.
+            # This locks the terms and programs first (see core.rollups.lock_rollups), so a
+            # worker publishing lessons of the same terms goes first and its writes are seen.
+            catalog_changed(term_ids=term_ids)
+
+            # Check and update program status if needed; with the programs
+            # locked, these are exactly the rows the UPDATE below changes
+            promoted = list(
+                Program.objects.filter(terms__in=term_ids)
+                .exclude(status='published')
+                .values_list('id', 'title')
+                .distinct()
+            )
+            if promoted:
+                Program.objects.filter(id__in=[program_id for program_id, _ in promoted]).exclude(
+                    status='published',
+                ).update(
+                    status='published',
+                    published_at=now,
+                    updated_at=now,
+                )
+                for _, title in promoted:
+                    self.stdout.write(
+                        self.style.SUCCESS(
+                            f'Auto-published program: {title}'
+                        )
+                    )
+            transaction.on_commit(lambda: self.record_metrics(now, due, published))
+
+        return published
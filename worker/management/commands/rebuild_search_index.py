@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents for every program and lesson'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            programs, lessons = rebuild_index()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Indexed {programs} program(s) and {lessons} lesson(s)'
+            )
+        )
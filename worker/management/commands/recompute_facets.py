@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core import cache
+from core.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Recompute catalog facet values and counts for every program to repair drift'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            programs = rebuild_facets()
+
+        # Facet responses are cached with the list pages
+        cache.invalidate()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Recomputed facets for {programs} catalog program(s)'
+            )
+        )
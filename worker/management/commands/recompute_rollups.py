@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core import cache, facets
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute publication rollups on every term and program to repair drift'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            terms, program_ids = rebuild_rollups()
+            # Facets count catalog programs only, so they follow the repaired rollups
+            facets.refresh(program_ids)
+
+        # Rollups decide catalog visibility, so any cached response may be stale
+        if terms or program_ids:
+            cache.invalidate_all()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Recomputed rollups: {terms} term(s) and {len(program_ids)} program(s) had drifted'
+            )
+        )
@@ -1,3 +1,11 @@
 from django.db import models
 
-# Create your models here.
+
+class SchedulerLease(models.Model):
+    """
+    Named, expiring lease that serializes publish batches across worker processes
+    on databases without SELECT ... FOR UPDATE SKIP LOCKED (e.g. SQLite).
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    owner = models.CharField(max_length=100, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,22 @@
+"""Wake the resident scheduler when a lesson is scheduled."""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.models import Lesson
+from core.signals import post_bulk_save
+from .wakeup import notify
+
+
+@receiver(post_save, sender=Lesson)
+def lesson_scheduled(sender, instance, **kwargs):
+    if instance.status == 'scheduled' and instance.publish_at:
+        # The daemon re-reads the schedule, so only signal once the row is visible
+        transaction.on_commit(notify)
+
+
+@receiver(post_bulk_save, sender=Lesson)
+def lessons_bulk_scheduled(sender, created, updated, **kwargs):
+    if any(lesson.status == 'scheduled' and lesson.publish_at for lesson in created + updated):
+        transaction.on_commit(notify)
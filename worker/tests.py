@@ -1,3 +1,225 @@
-from django.test import TestCase
+import os
+import re
+import shutil
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.factories import create_lesson, create_program, create_term
+from core.models import Lesson
+from worker.management.commands.publish_scheduled import Command as PublishScheduledCommand
+from worker.wakeup import WakeupListener
+
+
+MANAGE_PY = str(settings.BASE_DIR / "manage.py")
+
+SCHEDULE_LESSON = """
+from datetime import timedelta
+from django.utils import timezone
+from core.factories import create_lesson, create_program, create_term
+create_lesson(
+    create_term(create_program("Daemon")), 1, title="Soon",
+    status="scheduled", publish_at=timezone.now() + timedelta(seconds=1),
+)
+"""
+
+
+SEED_BACKLOG = """
+from datetime import timedelta
+from django.utils import timezone
+from core.models import Program, Term, Lesson
+past = timezone.now() - timedelta(minutes=1)
+for p in range(3):
+    program = Program.objects.create(title=f"Backlog {p}", language_primary="en", languages_available=["en"])
+    terms = Term.objects.bulk_create([Term(program=program, term_number=t) for t in range(1, 5)])
+    Lesson.objects.bulk_create([
+        Lesson(
+            term=term, lesson_number=n, title="Due", content_type="video",
+            content_language_primary="en", content_languages_available=["en"],
+            content_urls_by_language={"en": "https://cdn.example.com/en.mp4"},
+            status="scheduled", publish_at=past,
+        )
+        for term in terms for n in range(1, 251)
+    ])
+"""
+
+
+class WakeupChannelTests(TestCase):
+    def setUp(self):
+        self.listener = WakeupListener(host="127.0.0.1", port=0)
+        self.addCleanup(self.listener.close)
+        self.term = create_term(create_program("Worker"))
+
+    def test_scheduling_a_lesson_wakes_the_listener(self):
+        with override_settings(PUBLISH_WAKEUP_HOST="127.0.0.1", PUBLISH_WAKEUP_PORT=self.listener.address[1]):
+            with self.captureOnCommitCallbacks(execute=True):
+                create_lesson(self.term, 1, status="scheduled", publish_at=timezone.now() + timedelta(hours=1))
+
+        self.assertTrue(self.listener.wait(2))
+
+    def test_draft_saves_do_not_wake_the_listener(self):
+        with override_settings(PUBLISH_WAKEUP_HOST="127.0.0.1", PUBLISH_WAKEUP_PORT=self.listener.address[1]):
+            with self.captureOnCommitCallbacks(execute=True):
+                create_lesson(self.term, 1, status="draft")
+
+        self.assertFalse(self.listener.wait(0.05))
+
+    def test_interrupt_wakes_the_listener(self):
+        self.listener.interrupt()
+        self.assertTrue(self.listener.wait(2))
+
+    def test_sleep_is_bounded_by_the_next_due_lesson(self):
+        command = PublishScheduledCommand(stdout=StringIO())
+        self.assertEqual(command.seconds_until_next_due(30), 30)
+
+        create_lesson(self.term, 1, status="scheduled", publish_at=timezone.now() + timedelta(seconds=10))
+        self.assertAlmostEqual(command.seconds_until_next_due(30), 10, delta=1)
+        self.assertEqual(command.seconds_until_next_due(5), 5)
+
+
+class SubprocessDatabaseMixin:
+    """Runs real manage.py processes against a throwaway SQLite file."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.db_path = os.path.join(self.tmp, "db.sqlite3")
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        self.env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{self.db_path}",
+            CATALOG_CACHE_LOCATION=os.path.join(self.tmp, "cache"),
+            PUBLISH_WAKEUP_HOST="127.0.0.1",
+            PUBLISH_WAKEUP_BIND="127.0.0.1",
+            PUBLISH_WAKEUP_PORT=str(port),
+        )
+        self._manage("migrate", "-v0")
+
+    def _manage(self, *args, **kwargs):
+        return subprocess.run(
+            [sys.executable, MANAGE_PY, *args],
+            env=self.env, check=True, capture_output=True, text=True, timeout=120, **kwargs,
+        )
+
+    def _query(self, sql):
+        with closing(sqlite3.connect(self.db_path)) as db:
+            return db.execute(sql).fetchall()
+
+
+class PublishDaemonTests(SubprocessDatabaseMixin, SimpleTestCase):
+    def _lesson_row(self):
+        return self._query("SELECT status, publish_at, published_at FROM core_lesson")[0]
+
+    def test_daemon_wakes_for_new_lessons_and_stops_on_sigterm(self):
+        daemon = subprocess.Popen(
+            [sys.executable, MANAGE_PY, "publish_scheduled", "--daemon", "--max-sleep", "120"],
+            env=self.env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+        )
+        self.addCleanup(daemon.kill)
+        self.assertIn("Scheduler daemon started", daemon.stdout.readline())
+
+        # The daemon is asleep for up to two minutes; this save must wake it
+        self._manage("shell", "-c", SCHEDULE_LESSON)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            status, publish_at, published_at = self._lesson_row()
+            if status == "published":
+                break
+            time.sleep(0.05)
+        self.assertEqual(status, "published")
+        lag = datetime.fromisoformat(published_at) - datetime.fromisoformat(publish_at)
+        self.assertLess(lag.total_seconds(), 1)
+
+        daemon.send_signal(signal.SIGTERM)
+        out, _ = daemon.communicate(timeout=10)
+        self.assertEqual(daemon.returncode, 0)
+        self.assertIn("Scheduler daemon stopped", out)
+
+
+class BatchedPublishTests(TestCase):
+    def setUp(self):
+        self.term = create_term(create_program("Worker"))
+        self.past = timezone.now() - timedelta(minutes=5)
+        for number in range(1, 26):
+            lesson = create_lesson(self.term, number, status="scheduled", publish_at=timezone.now() + timedelta(hours=1))
+            Lesson.objects.filter(pk=lesson.pk).update(publish_at=self.past)
+        self.future = create_lesson(self.term, 99, status="scheduled", publish_at=timezone.now() + timedelta(hours=1))
+
+    def test_publishes_in_bounded_batches(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("publish_scheduled", "--batch-size", "10", stdout=out)
+
+        output = out.getvalue()
+        self.assertEqual(Lesson.objects.filter(status="published").count(), 25)
+        self.assertEqual(Lesson.objects.get(pk=self.future.pk).status, "scheduled")
+        self.assertIn("Batch 3: published 5 lesson(s)", output)
+        self.assertIn("lessons/s", output)
+        self.assertIn("Auto-published program: Worker", output)
+        self.assertIn("Successfully published 25 lesson(s)", output)
+        # Statements scale with batches, not lessons (rollups, facets and the batch itself)
+        self.assertLess(len(ctx.captured_queries), 70)
+
+    def test_program_is_promoted_once_with_rollups(self):
+        call_command("publish_scheduled", "--batch-size", "10", stdout=StringIO())
+
+        program = self.term.program
+        program.refresh_from_db()
+        self.assertEqual(program.status, "published")
+        self.assertIsNotNone(program.published_at)
+        self.assertEqual(program.published_lesson_count, 25)
+        self.assertEqual(
+            Lesson.objects.filter(status="published").values("published_at").distinct().count(),
+            3,
+        )
+
+
+class ConcurrentWorkersTests(SubprocessDatabaseMixin, SimpleTestCase):
+    # Runs on SQLite, whose workers take turns through the SchedulerLease. The
+    # SKIP LOCKED claims and the row locks taken by core.rollups.lock_rollups
+    # (the PostgreSQL path) aren't exercised here.
+    def test_concurrent_workers_publish_each_lesson_exactly_once(self):
+        self._manage("shell", "-c", SEED_BACKLOG)
+        total = self._query("SELECT COUNT(*) FROM core_lesson")[0][0]
+
+        workers = [
+            subprocess.Popen(
+                [sys.executable, MANAGE_PY, "publish_scheduled", "--batch-size", "25"],
+                env=self.env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            )
+            for _ in range(4)
+        ]
+        outputs = []
+        for worker in workers:
+            out, err = worker.communicate(timeout=120)
+            self.assertEqual(worker.returncode, 0, err)
+            outputs.append(out)
+
+        reported = sum(
+            int(match) for out in outputs for match in re.findall(r"Successfully published (\d+) lesson", out)
+        )
+        self.assertEqual(reported, total)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM core_lesson WHERE status = 'published'")[0][0], total)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM core_program WHERE status != 'published'")[0][0], 0)
+        self.assertEqual(
+            self._query("SELECT SUM(published_lesson_count) FROM core_program")[0][0], total,
+        )
+        promotions = sum(out.count("Auto-published program:") for out in outputs)
+        self.assertEqual(promotions, 3)
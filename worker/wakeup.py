@@ -0,0 +1,77 @@
+"""
+Local wakeup channel for the resident publish_scheduled daemon.
+
+Saving a scheduled lesson sends a tiny UDP datagram; the daemon waits on that
+socket with a timeout equal to the time until the next due lesson, so it can
+re-plan as soon as an editor schedules something sooner.
+"""
+
+import select
+import socket
+
+from django.conf import settings
+
+
+def notify():
+    """Fire-and-forget wakeup; a missing or stopped daemon is not an error."""
+    if not settings.PUBLISH_WAKEUP_PORT:
+        return
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b'wake', (settings.PUBLISH_WAKEUP_HOST, settings.PUBLISH_WAKEUP_PORT))
+    except OSError:
+        pass
+
+
+class WakeupListener:
+    """Waits for wakeup datagrams, timeouts, or a local interrupt (e.g. from a signal handler)."""
+
+    def __init__(self, host=None, port=None, udp=True):
+        """``port=None`` uses the settings (0 there disables UDP); an explicit 0 binds an ephemeral port."""
+        self._interrupt_reader, self._interrupt_writer = socket.socketpair()
+        self._interrupt_reader.setblocking(False)
+        self._interrupt_writer.setblocking(False)
+        self.sock = None
+        if port is None:
+            port = settings.PUBLISH_WAKEUP_PORT
+            udp = udp and bool(port)
+        if not udp:
+            return
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.sock.bind((host or settings.PUBLISH_WAKEUP_BIND, port))
+        except OSError:
+            self.close()
+            raise
+        self.sock.setblocking(False)
+
+    @property
+    def address(self):
+        return self.sock.getsockname() if self.sock else None
+
+    def wait(self, timeout):
+        """Block up to ``timeout`` seconds; returns True if woken before the timeout."""
+        readers = [self._interrupt_reader] + ([self.sock] if self.sock else [])
+        ready, _, _ = select.select(readers, [], [], max(timeout, 0))
+        for reader in ready:
+            self._drain(reader)
+        return bool(ready)
+
+    def interrupt(self):
+        try:
+            self._interrupt_writer.send(b'x')
+        except OSError:
+            pass
+
+    def close(self):
+        for sock in (self.sock, self._interrupt_reader, self._interrupt_writer):
+            if sock is not None:
+                sock.close()
+
+    @staticmethod
+    def _drain(sock):
+        try:
+            while sock.recv(64):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass